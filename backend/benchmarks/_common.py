@@ -0,0 +1,126 @@
+# backend/benchmarks/_common.py
+
+import io
+import json
+import os
+
+# ---------------------------
+# Environment
+# ---------------------------
+def prepare_env(llm_latency: float = None):
+    """
+    Run against the offline fake LLM backend (backend/utils/fake_llm.py).
+    Must be called before importing backend modules, which read env at import.
+    """
+    os.environ.setdefault("LLM_BACKEND", "fake")
+    if llm_latency is not None:
+        os.environ["FAKE_LLM_LATENCY"] = str(llm_latency)
+
+
+# ---------------------------
+# Fixtures
+# ---------------------------
+def make_docx_bytes(paragraphs: int = 200, tag: str = "") -> bytes:
+    """
+    Build a DOCX lecture fixture; a distinct `tag` yields distinct bytes (no cache hits).
+    """
+    import docx
+
+    document = docx.Document()
+    document.add_heading(f"Lecture {tag}".strip(), level=1)
+    for i in range(paragraphs):
+        document.add_paragraph(f"Paragraph {i}: " + "photosynthesis converts light into chemical energy. " * 8)
+    buf = io.BytesIO()
+    document.save(buf)
+    return buf.getvalue()
+
+
+def make_pptx_bytes(slides: int = 20, tag: str = "") -> bytes:
+    from pptx import Presentation
+
+    deck = Presentation()
+    for i in range(slides):
+        slide = deck.slides.add_slide(deck.slide_layouts[1])
+        slide.shapes.title.text = f"Slide {i} {tag}".strip()
+        slide.placeholders[1].text = "Mitochondria produce ATP through cellular respiration. " * 4
+    buf = io.BytesIO()
+    deck.save(buf)
+    return buf.getvalue()
+
+
+def make_png_bytes(lines: int = 20, tag: str = "") -> bytes:
+    """
+    A scanned-looking page: black text on white, for the OCR path.
+    """
+    from PIL import Image, ImageDraw
+
+    image = Image.new("L", (1240, 40 * lines + 80), 255)
+    draw = ImageDraw.Draw(image)
+    for i in range(lines):
+        draw.text((60, 40 + 40 * i), f"{tag} line {i}: osmosis moves water across a membrane", fill=0)
+    buf = io.BytesIO()
+    image.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def make_pdf_bytes(pages: int = 10, lines: int = 45, tag: str = "") -> bytes:
+    """
+    Build a text PDF (Helvetica, one content stream per page) without extra dependencies.
+    """
+    kids, objects = [], []
+    for p in range(pages):
+        page_id, content_id = 4 + 2 * p, 5 + 2 * p
+        ops = ["BT /F1 10 Tf 12 TL 50 780 Td"]
+        for line in range(lines):
+            ops.append(f"({tag} page {p} line {line}: enzymes lower the activation energy of reactions) '")
+        ops.append("ET")
+        stream = "\n".join(ops).encode()
+        objects.append((page_id, (
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode()))
+        objects.append((content_id, b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"))
+        kids.append(f"{page_id} 0 R")
+    objects = [
+        (1, b"<< /Type /Catalog /Pages 2 0 R >>"),
+        (2, f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()),
+        (3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"),
+    ] + objects
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in objects:
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % num + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+# ---------------------------
+# Reporting
+# ---------------------------
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[idx]
+
+
+def latency_summary(values) -> dict:
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(max(values) * 1000, 2) if values else 0.0,
+    }
+
+
+def report(name: str, results: dict):
+    print(json.dumps({"benchmark": name, **results}, indent=2))
@@ -0,0 +1,83 @@
+"""
+Load benchmark for the async execution layer in backend/routers/assistant.py.
+
+Fires N concurrent uploads at /assistant/summarize/quick with the fake LLM
+backend while a probe keeps requesting GET /. If extraction or LLM calls block
+the event loop, the probe latency explodes; with the executor layer its p99
+should stay close to the idle baseline.
+
+    python -m backend.benchmarks.bench_async_load --uploads 50 --llm-latency 1.0
+"""
+
+import argparse
+import asyncio
+import time
+
+from backend.benchmarks._common import latency_summary, make_docx_bytes, prepare_env, report
+
+
+async def probe(client, stop: asyncio.Event, interval: float):
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def upload(client, payload: bytes):
+    start = time.perf_counter()
+    res = await client.post(
+        "/assistant/summarize/quick",
+        files={"file": ("lecture.docx", payload, "application/octet-stream")},
+    )
+    res.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def run(uploads: int, probe_seconds: float, interval: float):
+    import httpx
+    from backend.main import fastapi_app
+
+    # Distinct documents so the result cache does not short-circuit the load
+    payloads = [make_docx_bytes(tag=str(i)) for i in range(uploads)]
+    transport = httpx.ASGITransport(app=fastapi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # Idle baseline
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, stop, interval))
+        await asyncio.sleep(probe_seconds)
+        stop.set()
+        idle = await task
+
+        # Under load
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, stop, interval))
+        upload_latencies = await asyncio.gather(*(upload(client, payload) for payload in payloads))
+        stop.set()
+        loaded = await task
+
+    return {
+        "uploads": uploads,
+        "probe_idle": latency_summary(idle),
+        "probe_under_load": latency_summary(loaded),
+        "uploads_latency": latency_summary(list(upload_latencies)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uploads", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--probe-seconds", type=float, default=2.0)
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    args = parser.parse_args()
+
+    prepare_env(args.llm_latency)
+    results = asyncio.run(run(args.uploads, args.probe_seconds, args.probe_interval))
+    report("async_load", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Requests/sec of the login lookup with and without connection pooling.
+
+Each simulated request checks out a connection, runs the login SELECT and
+closes it, from a thread pool the size of FastAPI's sync worker pool. Against
+a local MySQL (`--backend mysql`, configured via DB_* env vars) or a SQLite
+stand-in that sleeps `--connect-latency` seconds per connect to model the
+TCP + auth handshake.
+
+    python -m backend.benchmarks.bench_db_pool --backend sqlite --connect-latency 0.01
+    python -m backend.benchmarks.bench_db_pool --backend mysql --threads 40
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.benchmarks._common import latency_summary, report
+from backend.db.database import ConnectionPool, connect_mysql
+
+
+def sqlite_factory(path: str, latency: float):
+    def connect():
+        time.sleep(latency)
+        return sqlite3.connect(path, check_same_thread=False)
+    return connect
+
+
+def prepare_sqlite(path: str):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE IF NOT EXISTS users (email TEXT UNIQUE, hashed_password TEXT)")
+    conn.execute("INSERT OR IGNORE INTO users VALUES ('student@example.com', 'x')")
+    conn.commit()
+    conn.close()
+
+
+def run(get_conn, query: str, threads: int, requests: int):
+    def one(_):
+        start = time.perf_counter()
+        conn = get_conn()
+        cur = conn.cursor()
+        cur.execute(query, ("student@example.com",))
+        cur.fetchone()
+        cur.close()
+        conn.close()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        latencies = list(ex.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    return {"requests_per_s": round(requests / elapsed, 1), "latency": latency_summary(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", choices=["sqlite", "mysql"], default="sqlite")
+    parser.add_argument("--threads", type=int, default=40)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--connect-latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    if args.backend == "mysql":
+        connect = connect_mysql
+        query = "SELECT email, hashed_password FROM users WHERE email = %s"
+        healthcheck = None
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        prepare_sqlite(path)
+        connect = sqlite_factory(path, args.connect_latency)
+        query = "SELECT email, hashed_password FROM users WHERE email = ?"
+        healthcheck = lambda conn: True  # noqa: E731
+
+    pool_kwargs = {"size": args.pool_size}
+    if healthcheck is not None:
+        pool_kwargs["healthcheck"] = healthcheck
+    pool = ConnectionPool(connect, **pool_kwargs)
+
+    unpooled = run(connect, query, args.threads, args.requests)
+    pooled = run(pool.get, query, args.threads, args.requests)
+    pool.close_all()
+    report("db_pool", {
+        "backend": args.backend,
+        "threads": args.threads,
+        "requests": args.requests,
+        "unpooled": unpooled,
+        "pooled": pooled,
+        "pool_stats": pool.stats(),
+    })
+
+
+if __name__ == "__main__":
+    main()
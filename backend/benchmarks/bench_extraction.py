@@ -0,0 +1,71 @@
+"""
+Wall time and peak RSS of PDF text extraction on a large generated PDF.
+
+  legacy  - the old one-shot list comprehension over every page
+  budget  - the generator pipeline stopping at MAX_PROMPT_CHARS (what Gemini prompts use)
+  full    - the whole document, parsed in parallel page ranges on the process pool
+
+Each mode runs in a fresh interpreter so peak RSS is not shared between them.
+
+    python -m backend.benchmarks.bench_extraction --pages 500
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from backend.benchmarks._common import make_pdf_bytes, report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHILD = """
+import asyncio, json, resource, sys, time
+mode, path = sys.argv[1], sys.argv[2]
+data = open(path, "rb").read()
+start = time.perf_counter()
+if mode == "legacy":
+    import io, PyPDF2
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    text = " ".join([page.extract_text() or "" for page in reader.pages])
+else:
+    from backend.utils.extraction import extract_document_text
+    budget = 12000 if mode == "budget" else None
+    text, _ = asyncio.run(extract_document_text(data, ".pdf", budget))
+elapsed = time.perf_counter() - start
+own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+print(json.dumps({"seconds": elapsed, "chars": len(text), "peak_rss_mb": own / 1024, "peak_child_rss_mb": children / 1024}))
+"""
+
+
+def run_mode(mode: str, path: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, mode, path],
+        capture_output=True, text=True, check=True, cwd=ROOT,
+    )
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    return {k: round(v, 3) if isinstance(v, float) else v for k, v in result.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--modes", default="legacy,budget,full")
+    args = parser.parse_args()
+
+    payload = make_pdf_bytes(args.pages)
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(payload)
+        path = f.name
+    try:
+        results = {mode: run_mode(mode, path) for mode in args.modes.split(",")}
+    finally:
+        os.unlink(path)
+    report("extraction", {"pages": args.pages, "size_mb": round(len(payload) / 2**20, 2), **results})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+CPU throughput of the HuggingFace fallback: batched token-aware chunking vs the
+old one-chunk-at-a-time loop over word-split chunks, on a 100-page text fixture.
+
+Downloads the summarization model on first run.
+
+    python -m backend.benchmarks.bench_hf_chunks --pages 100 --mode quick
+"""
+
+import argparse
+import time
+
+from backend.benchmarks._common import prepare_env, report
+
+PAGE = (
+    "The mitochondrion is the powerhouse of the cell. It produces ATP through oxidative "
+    "phosphorylation, a process that relies on the electron transport chain and a proton "
+    "gradient across the inner membrane. "
+) * 12
+
+
+def legacy_chunks(text: str, mode: str):
+    max_chunk = 600 if mode == "quick" else 800
+    words = text.split()
+    return [" ".join(words[i:i + max_chunk]) for i in range(0, len(words), max_chunk)]
+
+
+def legacy_loop(summarizer, chunks, mode: str):
+    out = []
+    for c in chunks:
+        out.append(summarizer(
+            c,
+            max_length=150 if mode == "quick" else 200,
+            min_length=30 if mode == "quick" else 60,
+            do_sample=False,
+        )[0]["summary_text"])
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--mode", choices=["quick", "detailed"], default="quick")
+    parser.add_argument("--limit-chunks", type=int, default=0, help="cap chunks per engine (0 = all)")
+    args = parser.parse_args()
+
+    prepare_env()
+    import torch
+    from backend.routers import assistant
+
+    torch.set_grad_enabled(False)
+    text = assistant.clean_text(" ".join(f"Page {i}. {PAGE}" for i in range(args.pages)))
+    summarizer = assistant.summarizers.get(args.mode)
+    chunk_tokens = assistant.HF_PARAMS[args.mode]["chunk_tokens"]
+
+    old = legacy_chunks(text, args.mode)
+    new = assistant.chunk_by_tokens(text, summarizer.tokenizer, chunk_tokens)
+    if args.limit_chunks:
+        old, new = old[:args.limit_chunks], new[:args.limit_chunks]
+
+    start = time.perf_counter()
+    legacy_loop(summarizer, old, args.mode)
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assistant.summarize_chunks(summarizer, new, args.mode)
+    batched_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assistant.summarize_with_huggingface(text, args.mode)
+    full_s = time.perf_counter() - start
+
+    report("hf_chunks", {
+        "pages": args.pages,
+        "mode": args.mode,
+        "batch_size": assistant.HF_BATCH_SIZE,
+        "legacy": {"chunks": len(old), "seconds": round(legacy_s, 2), "chunks_per_s": round(len(old) / legacy_s, 3)},
+        "batched": {"chunks": len(new), "seconds": round(batched_s, 2), "chunks_per_s": round(len(new) / batched_s, 3)},
+        "map_reduce_full_document_s": round(full_s, 2),
+    })
+
+
+if __name__ == "__main__":
+    main()
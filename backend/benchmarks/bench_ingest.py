@@ -0,0 +1,146 @@
+"""
+Upload ingestion under a real uvicorn server: oversized (declared and chunked),
+over-limit, mislabeled and valid large uploads, with status, time and the
+server's peak RSS growth per case (flat memory = rejected before buffering).
+
+    python -m backend.benchmarks.bench_ingest --oversized-mb 300
+
+Bodies are streamed from a generator, so the client never holds an upload in
+memory either. RSS is the uvicorn process plus its pool children (Linux /proc).
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from backend.benchmarks._common import make_pdf_bytes, report
+from backend.benchmarks.load_socketio import spawn_server
+from backend.benchmarks.suite import rss_bytes, sample_rss, wait_ready
+
+MB = 1024 * 1024
+BOUNDARY = "edulearn-bench-boundary"
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def multipart_parts(filename: str, head: bytes, size: int):
+    """
+    (preamble, file chunks, closing) for one streamed file field of `size`
+    bytes that starts with `head` and is padded with filler.
+    """
+    preamble = (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+    closing = f"\r\n--{BOUNDARY}--\r\n".encode()
+
+    def chunks():
+        yield head
+        sent, filler = len(head), b"0" * MB
+        while sent < size:
+            piece = filler[:min(MB, size - sent)]
+            sent += len(piece)
+            yield piece
+
+    return preamble, chunks, closing
+
+
+async def upload(client, path: str, filename: str, head: bytes, size: int, declare_length: bool = True):
+    preamble, chunks, closing = multipart_parts(filename, head, max(size, len(head)))
+    sent = {"bytes": 0}
+
+    async def body():
+        yield preamble
+        for chunk in chunks():
+            sent["bytes"] += len(chunk)
+            yield chunk
+        yield closing
+
+    headers = {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+    if declare_length:
+        headers["Content-Length"] = str(len(preamble) + max(size, len(head)) + len(closing))
+    try:
+        response = await client.post(path, content=body(), headers=headers)
+    except Exception as e:  # the server may close the connection before the body is sent
+        return None, f"{e.__class__.__name__}: {e}", sent["bytes"]
+    try:
+        detail = response.json().get("detail")
+    except ValueError:
+        detail = response.text[:200]
+    return response.status_code, detail, sent["bytes"]
+
+
+async def run_case(base_url: str, pid: int, name: str, call) -> dict:
+    import httpx
+
+    baseline = rss_bytes(pid)
+    peak, stop = {"bytes": baseline}, asyncio.Event()
+    sampler = asyncio.create_task(sample_rss(pid, stop, peak))
+    start = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        status, detail, sent = await call(client)
+    seconds = time.perf_counter() - start
+    stop.set()
+    await sampler
+    print(f"▶ {name}: {status} {detail}", file=sys.stderr)
+    return {
+        "status": status,
+        "detail": detail if status != 200 else None,
+        "seconds": round(seconds, 3),
+        "client_sent_mb": round(sent / MB, 1),
+        "server_peak_rss_growth_mb": round((peak["bytes"] - baseline) / MB, 1),
+    }
+
+
+async def run(base_url: str, pid: int, args) -> dict:
+    import httpx
+
+    await wait_ready(base_url)
+    oversized = args.oversized_mb * MB
+    # ~40MB, within the page limit: long pages instead of many
+    large_pdf = make_pdf_bytes(pages=args.large_pdf_pages, lines=args.large_pdf_lines, tag="large")
+    many_pages = make_pdf_bytes(pages=args.too_many_pages, lines=2, tag="pages")
+    cases = {
+        "oversized_declared_length": lambda c: upload(c, "/assistant/summarize/quick", "big.pdf", b"%PDF-1.4\n", oversized),
+        "oversized_chunked": lambda c: upload(c, "/assistant/summarize/quick", "big.pdf", b"%PDF-1.4\n", oversized, False),
+        "over_image_limit": lambda c: upload(c, "/assistant/quiz", "scan.png", PNG_MAGIC, args.image_mb * MB),
+        "mislabeled_png_as_pdf": lambda c: upload(c, "/assistant/flowchart", "notes.pdf", PNG_MAGIC, args.mislabeled_mb * MB),
+        "mislabeled_pdf_as_docx": lambda c: upload(c, "/assistant/quiz", "notes.docx", large_pdf[:MB], MB),
+        "too_many_pdf_pages": lambda c: upload(c, "/assistant/summarize/quick", "pages.pdf", many_pages, len(many_pages)),
+        "valid_large_pdf": lambda c: upload(c, "/assistant/summarize/quick", "large.pdf", large_pdf, len(large_pdf)),
+    }
+    # Start the extraction pool first so its workers are not counted against an upload
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        small = make_pdf_bytes(pages=30, tag="warmup")
+        await upload(client, "/assistant/summarize/quick", "warmup.pdf", small, len(small))
+    results = {"large_pdf_mb": round(len(large_pdf) / MB, 1)}
+    for name, call in cases.items():
+        results[name] = await run_case(base_url, pid, name, call)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--oversized-mb", type=int, default=300)
+    parser.add_argument("--image-mb", type=int, default=30, help="over INGEST_MAX_IMAGE_BYTES, under the body limit")
+    parser.add_argument("--mislabeled-mb", type=int, default=40)
+    parser.add_argument("--too-many-pages", type=int, default=800)
+    parser.add_argument("--large-pdf-pages", type=int, default=450)
+    parser.add_argument("--large-pdf-lines", type=int, default=1200)
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    os.environ.setdefault("JOBS_DB_PATH", os.path.join(tempfile.mkdtemp(), "jobs.sqlite3"))
+    server = spawn_server(args.port, 1, 0.05)
+    try:
+        results = asyncio.run(run(f"http://127.0.0.1:{args.port}", server.pid, args))
+    finally:
+        server.terminate()
+        server.wait()
+    report("ingest", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Job queue: submit latency, throughput and queue wait by priority with many
+queued documents (every Nth job is cancelled while queued).
+
+    python -m backend.benchmarks.bench_jobs --documents 200 --workers 4 --llm-latency 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from backend.benchmarks._common import latency_summary, make_docx_bytes, prepare_env, report
+
+
+async def run(documents: int, kind: str, cancel_every: int) -> dict:
+    import httpx
+
+    from backend.main import fastapi_app
+    from backend.utils.jobs import FINISHED, job_queue
+
+    fixtures = [make_docx_bytes(40, tag=f"job-{i}") for i in range(documents)]
+    priorities = [(i % 3) - 1 for i in range(documents)]  # -1, 0, 1 round robin
+
+    await job_queue.start()
+    transport = httpx.ASGITransport(app=fastapi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        submit_latencies, job_ids = [], []
+        start = time.perf_counter()
+        for i, data in enumerate(fixtures):
+            t = time.perf_counter()
+            response = await client.post(
+                "/assistant/jobs",
+                params={"kind": kind, "priority": priorities[i]},
+                files={"file": (f"lecture-{i}.docx", data, "application/octet-stream")},
+            )
+            response.raise_for_status()
+            submit_latencies.append(time.perf_counter() - t)
+            job_ids.append(response.json()["job_id"])
+        submitted = time.perf_counter() - start
+
+        cancelled = job_ids[::cancel_every] if cancel_every else []
+        for job_id in cancelled:
+            await client.delete(f"/assistant/jobs/{job_id}")
+
+        pending = set(job_ids)
+        jobs = {}
+        while pending:
+            for job_id in list(pending):
+                job = await job_queue.get(job_id)
+                if job["status"] in FINISHED:
+                    jobs[job_id] = job
+                    pending.discard(job_id)
+            await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - start
+    await job_queue.stop()
+
+    done = [j for j in jobs.values() if j["status"] == "done"]
+    by_priority = {}
+    for job in done:
+        by_priority.setdefault(job["priority"], []).append(job["started"] - job["created"])
+    return {
+        "documents": documents,
+        "kind": kind,
+        "workers": job_queue.workers,
+        "submit_latency": latency_summary(submit_latencies),
+        "submitted_per_s": round(documents / submitted, 1),
+        "done": len(done),
+        "cancelled": sum(j["status"] == "cancelled" for j in jobs.values()),
+        "failed": sum(j["status"] == "failed" for j in jobs.values()),
+        "jobs_per_s": round(len(done) / elapsed, 2),
+        "total_seconds": round(elapsed, 2),
+        "queue_wait_by_priority": {p: latency_summary(w) for p, w in sorted(by_priority.items(), reverse=True)},
+        "run_time": latency_summary([j["finished"] - j["started"] for j in done]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--kind", default="quiz")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--cancel-every", type=int, default=10, help="cancel every Nth job (0 = none)")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    prepare_env(args.llm_latency)
+    os.environ["JOBS_WORKERS"] = str(args.workers)
+    os.environ["JOBS_MAX_QUEUED"] = str(max(args.documents, 1000))
+    os.environ["JOBS_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "jobs.sqlite3")
+    report("jobs", asyncio.run(run(args.documents, args.kind, args.cancel_every)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+JWT verifications/sec: full jwt.decode on every call vs the verified-token cache.
+
+    python -m backend.benchmarks.bench_jwt --tokens 1000 --calls 100000
+"""
+
+import argparse
+import time
+
+from backend.benchmarks._common import report
+from backend.utils import auth_utils
+
+
+def measure(tokens, calls: int, cached: bool) -> float:
+    auth_utils.token_cache.clear()
+    start = time.perf_counter()
+    for i in range(calls):
+        token = tokens[i % len(tokens)]
+        if not cached:
+            auth_utils.token_cache.clear()
+        assert auth_utils.decode_access_token(token)
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens", type=int, default=1000, help="distinct active users")
+    parser.add_argument("--calls", type=int, default=100000)
+    args = parser.parse_args()
+
+    tokens = [auth_utils.create_access_token({"sub": f"student{i}@example.com"}) for i in range(args.tokens)]
+    uncached = measure(tokens, args.calls // 10, cached=False)
+    cached = measure(tokens, args.calls, cached=True)
+    report("jwt", {
+        "tokens": args.tokens,
+        "uncached_verifications_per_s": round(uncached),
+        "cached_verifications_per_s": round(cached),
+        "speedup": round(cached / uncached, 1),
+    })
+
+
+if __name__ == "__main__":
+    main()
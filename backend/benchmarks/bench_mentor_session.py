@@ -0,0 +1,61 @@
+"""
+Mentor sessions: per-turn prompt size and latency as one conversation grows,
+vs a stateless client resending the whole transcript every turn.
+
+    python -m backend.benchmarks.bench_mentor_session --turns 100 --llm-latency 0.05
+"""
+
+import argparse
+import asyncio
+import time
+
+from backend.benchmarks._common import latency_summary, prepare_env, report
+
+TOPICS = ["photosynthesis", "mitochondria", "osmosis", "enzymes", "genetics",
+          "ecosystems", "respiration", "proteins", "hormones", "evolution"]
+
+
+async def run(turns: int) -> dict:
+    from backend.routers import virtual_mentor
+    from backend.utils.tokens import estimate_tokens
+
+    session_id, transcript = None, 0
+    prompt_tokens, resend_tokens, latencies = [], [], []
+    for i in range(turns):
+        message = f"Can you explain how {TOPICS[i % len(TOPICS)]} works, with an example for turn {i}?"
+        start = time.perf_counter()
+        result = await virtual_mentor.chat_turn(message, session_id)
+        latencies.append(time.perf_counter() - start)
+        session_id = result["session_id"]
+        prompt_tokens.append(result["prompt_tokens"])
+        resend_tokens.append(transcript + estimate_tokens(message))
+        transcript += estimate_tokens(message) + estimate_tokens(result["reply"])
+
+    await asyncio.gather(*virtual_mentor._compactions)
+    session = virtual_mentor.sessions.get(session_id)
+    marks = sorted({1, 10, 25, 50, turns} & set(range(1, turns + 1)))
+    return {
+        "turns": turns,
+        "history_budget_tokens": virtual_mentor.MENTOR_HISTORY_TOKENS,
+        "prompt_tokens_at_turn": {n: prompt_tokens[n - 1] for n in marks},
+        "resend_tokens_at_turn": {n: resend_tokens[n - 1] for n in marks},
+        "max_prompt_tokens": max(prompt_tokens),
+        "total_prompt_tokens": sum(prompt_tokens),
+        "total_resend_tokens": sum(resend_tokens),
+        "compactions": session["compactions"],
+        "turn_latency": latency_summary(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    prepare_env(args.llm_latency)
+    report("mentor_session", asyncio.run(run(args.turns)))
+
+
+if __name__ == "__main__":
+    main()
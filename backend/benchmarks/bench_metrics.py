@@ -0,0 +1,108 @@
+"""
+Metrics overhead: per-request cost of MetricsMiddleware on a trivial route,
+per-call cost of span()/record()/inc(), and /metrics render time.
+
+    python -m backend.benchmarks.bench_metrics --requests 20000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from backend.benchmarks._common import prepare_env, report
+
+
+def per_call_ns(fn, n: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter_ns() - start) / n
+
+
+SCOPE = {
+    "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+    "scheme": "http", "path": "/ping/42", "raw_path": b"/ping/42", "query_string": b"",
+    "root_path": "", "headers": [(b"host", b"bench")], "server": ("bench", 80), "client": ("bench", 1),
+}
+
+
+async def request_us(app, n: int) -> float:
+    """
+    Mean microseconds per request, calling the ASGI app directly (no client or
+    transport noise, which would dwarf the few microseconds being measured).
+    """
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(SCOPE), receive, send)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+async def run(requests: int, rounds: int, calls: int) -> dict:
+    from fastapi import FastAPI
+
+    from backend.utils import metrics
+
+    def make_app(instrumented: bool):
+        app = FastAPI()
+
+        @app.get("/ping/{n}")
+        async def ping(n: int):
+            return {"n": n}
+
+        if instrumented:
+            app.add_middleware(metrics.MetricsMiddleware)
+        return app
+
+    plain, instrumented = make_app(False), make_app(True)
+    await request_us(plain, 1000)                # warm up both apps
+    await request_us(instrumented, 1000)
+    without, with_middleware = [], []
+    for _ in range(rounds):                      # interleave to spread noise evenly
+        without.append(await request_us(plain, requests // rounds))
+        with_middleware.append(await request_us(instrumented, requests // rounds))
+    base = statistics.median(without)
+    overhead = statistics.median(w - b for w, b in zip(with_middleware, without))
+
+    def spanned():
+        with metrics.span("bench"):
+            pass
+
+    empty_ns = per_call_ns(lambda: None, calls)
+    render_start = time.perf_counter()
+    text = metrics.render_prometheus()
+    render_ms = (time.perf_counter() - render_start) * 1000
+
+    return {
+        "requests": requests,
+        "request_us_without_middleware": round(base, 1),
+        "request_us_with_middleware": round(statistics.median(with_middleware), 1),
+        "middleware_overhead_us": round(overhead, 1),
+        "middleware_overhead_pct": round(overhead / base * 100, 2),
+        "span_ns": round(per_call_ns(spanned, calls) - empty_ns),
+        "record_ns": round(per_call_ns(lambda: metrics.record("bench_seconds", 0.01, route="/x"), calls) - empty_ns),
+        "inc_ns": round(per_call_ns(lambda: metrics.inc("bench_total", kind="x"), calls) - empty_ns),
+        "render_ms": round(render_ms, 3),
+        "render_bytes": len(text),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=40)
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+
+    prepare_env()
+    report("metrics_overhead", asyncio.run(run(args.requests, args.rounds, args.calls)))
+
+
+if __name__ == "__main__":
+    main()
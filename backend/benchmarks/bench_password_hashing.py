@@ -0,0 +1,57 @@
+"""
+Login verifications/sec through the bcrypt process pool, per worker count.
+
+    python -m backend.benchmarks.bench_password_hashing --logins 200
+    BCRYPT_ROUNDS=10 python -m backend.benchmarks.bench_password_hashing
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from backend.benchmarks._common import report
+
+
+async def run(workers: int, logins: int) -> dict:
+    os.environ["HASH_WORKERS"] = str(workers)
+    os.environ["HASH_MAX_PENDING"] = str(logins)
+    # Reload so the pool picks up the worker count for this round
+    import importlib
+    from backend.utils import executors, auth_utils
+
+    executors.shutdown_executors()
+    importlib.reload(executors)
+    importlib.reload(auth_utils)
+
+    hashed = auth_utils.hash_password("correct horse battery staple")
+    await auth_utils.verify_password_async("warmup", hashed)  # spin up the pool
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        auth_utils.verify_password_async("correct horse battery staple", hashed) for _ in range(logins)
+    ))
+    elapsed = time.perf_counter() - start
+    executors.shutdown_executors()
+    assert all(ok for ok, _ in results)
+    rate = logins / elapsed
+    return {"workers": workers, "logins_per_s": round(rate, 1), "logins_per_s_per_core": round(rate / workers, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    counts = sorted({1, 2, 4, args.max_workers} & set(range(1, args.max_workers + 1)))
+    rounds = [asyncio.run(run(w, args.logins)) for w in counts]
+    report("password_hashing", {
+        "bcrypt_rounds": int(os.getenv("BCRYPT_ROUNDS", "12")),
+        "logins": args.logins,
+        "rounds": rounds,
+    })
+
+
+if __name__ == "__main__":
+    main()
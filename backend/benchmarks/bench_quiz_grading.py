@@ -0,0 +1,123 @@
+"""
+Quiz grading: 10k submissions graded from the stored answer key (single and
+batch, in-process and over HTTP) vs the old path that re-parsed the whole quiz
+sent back by the client.
+
+    python -m backend.benchmarks.bench_quiz_grading --submissions 10000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from backend.benchmarks._common import prepare_env, report
+
+
+def make_quiz(questions: int = 10):
+    return [
+        {
+            "question": f"Question {i}: which statement about enzymes and activation energy is correct?",
+            "options": {k: f"Option {k} for question {i}, a plausible sounding sentence" for k in "ABCD"},
+            "answer": random.choice("ABCD"),
+        }
+        for i in range(questions)
+    ]
+
+
+def legacy_grade_quiz(submitted):
+    """
+    The grader this replaced: walks the client-supplied quiz, answers included.
+    """
+    results, score, total = [], 0, 0
+    quiz = submitted["quiz"]
+    answers = submitted["answers"]
+    for i, item in enumerate(quiz):
+        total += 1
+        correct = item.get("answer", "").upper().strip()
+        sel = answers.get(str(i), "").upper()
+        ok = sel == correct
+        if ok:
+            score += 1
+        results.append({"index": i, "selected": sel, "correct": correct, "ok": ok})
+    return {"score": score, "total": total, "results": results}
+
+
+def rate(count: int, seconds: float) -> dict:
+    return {"per_s": round(count / seconds), "us_per_submission": round(seconds / count * 1e6, 2)}
+
+
+async def run(submissions: int, http_singles: int) -> dict:
+    import httpx
+
+    from backend.main import fastapi_app
+    from backend.utils.quiz_store import quiz_store
+
+    quiz = make_quiz()
+    quiz_id = quiz_store.put(quiz)
+    answers = [{str(i): random.choice("ABCD") for i in range(len(quiz))} for _ in range(submissions)]
+    legacy_bodies = [json.dumps({"quiz": quiz, "answers": a}) for a in answers]
+    new_bodies = [json.dumps({"quiz_id": quiz_id, "answers": a}) for a in answers]
+
+    start = time.perf_counter()
+    for body in legacy_bodies:
+        legacy_grade_quiz(json.loads(body))
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for body in new_bodies:
+        payload = json.loads(body)
+        quiz_store.grade(payload["quiz_id"], payload["answers"])
+    single = time.perf_counter() - start
+
+    batch_body = json.dumps({"quiz_id": quiz_id, "submissions": [{"student": f"s{i}", "answers": a}
+                                                                 for i, a in enumerate(answers)]})
+    start = time.perf_counter()
+    payload = json.loads(batch_body)
+    quiz_store.grade_many(payload["quiz_id"], payload["submissions"])
+    batch = time.perf_counter() - start
+
+    transport = httpx.ASGITransport(app=fastapi_app)
+    headers = {"content-type": "application/json"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        for body in new_bodies[:http_singles]:
+            (await client.post("/assistant/quiz/submit", content=body, headers=headers)).raise_for_status()
+        http_single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        (await client.post("/assistant/quiz/submit/batch", content=batch_body, headers=headers)).raise_for_status()
+        http_batch = time.perf_counter() - start
+        stats = (await client.get(f"/assistant/quiz/{quiz_id}/stats")).json()
+
+    return {
+        "submissions": submissions,
+        "questions": len(quiz),
+        "request_bytes": {"legacy": round(sum(map(len, legacy_bodies)) / submissions),
+                          "quiz_id": round(sum(map(len, new_bodies)) / submissions)},
+        "in_process": {
+            "legacy_full_quiz": rate(submissions, legacy),
+            "stored_key_single": rate(submissions, single),
+            "stored_key_batch": rate(submissions, batch),
+        },
+        "http": {
+            "single_requests": {"requests": http_singles, **rate(http_singles, http_single)},
+            "one_batch_request": {"seconds": round(http_batch, 3), **rate(submissions, http_batch)},
+        },
+        "aggregate_attempts": stats["attempts"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--submissions", type=int, default=10000)
+    parser.add_argument("--http-singles", type=int, default=2000, help="individual HTTP submits to time")
+    args = parser.parse_args()
+
+    prepare_env()
+    report("quiz_grading", asyncio.run(run(args.submissions, args.http_singles)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Contextual mentor retrieval: index build time, top-k query latency, prompt
+tokens and answer coverage vs sending context[:4000] or the whole document.
+
+    python -m backend.benchmarks.bench_retrieval --sections 300 --queries 500
+"""
+
+import argparse
+import random
+import time
+
+from backend.benchmarks._common import latency_summary, report
+from backend.utils.retrieval import RETRIEVAL_TOP_K, DocumentIndexStore
+from backend.utils.tokens import estimate_tokens
+
+TRUNCATE_CHARS = 4000
+FILLER = (
+    "energy cell membrane protein reaction process structure function system model data "
+    "theory example result value change rate force mass light water carbon oxygen plant "
+    "animal network signal layer method analysis pattern growth level factor"
+).split()
+
+
+def make_notes(sections: int, words_per_section: int = 180, seed: int = 7):
+    """
+    Lecture-like notes where section i holds one planted fact about `topic{i}`.
+    Returns (text, [(question, fact), ...]).
+    """
+    rng = random.Random(seed)
+    parts, facts = [], []
+    for i in range(sections):
+        topic = f"topic{i}"
+        fact = f"The {topic} threshold equals {rng.randint(100, 999)} units."
+        words = [rng.choice(FILLER) for _ in range(words_per_section)]
+        words.insert(rng.randint(0, len(words)), f"{fact} In {topic} studies")
+        parts.append(f"Section {i}: {topic}. " + " ".join(words) + ".")
+        facts.append((f"What is the {topic} threshold?", fact))
+    return "\n\n".join(parts), facts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sections", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=RETRIEVAL_TOP_K)
+    args = parser.parse_args()
+
+    text, facts = make_notes(args.sections)
+    store = DocumentIndexStore()
+    start = time.perf_counter()
+    document_id, index = store.add(text)
+    build = time.perf_counter() - start
+
+    rng = random.Random(1)
+    latencies, tokens, hits, truncated_hits = [], [], 0, 0
+    for _ in range(args.queries):
+        question, fact = rng.choice(facts)
+        start = time.perf_counter()
+        context = store.get(document_id).context(question, args.top_k)
+        latencies.append(time.perf_counter() - start)
+        tokens.append(estimate_tokens(context))
+        hits += fact in context
+        truncated_hits += fact in text[:TRUNCATE_CHARS]
+
+    report("retrieval", {
+        "document_chars": len(text),
+        "chunks": len(index.chunks),
+        "index_build_ms": round(build * 1000, 2),
+        "index_bytes": index.nbytes(),
+        "query_latency": latency_summary(latencies),
+        "prompt_context_tokens": {
+            "full_document": estimate_tokens(text),
+            "truncated_4000": estimate_tokens(text[:TRUNCATE_CHARS]),
+            "top_k_mean": round(sum(tokens) / len(tokens), 1),
+        },
+        "fact_coverage": {
+            "truncated_4000": round(truncated_hits / args.queries, 3),
+            "top_k": round(hits / args.queries, 3),
+        },
+    })
+
+
+if __name__ == "__main__":
+    main()
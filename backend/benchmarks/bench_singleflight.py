@@ -0,0 +1,49 @@
+"""
+Request coalescing check: N concurrent identical quiz requests against a slow
+fake model must produce exactly one upstream call.
+
+    python -m backend.benchmarks.bench_singleflight --callers 50 --llm-latency 2
+"""
+
+import argparse
+import asyncio
+import time
+
+from backend.benchmarks._common import prepare_env, report
+
+TEXT = "Photosynthesis converts light energy into chemical energy stored in glucose. " * 40
+
+
+async def run(callers: int) -> dict:
+    from backend.routers import assistant
+    from backend.utils import llm_client
+
+    model = llm_client.get_model(assistant.GEMINI_MODEL)
+    before = model.calls
+    start = time.perf_counter()
+    quizzes = await asyncio.gather(*(assistant.generate_quiz(TEXT) for _ in range(callers)))
+    elapsed = time.perf_counter() - start
+    upstream = model.calls - before
+
+    assert upstream == 1, f"expected 1 upstream call, got {upstream}"
+    assert all(q == quizzes[0] and q for q in quizzes)
+    return {
+        "callers": callers,
+        "upstream_calls": upstream,
+        "seconds": round(elapsed, 3),
+        "single_flight": llm_client.single_flight.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--callers", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=2.0)
+    args = parser.parse_args()
+
+    prepare_env(args.llm_latency)
+    report("singleflight", asyncio.run(run(args.callers)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Cold-start benchmark for backend.main:app.
+
+Imports the app in a fresh interpreter several times and reports wall time and
+resident memory. `--warmup` also loads both HuggingFace summarizers, which is
+what every worker paid at import time before the model registry existed.
+
+    python -m backend.benchmarks.bench_startup --runs 5
+    python -m backend.benchmarks.bench_startup --runs 3 --warmup
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from backend.benchmarks._common import prepare_env, report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+import backend.main
+imported = time.perf_counter() - start
+if {warmup}:
+    backend.main.assistant.summarizers.warmup()
+total = time.perf_counter() - start
+from backend.utils.model_registry import current_rss_bytes
+print(json.dumps({{"import_s": imported, "total_s": total, "rss_mb": current_rss_bytes() / 2**20}}))
+"""
+
+
+def run_once(warmup: bool) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD.format(warmup=warmup)],
+        capture_output=True, text=True, check=True, cwd=ROOT, env=os.environ.copy(),
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", action="store_true")
+    args = parser.parse_args()
+
+    prepare_env()
+    runs = [run_once(args.warmup) for _ in range(args.runs)]
+    report("startup", {
+        "runs": args.runs,
+        "warmup": args.warmup,
+        "import_s_median": round(statistics.median(r["import_s"] for r in runs), 3),
+        "total_s_median": round(statistics.median(r["total_s"] for r in runs), 3),
+        "rss_mb_median": round(statistics.median(r["rss_mb"] for r in runs), 1),
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Quiz/flowchart reply parsing over a corpus of model outputs: wasted calls,
+follow-up repair calls and parse time, old string-slicing parsers vs schema
+validation with per-item salvage.
+
+    python -m backend.benchmarks.bench_structured_output --repeat 200
+
+The default corpus (backend/benchmarks/data/llm_outputs.jsonl) holds clean replies
+plus the failure modes seen without JSON mode (fences, commentary, Python quoting,
+trailing commas, truncation, loose answer formats). Set LLM_RECORD_PATH on a
+server to record real replies and pass that file with --corpus.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import time
+from collections import Counter, defaultdict
+
+from backend.benchmarks._common import prepare_env, report
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "data", "llm_outputs.jsonl")
+
+
+# ---------------------------
+# The parsers this replaced (string handling of generate_flowchart / generate_quiz)
+# ---------------------------
+def legacy_flowchart(txt: str):
+    try:
+        txt = txt.strip()
+        txt = txt.replace("'", '"')
+        txt = re.sub(r"```(?:json)?|```", "", txt)
+        txt = txt.strip()
+        try:
+            json_part = txt[txt.index("{"): txt.rindex("}") + 1]
+        except Exception:
+            json_part = txt
+        data = json.loads(json_part)
+        if isinstance(data, dict) and "nodes" in data:
+            return data
+        return {"nodes": [], "edges": []}
+    except Exception:
+        return {"nodes": [], "edges": []}
+
+
+def legacy_quiz(txt: str):
+    try:
+        txt = txt.strip()
+        json_text = txt[txt.index("["): txt.rindex("]") + 1]
+        parsed = json.loads(json_text)
+        quiz = []
+        for item in parsed[:10]:
+            q = item.get("question", "").strip()
+            opts = item.get("options", {})
+            ans = item.get("answer", "").strip().upper()
+            normalized = {k: opts.get(k, "").strip() for k in ["A", "B", "C", "D"]}
+            if q:
+                quiz.append({"question": q, "options": normalized, "answer": ans})
+        return quiz
+    except Exception:
+        return []
+
+
+# ---------------------------
+# Outcomes
+# ---------------------------
+def new_outcome(kind: str, text: str, questions: int):
+    from backend.utils.structured import parse_flowchart, parse_quiz
+
+    if kind == "quiz":
+        quiz, dropped = parse_quiz(text)
+        if not quiz:
+            return "wasted", 0
+        if len(quiz) < questions:
+            return "follow_up", len(quiz)
+        return ("salvaged" if dropped else "valid"), len(quiz)
+    chart, dropped = parse_flowchart(text)
+    if not chart["nodes"]:
+        return "wasted", 0
+    if len(chart["nodes"]) > 1 and not chart["edges"]:
+        return "follow_up", len(chart["nodes"])
+    return ("salvaged" if dropped else "valid"), len(chart["nodes"])
+
+
+def legacy_outcome(kind: str, text: str):
+    if kind == "quiz":
+        quiz = legacy_quiz(text)
+        bad = sum(1 for q in quiz if q["answer"] not in ("A", "B", "C", "D") or not all(q["options"].values()))
+        return ("wasted" if not quiz else "kept"), bad
+    chart = legacy_flowchart(text)
+    return ("wasted" if not chart.get("nodes") else "kept"), 0
+
+
+def time_per_call(fn, texts, repeat: int) -> float:
+    """
+    Median microseconds per call over `repeat` passes of the corpus.
+    """
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        rounds.append((time.perf_counter() - start) / len(texts))
+    return round(statistics.median(rounds) * 1e6, 2)
+
+
+def run(corpus_path: str, repeat: int) -> dict:
+    from backend.routers.assistant import QUIZ_QUESTIONS
+    from backend.utils.structured import parse_flowchart, parse_quiz
+
+    with open(corpus_path, encoding="utf-8") as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+    corpus = [r for r in corpus if r.get("kind") in ("quiz", "flowchart")]
+
+    results = {}
+    for kind in ("quiz", "flowchart"):
+        rows = [r for r in corpus if r["kind"] == kind]
+        if not rows:
+            continue
+        legacy, new, bad_keys = Counter(), Counter(), 0
+        cases = defaultdict(lambda: {"count": 0, "legacy_wasted": 0, "new": Counter()})
+        for row in rows:
+            old, bad = legacy_outcome(kind, row["text"])
+            outcome, _ = new_outcome(kind, row["text"], QUIZ_QUESTIONS)
+            legacy[old] += 1
+            bad_keys += bad
+            new[outcome] += 1
+            case = cases[row.get("case", "recorded")]
+            case["count"] += 1
+            case["legacy_wasted"] += old == "wasted"
+            case["new"][outcome] += 1
+
+        texts = [r["text"] for r in rows]
+        clean = [r["text"] for r in rows if r.get("case", "clean") == "clean"]
+        legacy_fn, new_fn = (legacy_quiz, parse_quiz) if kind == "quiz" else (legacy_flowchart, parse_flowchart)
+        results[kind] = {
+            "outputs": len(rows),
+            "legacy_wasted_rate": round(legacy["wasted"] / len(rows), 3),
+            "new_wasted_rate": round(new["wasted"] / len(rows), 3),
+            "new_follow_up_rate": round(new["follow_up"] / len(rows), 3),
+            "new_outcomes": dict(new),
+            "legacy_questions_with_unusable_key": bad_keys if kind == "quiz" else None,
+            "parse_us": {
+                "legacy_all": time_per_call(legacy_fn, texts, repeat),
+                "new_all": time_per_call(new_fn, texts, repeat),
+                "legacy_clean": time_per_call(legacy_fn, clean, repeat) if clean else None,
+                "new_clean": time_per_call(new_fn, clean, repeat) if clean else None,
+            },
+            "by_case": {
+                name: {"count": c["count"], "legacy_wasted": c["legacy_wasted"], "new": dict(c["new"])}
+                for name, c in sorted(cases.items())
+            },
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL of {kind, text[, case]}")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    prepare_env()
+    report("structured_output", {"corpus": args.corpus, **run(args.corpus, args.repeat)})
+
+
+if __name__ == "__main__":
+    main()
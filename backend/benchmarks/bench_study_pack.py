@@ -0,0 +1,99 @@
+"""
+Study pack: one upload to /assistant/study-pack (extract once, generators in
+parallel, parts streamed as NDJSON) vs the frontend's four sequential calls.
+
+    python -m backend.benchmarks.bench_study_pack --documents 10 --llm-latency 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from backend.benchmarks._common import latency_summary, make_docx_bytes, prepare_env, report
+
+SEQUENCE = ["/assistant/summarize/quick", "/assistant/summarize/detailed", "/assistant/flowchart", "/assistant/quiz"]
+
+
+def upload(data: bytes):
+    return {"file": ("lecture.docx", data, "application/octet-stream")}
+
+
+async def four_calls(client, data: bytes) -> float:
+    start = time.perf_counter()
+    for path in SEQUENCE:
+        (await client.post(path, files=upload(data))).raise_for_status()
+    return time.perf_counter() - start
+
+
+async def study_pack(client, data: bytes):
+    start = time.perf_counter()
+    first_part, parts = None, []
+    async with client.stream("POST", "/assistant/study-pack", files=upload(data)) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            item = json.loads(line)
+            if item["part"] not in ("document", "done"):
+                # Server-side timestamp: ASGITransport delivers the body only once it is complete
+                first_part = first_part or item["seconds"]
+                parts.append(item["part"])
+    return time.perf_counter() - start, first_part, parts
+
+
+async def run(documents: int, paragraphs: int) -> dict:
+    import httpx
+
+    from backend.main import fastapi_app
+    from backend.routers import assistant
+
+    extractions = {"n": 0}
+    extract = assistant.extract_document_text
+
+    async def counting_extract(*args, **kwargs):
+        extractions["n"] += 1
+        return await extract(*args, **kwargs)
+
+    assistant.extract_document_text = counting_extract
+
+    # Distinct documents per run so neither side is served from the result cache
+    sequential_docs = [make_docx_bytes(paragraphs, tag=f"seq-{i}") for i in range(documents)]
+    pack_docs = [make_docx_bytes(paragraphs, tag=f"pack-{i}") for i in range(documents)]
+    transport = httpx.ASGITransport(app=fastapi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        sequential = [await four_calls(client, data) for data in sequential_docs]
+        sequential_extractions, extractions["n"] = extractions["n"], 0
+        packs = [await study_pack(client, data) for data in pack_docs]
+
+    return {
+        "documents": documents,
+        "four_calls": {
+            "end_to_end": latency_summary(sequential),
+            "extractions_per_document": sequential_extractions / documents,
+        },
+        "study_pack": {
+            "end_to_end": latency_summary([total for total, _, _ in packs]),
+            "first_part": latency_summary([first for _, first, _ in packs]),
+            "extractions_per_document": extractions["n"] / documents,
+            "part_order": packs[0][2],
+        },
+        "speedup_p50": round(
+            latency_summary(sequential)["p50_ms"] / latency_summary([t for t, _, _ in packs])["p50_ms"], 2
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=10)
+    parser.add_argument("--paragraphs", type=int, default=200)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    prepare_env(args.llm_latency)
+    report("study_pack", asyncio.run(run(args.documents, args.paragraphs)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Code-explainer tier routing: latency and estimated cost per tier over the
+snippet corpus, compared with sending everything to pro.
+
+    python -m backend.benchmarks.eval_explainer_tiers --llm-latency 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import defaultdict
+
+from backend.benchmarks._common import latency_summary, prepare_env, report
+
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "snippets.jsonl")
+
+# USD per 1M (input, output) tokens; override with --prices tier=in:out,...
+PRICES = {"local": (0.0, 0.0), "flash": (0.30, 2.50), "pro": (1.25, 10.00)}
+
+
+def load_corpus(path: str = CORPUS, large: int = 4) -> list:
+    """
+    Corpus snippets plus `large` synthetic modules (snippets of one language
+    concatenated) so the pro tier is exercised.
+    """
+    with open(path, encoding="utf-8") as f:
+        snippets = [json.loads(line) for line in f if line.strip()]
+    by_language = defaultdict(list)
+    for s in snippets:
+        by_language[s["language"]].append(s["code"])
+    for i, (language, codes) in enumerate(sorted(by_language.items())[:large]):
+        body = "\n\n".join(codes)
+        code = "\n\n".join([body] * (200 // (body.count("\n") + 1) + 1))
+        snippets.append({"id": f"large-{language.lower()}", "language": language, "code": code})
+    return snippets
+
+
+async def evaluate(snippets: list, force: str = "") -> dict:
+    from backend.routers import explainer
+    from backend.utils.tokens import estimate_tokens
+
+    explainer.EXPLAINER_FORCE_TIER = force
+    latencies, usage = defaultdict(list), defaultdict(lambda: [0, 0])
+    for s in snippets:
+        start = time.perf_counter()
+        result = await explainer.explain_code(explainer.CodeInput(code=s["code"]))
+        tier = result["tier"]
+        latencies[tier].append(time.perf_counter() - start)
+        if tier != "local":
+            usage[tier][0] += estimate_tokens(s["code"]) + 50  # instructions around the code
+            usage[tier][1] += estimate_tokens(result["explanation"])
+
+    tiers, total_cost = {}, 0.0
+    for tier, samples in sorted(latencies.items()):
+        tokens_in, tokens_out = usage[tier]
+        price_in, price_out = PRICES[tier]
+        cost = (tokens_in * price_in + tokens_out * price_out) / 1_000_000
+        total_cost += cost
+        tiers[tier] = {
+            **latency_summary(samples),
+            "input_tokens": tokens_in,
+            "output_tokens": tokens_out,
+            "cost_usd": round(cost, 6),
+        }
+    return {"tiers": tiers, "total_seconds": round(sum(map(sum, latencies.values())), 3),
+            "total_cost_usd": round(total_cost, 6)}
+
+
+async def compare(snippets: list):
+    return await evaluate(snippets), await evaluate(snippets, force="pro")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--large", type=int, default=4, help="synthetic large modules to add")
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--prices", default="", help="e.g. flash=0.3:2.5,pro=1.25:10")
+    args = parser.parse_args()
+
+    for part in filter(None, args.prices.split(",")):
+        tier, rates = part.split("=", 1)
+        price_in, price_out = rates.split(":", 1)
+        PRICES[tier.strip()] = (float(price_in), float(price_out))
+
+    prepare_env(args.llm_latency)
+    snippets = load_corpus(args.corpus, args.large)
+    routed, baseline = asyncio.run(compare(snippets))
+    report("explainer_tiers", {
+        "snippets": len(snippets),
+        "routed": routed,
+        "all_pro": baseline,
+        "cost_saving": round(1 - routed["total_cost_usd"] / max(baseline["total_cost_usd"], 1e-12), 3),
+        "latency_saving": round(1 - routed["total_seconds"] / max(baseline["total_seconds"], 1e-12), 3),
+    })
+
+
+if __name__ == "__main__":
+    main()
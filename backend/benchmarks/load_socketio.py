@@ -0,0 +1,176 @@
+"""
+Socket.IO load generator: opens N websocket connections in session rooms of
+--room-size, has one member per room send chat_message each round, and reports
+messages/sec plus end-to-end and fan-out latency.
+
+    python -m backend.benchmarks.load_socketio --spawn --connections 5000 --room-size 10
+    python -m backend.benchmarks.load_socketio --url ws://127.0.0.1:8000 --connections 5000
+
+--spawn starts uvicorn with the fake LLM backend. For several workers set
+SOCKETIO_MESSAGE_QUEUE=redis://... so rooms are shared across them. Needs the
+`websockets` package (installed with uvicorn[standard]) and `ulimit -n` above
+the connection count.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+from backend.benchmarks._common import latency_summary, report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class Client:
+    """
+    Minimal Engine.IO v4 / Socket.IO v5 websocket client (text events only).
+    """
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/") + "/socket.io/?EIO=4&transport=websocket"
+        self.ws = None
+        self.events = asyncio.Queue()
+        self.reader = None
+
+    async def connect(self):
+        import websockets
+
+        self.ws = await websockets.connect(self.url, max_size=None, open_timeout=60, ping_interval=None)
+        await self.ws.recv()                   # "0{...}" engine.io open
+        await self.ws.send("40")               # socket.io connect
+        while not (await self.ws.recv()).startswith("40"):
+            pass
+        self.reader = asyncio.ensure_future(self._read())
+
+    async def _read(self):
+        try:
+            async for message in self.ws:
+                if message == "2":
+                    await self.ws.send("3")    # engine.io ping -> pong
+                elif message.startswith("42"):
+                    event, *args = json.loads(message[2:])
+                    self.events.put_nowait((time.perf_counter(), event, args[0] if args else None))
+        except Exception:
+            pass  # closed by the server (e.g. dropped as a slow consumer)
+
+    async def emit(self, event: str, data):
+        await self.ws.send("42" + json.dumps([event, data]))
+
+    async def wait_for(self, event: str, timeout: float):
+        deadline = time.perf_counter() + timeout
+        while True:
+            received, name, data = await asyncio.wait_for(self.events.get(), deadline - time.perf_counter())
+            if name == event:
+                return received, data
+
+    async def close(self):
+        if self.reader:
+            self.reader.cancel()
+        await self.ws.close()
+
+
+def spawn_server(port: int, workers: int, llm_latency: float):
+    env = os.environ.copy()
+    env.setdefault("LLM_BACKEND", "fake")
+    env["FAKE_LLM_LATENCY"] = str(llm_latency)
+    env.setdefault("LLM_QUOTAS", "models/gemini-2.5-flash=1000000:1000000000")
+    env.setdefault("LLM_MAX_CONCURRENCY", "10000")
+    if workers > 1 and not env.get("SOCKETIO_MESSAGE_QUEUE"):
+        print("⚠️ --workers > 1 without SOCKETIO_MESSAGE_QUEUE: rooms will not span workers", file=sys.stderr)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--ws-max-queue", "64"],
+        cwd=ROOT, env=env,
+    )
+
+
+async def open_clients(url: str, n: int, parallel: int):
+    slots = asyncio.Semaphore(parallel)
+
+    async def one():
+        async with slots:
+            client = Client(url)
+            await client.connect()
+            return client
+
+    return await asyncio.gather(*(one() for _ in range(n)))
+
+
+async def run(args) -> dict:
+    start = time.perf_counter()
+    clients = await open_clients(args.url, args.connections, args.parallel_connects)
+    connect_seconds = time.perf_counter() - start
+
+    rooms = [clients[i:i + args.room_size] for i in range(0, len(clients), args.room_size)]
+    session_ids = [f"load-{uuid.uuid4().hex[:8]}-{i}" for i in range(len(rooms))]
+    for room, session_id in zip(rooms, session_ids):
+        for client in room:
+            await client.emit("join_session", {"session_id": session_id})
+    await asyncio.gather(*(c.wait_for("session_joined", args.timeout) for c in clients))
+
+    end_to_end, fan_out, delivered, errors = [], [], 0, 0
+    start = time.perf_counter()
+    for round_no in range(args.rounds):
+        async def one_room(room, session_id):
+            sent = time.perf_counter()
+            await room[0].emit("chat_message", {"text": f"Explain osmosis, round {round_no}", "session_id": session_id})
+            return sent, await asyncio.gather(
+                *(c.wait_for("chat_message", args.timeout) for c in room), return_exceptions=True
+            )
+
+        for sent, results in await asyncio.gather(*(one_room(r, s) for r, s in zip(rooms, session_ids))):
+            times = [received for received, _ in (r for r in results if not isinstance(r, BaseException))]
+            errors += len(results) - len(times)
+            delivered += len(times)
+            end_to_end += [t - sent for t in times]
+            if times:
+                fan_out.append(max(times) - min(times))
+    elapsed = time.perf_counter() - start
+
+    await asyncio.gather(*(c.close() for c in clients), return_exceptions=True)
+    return {
+        "connections": len(clients),
+        "room_size": args.room_size,
+        "rounds": args.rounds,
+        "connect_seconds": round(connect_seconds, 2),
+        "messages_sent": len(rooms) * args.rounds,
+        "messages_delivered": delivered,
+        "delivery_errors": errors,
+        "delivered_per_s": round(delivered / elapsed, 1),
+        "end_to_end_latency": latency_summary(end_to_end),
+        "fan_out_spread": latency_summary(fan_out),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="ws://127.0.0.1:8765")
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--room-size", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--parallel-connects", type=int, default=200)
+    parser.add_argument("--spawn", action="store_true", help="start uvicorn on the --url port")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        server = spawn_server(int(args.url.rsplit(":", 1)[1]), args.workers, args.llm_latency)
+        time.sleep(8)
+    try:
+        report("socketio_load", asyncio.run(run(args)))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+End-to-end benchmark suite: runs the real backend.main:app under uvicorn with
+the fake LLM backend, drives concurrent load per endpoint over HTTP and
+Socket.IO, and reports throughput, p50/p95/p99 latency and peak server RSS
+per scenario as JSON that can be compared across commits.
+
+    python -m backend.benchmarks.suite --output bench-$(git rev-parse --short HEAD).json
+    python -m backend.benchmarks.suite --scenarios explain,mentor_chat --concurrency 32 --requests 400
+    python -m backend.benchmarks.suite --compare bench-main.json
+
+Fixtures are generated PDF/DOCX/PPTX/PNG lectures (distinct bytes per request
+unless --repeat-documents, so caches do not hide the work) and the code
+snippets in data/snippets.jsonl. The PNG scenario needs the tesseract binary.
+RSS is the uvicorn process plus its extraction/OCR pool children (Linux /proc).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+from backend.benchmarks._common import (
+    latency_summary, make_docx_bytes, make_pdf_bytes, make_png_bytes, make_pptx_bytes, report,
+)
+from backend.benchmarks.load_socketio import Client, ROOT, spawn_server
+
+SNIPPETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "snippets.jsonl")
+DOCUMENT_TYPES = {
+    "pdf": lambda tag: make_pdf_bytes(10, tag=tag),
+    "docx": lambda tag: make_docx_bytes(200, tag=tag),
+    "pptx": lambda tag: make_pptx_bytes(20, tag=tag),
+}
+QUESTIONS = ["What does the lecture say about photosynthesis?", "Summarize the part on enzymes.",
+             "How is ATP produced?", "Explain osmosis with an example."]
+
+
+# ---------------------------
+# Server memory
+# ---------------------------
+def rss_bytes(pid: int) -> int:
+    """
+    Resident memory of `pid` and all its descendants, 0 if unavailable.
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            rss = next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmRSS:"))
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            children = [int(child) for child in f.read().split()]
+    except (OSError, StopIteration, ValueError):
+        return 0
+    return rss + sum(rss_bytes(child) for child in children)
+
+
+async def sample_rss(pid: int, stop: asyncio.Event, peak: dict):
+    while not stop.is_set():
+        peak["bytes"] = max(peak["bytes"], rss_bytes(pid))
+        try:
+            await asyncio.wait_for(stop.wait(), 0.05)
+        except asyncio.TimeoutError:
+            pass
+
+
+# ---------------------------
+# Scenarios
+# ---------------------------
+class Documents:
+    """
+    Round-robin over the document types; a fresh tag per request unless repeating.
+    """
+
+    def __init__(self, types, repeat: bool, builders=DOCUMENT_TYPES):
+        self.types = list(types)
+        self.repeat = repeat
+        self.builders = builders
+        self._cache = {}
+
+    def build(self, count: int):
+        docs = []
+        for i in range(count):
+            ext = self.types[i % len(self.types)]
+            tag = "bench" if self.repeat else f"{uuid.uuid4().hex[:8]}-{i}"
+            key = (ext, tag)
+            if key not in self._cache:
+                self._cache[key] = self.builders[ext](tag)
+            docs.append((f"lecture-{i}.{ext}", self._cache[key]))
+        return docs
+
+
+def upload_scenario(path: str, stream: bool = False, image: bool = False):
+    async def setup(client, args, count):
+        if image:
+            documents = Documents(["png"], args.repeat_documents, {"png": lambda tag: make_png_bytes(20, tag=tag)})
+        else:
+            documents = Documents(args.types, args.repeat_documents)
+        return {"docs": documents.build(count)}
+
+    async def call(client, state, i):
+        filename, data = state["docs"][i]
+        files = {"file": (filename, data, "application/octet-stream")}
+        if not stream:
+            return await client.post(path, files=files)
+        async with client.stream("POST", path, files=files) as response:
+            async for _ in response.aiter_lines():
+                pass
+            return response
+
+    return setup, call
+
+
+async def explain_setup(client, args, count):
+    with open(SNIPPETS) as f:
+        snippets = [json.loads(line)["code"] for line in f if line.strip()]
+    return {"snippets": snippets}
+
+
+async def explain_call(client, state, i):
+    snippets = state["snippets"]
+    return await client.post("/explainer/explain", json={"code": snippets[i % len(snippets)]})
+
+
+async def chat_setup(client, args, count):
+    return {"sessions": {}}
+
+
+async def chat_call(client, state, i):
+    # One conversation per concurrent worker, so histories grow as in real use
+    worker = asyncio.current_task().get_name()
+    params = {"message": QUESTIONS[i % len(QUESTIONS)]}
+    if worker in state["sessions"]:
+        params["session_id"] = state["sessions"][worker]
+    response = await client.post("/mentor/chat", params=params)
+    if response.status_code == 200:
+        state["sessions"][worker] = response.json()["session_id"]
+    return response
+
+
+async def contextual_setup(client, args, count):
+    text = " ".join(f"Section {i}: enzymes lower activation energy; ATP is made in mitochondria; "
+                    "osmosis moves water across membranes; photosynthesis stores light energy."
+                    for i in range(400))
+    response = await client.post("/mentor/documents", json={"text": text})
+    response.raise_for_status()
+    return {"document_id": response.json()["document_id"]}
+
+
+async def contextual_call(client, state, i):
+    return await client.post(
+        "/mentor/contextual", json={"message": QUESTIONS[i % len(QUESTIONS)], "document_id": state["document_id"]}
+    )
+
+
+HTTP_SCENARIOS = {
+    "summarize_quick": upload_scenario("/assistant/summarize/quick"),
+    "summarize_detailed": upload_scenario("/assistant/summarize/detailed"),
+    "flowchart": upload_scenario("/assistant/flowchart"),
+    "quiz": upload_scenario("/assistant/quiz"),
+    "study_pack": upload_scenario("/assistant/study-pack", stream=True),
+    "summarize_image": upload_scenario("/assistant/summarize/quick", image=True),
+    "explain": (explain_setup, explain_call),
+    "mentor_chat": (chat_setup, chat_call),
+    "mentor_contextual": (contextual_setup, contextual_call),
+}
+SCENARIOS = list(HTTP_SCENARIOS) + ["socketio_chat"]
+DEFAULT_SCENARIOS = [s for s in SCENARIOS if s != "summarize_image"]
+
+
+async def run_http(base_url: str, name: str, args) -> tuple:
+    import httpx
+
+    setup, call = HTTP_SCENARIOS[name]
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        state = await setup(client, args, args.requests)
+        next_index = iter(range(args.requests))
+
+        async def worker():
+            for i in next_index:
+                start = time.perf_counter()
+                try:
+                    response = await call(client, state, i)
+                    if response.status_code >= 400:
+                        errors.append(f"HTTP {response.status_code}")
+                        continue
+                except Exception as e:
+                    errors.append(e.__class__.__name__)
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(asyncio.create_task(worker(), name=f"w{n}") for n in range(args.concurrency)))
+        return latencies, errors, time.perf_counter() - start
+
+
+async def run_socketio(base_url: str, args) -> tuple:
+    latencies, errors = [], []
+    clients = []
+    for _ in range(args.concurrency):
+        client = Client(base_url.replace("http", "ws", 1))
+        await client.connect()
+        clients.append(client)
+    per_client = max(1, args.requests // args.concurrency)
+
+    async def converse(n, client):
+        for i in range(per_client):
+            start = time.perf_counter()
+            await client.emit("chat_message", {"text": QUESTIONS[i % len(QUESTIONS)]})
+            try:
+                await client.wait_for("chat_message", args.timeout)
+            except asyncio.TimeoutError:
+                errors.append("TimeoutError")
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(converse(n, c) for n, c in enumerate(clients)))
+    elapsed = time.perf_counter() - start
+    await asyncio.gather(*(c.close() for c in clients), return_exceptions=True)
+    return latencies, errors, elapsed
+
+
+async def run_scenario(base_url: str, name: str, args, pid: int) -> dict:
+    stop, peak = asyncio.Event(), {"bytes": rss_bytes(pid) if pid else 0}
+    sampler = asyncio.ensure_future(sample_rss(pid, stop, peak)) if pid else None
+    try:
+        if name == "socketio_chat":
+            latencies, errors, elapsed = await run_socketio(base_url, args)
+        else:
+            latencies, errors, elapsed = await run_http(base_url, name, args)
+    finally:
+        stop.set()
+        if sampler:
+            await sampler
+    return {
+        "requests": len(latencies) + len(errors),
+        "errors": len(errors),
+        "error_kinds": sorted(set(errors))[:5],
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency": latency_summary(latencies),
+        "peak_rss_mb": round(peak["bytes"] / 2 ** 20, 1) if pid else None,
+    }
+
+
+# ---------------------------
+# Comparison
+# ---------------------------
+def change_pct(new: float, old: float):
+    return round((new - old) / old * 100, 1) if old else None
+
+
+def compare(results: dict, baseline: dict) -> dict:
+    """
+    Percent change per scenario vs a previous run (negative latency = faster).
+    """
+    changes = {}
+    for name, result in results["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        changes[name] = {
+            "throughput_pct": change_pct(result["throughput_rps"], old["throughput_rps"]),
+            **{f"{p}_pct": change_pct(result["latency"][f"{p}_ms"], old["latency"][f"{p}_ms"])
+               for p in ("p50", "p95", "p99")},
+            "peak_rss_pct": change_pct(result["peak_rss_mb"] or 0, old.get("peak_rss_mb") or 0),
+        }
+    return {"baseline_commit": baseline.get("commit"), "changes": changes}
+
+
+def git_commit() -> dict:
+    def git(*cmd):
+        return subprocess.run(["git", *cmd], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+
+    return {"commit": git("rev-parse", "--short", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "-uno"))}
+
+
+async def wait_ready(base_url: str, timeout: float = 60):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while True:
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Server at {base_url} did not start within {timeout}s")
+            await asyncio.sleep(0.25)
+
+
+async def run(args, pid: int) -> dict:
+    await wait_ready(args.url)
+    results = {}
+    for name in args.scenarios:
+        print(f"▶ {name}", file=sys.stderr)
+        results[name] = await run_scenario(args.url, name, args, pid)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", default=",".join(DEFAULT_SCENARIOS),
+                        help=f"comma-separated: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="per scenario")
+    parser.add_argument("--types", default="pdf,docx,pptx", help="document types for upload scenarios")
+    parser.add_argument("--repeat-documents", action="store_true", help="reuse one document per type (cache hits)")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--llm-tokens-per-sec", type=float, default=400)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--url", default=None, help="benchmark a running server instead of spawning one")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--output", help="also write the JSON report here")
+    parser.add_argument("--compare", help="JSON report of an earlier run")
+    args = parser.parse_args()
+    args.scenarios = [s for s in args.scenarios.split(",") if s]
+    args.types = [t for t in args.types.split(",") if t]
+    unknown = set(args.scenarios) - set(SCENARIOS) | set(args.types) - set(DOCUMENT_TYPES)
+    if unknown:
+        parser.error(f"unknown scenario/type: {', '.join(sorted(unknown))}")
+
+    server = None
+    if args.url is None:
+        args.url = f"http://127.0.0.1:{args.port}"
+        os.environ["FAKE_LLM_TOKENS_PER_SEC"] = str(args.llm_tokens_per_sec)
+        os.environ.setdefault("JOBS_DB_PATH", os.path.join(tempfile.mkdtemp(), "jobs.sqlite3"))
+        server = spawn_server(args.port, args.workers, args.llm_latency)
+    try:
+        scenarios = asyncio.run(run(args, server.pid if server else 0))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    results = {
+        **git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "concurrency": args.concurrency, "requests": args.requests, "types": args.types,
+            "repeat_documents": args.repeat_documents, "llm_latency": args.llm_latency,
+            "llm_tokens_per_sec": args.llm_tokens_per_sec, "workers": args.workers,
+            "server": "spawned" if server else args.url,
+        },
+        "scenarios": scenarios,
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            results["vs_baseline"] = compare(results, json.load(f))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "suite", **results}, f, indent=2)
+    report("suite", results)
+
+
+if __name__ == "__main__":
+    main()
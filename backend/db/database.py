@@ -1,15 +1,199 @@
+import os
+import queue
+import threading
+import time
+
 import mysql.connector
 from mysql.connector import Error
 
-def get_connection():
+from backend.utils import metrics
+
+# ---------------------------
+# Config
+# ---------------------------
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "user": os.getenv("DB_USER", "root"),        # change this
+    "password": os.getenv("DB_PASSWORD", "NewStrongPassword"),  # change this
+    "database": os.getenv("DB_NAME", "learning_ai"),
+}
+DB_POOLING = os.getenv("DB_POOLING", "1") == "1"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+# Seconds a request waits for a free connection before giving up
+DB_CHECKOUT_TIMEOUT = float(os.getenv("DB_CHECKOUT_TIMEOUT", "5"))
+# Connections idle longer than this are pinged before being handed out
+DB_HEALTHCHECK_AFTER = float(os.getenv("DB_HEALTHCHECK_AFTER", "30"))
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+def mysql_alive(conn) -> bool:
     try:
-        conn = mysql.connector.connect(
-            host="localhost",
-            user="root",        # change this
-            password="NewStrongPassword",  # change this
-            database="learning_ai"
-        )
+        conn.ping(reconnect=False)
+        return True
+    except Error:
+        return False
+
+
+# ---------------------------
+# Connection pool
+# ---------------------------
+class PooledConnection:
+    """
+    Proxy handed to callers; close() returns the connection to the pool.
+    """
+
+    def __init__(self, conn, pool: "ConnectionPool"):
+        self._conn = conn
+        self._pool = pool
+        self._checked_out = time.perf_counter()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            metrics.observe("db_connection_held_seconds", time.perf_counter() - self._checked_out)
+            self._pool.release(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Bounded pool over a `connect()` factory with checkout timeouts,
+    idle health checks and usage metrics.
+    """
+
+    def __init__(self, connect, size=DB_POOL_SIZE, timeout=DB_CHECKOUT_TIMEOUT,
+                 healthcheck=mysql_alive, healthcheck_after=DB_HEALTHCHECK_AFTER):
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.healthcheck = healthcheck
+        self.healthcheck_after = healthcheck_after
+        self._idle = queue.LifoQueue()  # (conn, returned_at); LIFO keeps hot connections hot
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.opened = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+        self.healthcheck_failures = 0
+
+    def get(self) -> PooledConnection:
+        start = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.waits += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self.timeouts += 1
+                raise PoolTimeout(f"No database connection free after {self.timeout}s")
+            with self._lock:
+                self.wait_seconds += time.perf_counter() - start
+        try:
+            conn = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+        return PooledConnection(conn, self)
+
+    def release(self, conn):
+        try:
+            if getattr(conn, "in_transaction", False):
+                conn.rollback()
+            self._idle.put((conn, time.monotonic()))
+        except Exception:
+            self._discard(conn)
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._slots.release()
+
+    def close_all(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "in_use": self.in_use,
+                "idle": self._idle.qsize(),
+                "opened": self.opened,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 4),
+                "timeouts": self.timeouts,
+                "healthcheck_failures": self.healthcheck_failures,
+            }
+
+    def _checkout(self):
+        while True:
+            try:
+                conn, returned_at = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if time.monotonic() - returned_at < self.healthcheck_after or self.healthcheck(conn):
+                return conn
+            with self._lock:
+                self.healthcheck_failures += 1
+            self._discard(conn)
+        conn = self.connect()
+        with self._lock:
+            self.opened += 1
         return conn
-    except Error as e:
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def connect_mysql():
+    return mysql.connector.connect(**DB_CONFIG)
+
+
+pool = ConnectionPool(connect_mysql)
+
+
+def pool_metrics():
+    stats = pool.stats()
+    return [
+        ("db_pool_connections", "gauge", "MySQL pool connections by state",
+         [({"state": "in_use"}, stats["in_use"]), ({"state": "idle"}, stats["idle"])]),
+        ("db_pool_waits_total", "counter", "Checkouts that had to wait", [({}, stats["waits"])]),
+        ("db_pool_timeouts_total", "counter", "Checkouts that timed out", [({}, stats["timeouts"])]),
+    ]
+
+
+metrics.register_collector(pool_metrics)
+
+
+def get_connection():
+    try:
+        with metrics.span("db_checkout"):
+            if DB_POOLING:
+                return pool.get()
+            return connect_mysql()
+    except (Error, PoolTimeout) as e:
         print("Error:", e)
         return None
@@ -0,0 +1,110 @@
+# backend/db/roster.py
+#
+# Bulk class-roster import, shared by POST /auth/bulk-import and the CLI:
+#   python -m backend.db.roster roster.csv
+
+import asyncio
+import csv
+import io
+import os
+import sys
+from typing import List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from backend.db.database import get_connection
+from backend.utils.auth_utils import hash_passwords
+from backend.utils.executors import HASH_WORKERS, run_in_hash_pool
+
+# ---------------------------
+# Config
+# ---------------------------
+HASH_BATCH = 50       # passwords per hashing task
+INSERT_BATCH = 500    # rows per executemany round trip
+# Limits for uploads to POST /auth/bulk-import (the CLI has none)
+ROSTER_MAX_BYTES = int(os.getenv("ROSTER_MAX_BYTES", str(1024 * 1024)))
+ROSTER_MAX_ROWS = int(os.getenv("ROSTER_MAX_ROWS", "2000"))
+
+
+class RosterTooLarge(Exception):
+    """
+    Raised by import_roster() when the CSV has more than `max_rows` records.
+    """
+
+
+def parse_roster(content: str) -> Tuple[List[tuple], int]:
+    """
+    Parse CSV text with a username,email,password header.
+    Returns (rows, invalid_count); duplicate emails within the file are dropped.
+    """
+    rows, seen, invalid = [], set(), 0
+    for record in csv.DictReader(io.StringIO(content)):
+        username = (record.get("username") or "").strip()
+        email = (record.get("email") or "").strip()
+        password = record.get("password") or ""
+        if not username or not email or not password or email in seen:
+            invalid += 1
+            continue
+        seen.add(email)
+        rows.append((username, email, password))
+    return rows, invalid
+
+
+async def hash_roster(rows: List[tuple]) -> List[tuple]:
+    """
+    Hash passwords in parallel batches, leaving pool headroom for live logins.
+    """
+    slots = asyncio.Semaphore(max(1, HASH_WORKERS - 1))
+
+    async def hash_batch(batch):
+        async with slots:
+            return await run_in_hash_pool(hash_passwords, [r[2] for r in batch])
+
+    batches = [rows[i:i + HASH_BATCH] for i in range(0, len(rows), HASH_BATCH)]
+    hashed = await asyncio.gather(*(hash_batch(b) for b in batches))
+    return [
+        (username, email, h)
+        for batch, hashes in zip(batches, hashed)
+        for (username, email, _), h in zip(batch, hashes)
+    ]
+
+
+def insert_users(rows: List[tuple]) -> int:
+    """
+    Batched INSERT IGNORE; rows hitting the UNIQUE keys are skipped.
+    Returns the number of users created.
+    """
+    conn = get_connection()
+    if not conn:
+        raise RuntimeError("Database connection failed")
+    cursor = conn.cursor()
+    created = 0
+    try:
+        for i in range(0, len(rows), INSERT_BATCH):
+            cursor.executemany(
+                "INSERT IGNORE INTO users (username, email, hashed_password) VALUES (%s, %s, %s)",
+                rows[i:i + INSERT_BATCH],
+            )
+            created += max(cursor.rowcount, 0)
+            conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    return created
+
+
+async def import_roster(content: str, max_rows: Optional[int] = None) -> dict:
+    rows, invalid = parse_roster(content)
+    if max_rows is not None and len(rows) + invalid > max_rows:
+        raise RosterTooLarge(f"Rosters are limited to {max_rows} rows")
+    hashed = await hash_roster(rows)
+    created = await run_in_threadpool(insert_users, hashed)
+    return {"created": created, "skipped": len(rows) - created, "invalid": invalid}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python -m backend.db.roster roster.csv")
+        sys.exit(1)
+    with open(sys.argv[1], encoding="utf-8-sig") as f:
+        print(asyncio.run(import_roster(f.read())))
@@ -1,6 +1,7 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 import socketio
+from starlette.concurrency import run_in_threadpool
 import uvicorn
 import os
 from dotenv import load_dotenv
@@ -23,13 +24,27 @@ else:
 # Routers (absolute imports)
 # ---------------------------
 from backend.routers import auth, assistant, explainer, virtual_mentor
+from backend.utils.executors import shutdown_executors
+from backend.db.database import pool as db_pool
+from backend.utils import llm_client, metrics
+from backend.utils.realtime import ConnectionRegistry, make_client_manager, session_room
+from backend.utils.jobs import job_queue
+from backend.utils.ingest import UploadLimitMiddleware, UploadRejected, ingest_bytes
 
 # ---------------------------
 # Setup FastAPI + Socket.IO
 # ---------------------------
-sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="*")
+sio = socketio.AsyncServer(
+    async_mode="asgi",
+    cors_allowed_origins="*",
+    client_manager=make_client_manager(),  # SOCKETIO_MESSAGE_QUEUE shares rooms across workers
+)
+connections = ConnectionRegistry(sio)
 fastapi_app = FastAPI(title="AI Learning SuperApp (Gemini Powered)")
 
+# Inside CORS, so browsers can read the 413 for an oversized upload
+fastapi_app.add_middleware(UploadLimitMiddleware)
+
 # ---------------------------
 # Enable CORS for frontend
 # ---------------------------
@@ -45,6 +60,9 @@ fastapi_app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so the latency includes CORS and error handling
+fastapi_app.add_middleware(metrics.MetricsMiddleware)
+
 # ---------------------------
 # Include Routers
 # ---------------------------
@@ -53,6 +71,21 @@ fastapi_app.include_router(auth.router)
 fastapi_app.include_router(assistant.router)
 fastapi_app.include_router(explainer.router)
 
+# ---------------------------
+# Lifecycle
+# ---------------------------
+@fastapi_app.on_event("startup")
+async def on_startup():
+    assistant.summarizers.start_reaper()
+    await job_queue.start()
+
+@fastapi_app.on_event("shutdown")
+async def on_shutdown():
+    await assistant.summarizers.stop_reaper()
+    await job_queue.stop()
+    shutdown_executors()
+    db_pool.close_all()
+
 # ---------------------------
 # Root endpoint
 # ---------------------------
@@ -70,6 +103,36 @@ async def root():
         ],
     }
 
+@fastapi_app.get("/db/pool")
+async def db_pool_stats():
+    """
+    MySQL connection pool metrics (in-use, waits, wait time, timeouts).
+    """
+    return db_pool.stats()
+
+@fastapi_app.get("/llm/stats")
+async def llm_stats():
+    """
+    Shared Gemini client counters (calls, retries, hedges, rate-limit waits).
+    """
+    return llm_client.stats()
+
+@fastapi_app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """
+    Prometheus scrape endpoint: route/stage latency histograms, LLM tokens,
+    fallbacks, cache hit/miss counters, DB pool and job queue gauges.
+    """
+    # Collectors query SQLite (job counts) and the DB pool; keep them off the loop
+    return Response(await run_in_threadpool(metrics.render_prometheus), media_type="text/plain; version=0.0.4")
+
+@fastapi_app.get("/socket/stats")
+async def socket_stats():
+    """
+    Socket.IO connections, queued events, backpressure rejections and drops.
+    """
+    return connections.stats()
+
 # ---------------------------
 # Wrap FastAPI with Socket.IO
 # ---------------------------
@@ -81,17 +144,98 @@ app = socketio.ASGIApp(sio, fastapi_app)
 @sio.event
 async def connect(sid, environ):
     print(f"🔌 Client connected: {sid}")
-    await sio.emit("server_message", {"msg": "Welcome to AI SuperApp (Gemini powered) 🎉"}, to=sid)
+    conn = connections.open(sid)
+    await sio.enter_room(sid, session_room(sid))
+    await conn.send("server_message", {"msg": "Welcome to AI SuperApp (Gemini powered) 🎉"})
+
+@sio.event
+async def join_session(sid, data):
+    """
+    Follow a mentor session (e.g. from a second tab); replies fan out to its room.
+    data: {"session_id": "..."}
+    """
+    session_id = (data or {}).get("session_id")
+    if session_id:
+        await sio.enter_room(sid, session_room(session_id))
+        await connections.get(sid).send("session_joined", {"session_id": session_id})
 
 @sio.event
 async def chat_message(sid, data):
+    """
+    Mentor chat over Socket.IO, sharing sessions with POST /mentor/chat.
+    data: {"text": "...", "session_id": <optional, defaults to this connection>}
+    The reply goes to the sender through its send queue and to the other
+    members of the session room on any worker.
+    """
+    conn = connections.get(sid)
     text = data.get("text", "")
-    print(f"📩 Message from {sid}: {text}")
-    await sio.emit("chat_message", {"text": f"Echo: {text}"})
+    session_id = data.get("session_id") or sid
+    if not conn.try_begin():
+        await conn.send("chat_error", {"detail": "Too many messages in flight, slow down", "retry": True})
+        return
+    try:
+        room = session_room(session_id)
+        if room not in sio.rooms(sid):
+            await sio.enter_room(sid, room)
+        async with conn.llm_slots:
+            result = await virtual_mentor.chat_turn(text, session_id)
+    except Exception as e:
+        print("⚠️ Socket mentor chat error:", e)
+        await conn.send("chat_error", {"detail": str(e)})
+        return
+    finally:
+        conn.end()
+    payload = {"text": result["reply"], "session_id": session_id}
+    await conn.send("chat_message", payload)
+    await sio.emit("chat_message", payload, room=room, skip_sid=sid)
+
+@sio.event
+async def summarize_stream(sid, data):
+    """
+    Stream a summary over Socket.IO.
+    data: {"filename": "notes.pdf", "file": <bytes>, "mode": "quick" | "detailed"}
+    Emits summary_chunk / summary_done / summary_error to the sender only.
+    """
+    mode = "detailed" if data.get("mode") == "detailed" else "quick"
+    try:
+        ext = assistant.get_extension(data.get("filename", ""))
+        # Same type, size and page checks as the HTTP upload endpoints
+        document = assistant.UploadedDocument(await ingest_bytes(data.get("file") or b"", ext))
+    except (HTTPException, UploadRejected) as e:
+        await sio.emit("summary_error", {"detail": e.detail}, to=sid)
+        return
+    try:
+        async for event, payload in assistant.summary_events(document, mode):
+            await sio.emit(f"summary_{event}", payload, to=sid)
+    except Exception as e:
+        # e.g. an unreadable file failing in the extractor
+        print("⚠️ Socket summary stream error:", e)
+        await sio.emit("summary_error", {"detail": "Could not read the document"}, to=sid)
+
+@sio.event
+async def job_subscribe(sid, data):
+    """
+    Follow a background job; job_update events carry status, progress and the result.
+    data: {"job_id": "..."}
+    """
+    job = await job_queue.get((data or {}).get("job_id", ""))
+    if job is None:
+        await connections.get(sid).send("job_error", {"detail": "Job not found"})
+        return
+    await sio.enter_room(sid, f"job:{job['id']}")
+    await connections.get(sid).send("job_update", job)
+
+async def emit_job_update(job):
+    if job is not None:
+        await sio.emit("job_update", job, room=f"job:{job['id']}")
+
+job_queue.listeners.append(emit_job_update)
 
 @sio.event
 async def disconnect(sid):
     print(f"❌ Client disconnected: {sid}")
+    connections.close(sid)
+    await run_in_threadpool(virtual_mentor.sessions.delete, sid)  # connection-scoped session, if any
 
 # ---------------------------
 # Run server
@@ -1,15 +1,28 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Body
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import os
 import re
 import json
+import time
 from dotenv import load_dotenv
-import google.generativeai as genai
-from transformers import pipeline
-import PyPDF2
-import docx
-from pptx import Presentation
-from PIL import Image
-import pytesseract
+from typing import Dict, List, Optional, Union
+from pydantic import BaseModel
+
+from backend.utils import llm_client as llm
+from backend.utils.executors import run_in_thread
+from backend.utils.extraction import SUPPORTED_EXTENSIONS, extract_document_text
+from backend.utils.ingest import IngestedFile, UploadRejected, ingest_upload
+from backend.utils.cache_utils import ResultCache, content_hash, make_key
+from backend.utils.jobs import FINISHED, QueueFull, job_queue
+from backend.utils.model_registry import ModelRegistry
+from backend.utils.quiz_store import UnknownQuiz, quiz_store
+from backend.utils.structured import (
+    EDGES_SCHEMA, FLOWCHART_SCHEMA, QUIZ_SCHEMA, dedupe_questions, json_output,
+    parse_edges, parse_flowchart, parse_quiz, record_output,
+)
+from backend.utils import metrics
 
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -37,54 +50,84 @@ load_dotenv()
 router = APIRouter(prefix="/assistant", tags=["assistant"])
 
 # ----------------------------
-# Configure Gemini API
+# Gemini (shared client: backend/utils/llm_client.py)
 # ----------------------------
-GEMINI_API_KEY = os.getenv("GOOGLE_API_KEY")
-if not GEMINI_API_KEY:
+if not llm.is_configured():
     raise RuntimeError("❌ GOOGLE_API_KEY not found in .env file.")
-genai.configure(api_key=GEMINI_API_KEY)
+GEMINI_MODEL = "models/gemini-2.5-flash"
+# Bump whenever a prompt below changes so stale cached results are not served
+PROMPT_VERSION = "2"
 
 # ----------------------------
-# Fallback models (HuggingFace)
+# Caches (extracted text by content hash, generated results by hash + mode)
 # ----------------------------
-quick_summarizer = pipeline("summarization", model="sshleifer/distilbart-cnn-12-6")
-detailed_summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+text_cache = ResultCache("document_text")
+result_cache = ResultCache("result")
 
 # ----------------------------
-# File extractors
+# Fallback models (HuggingFace, loaded lazily on first use)
 # ----------------------------
-def extract_text_from_pdf(file):
-    reader = PyPDF2.PdfReader(file)
-    return " ".join([page.extract_text() or "" for page in reader.pages])
-
-def extract_text_from_docx(file):
-    document = docx.Document(file)
-    return " ".join([p.text for p in document.paragraphs])
-
-def extract_text_from_pptx(file):
-    prs = Presentation(file)
-    text = []
-    for slide in prs.slides:
-        for shape in slide.shapes:
-            if hasattr(shape, "text"):
-                text.append(shape.text)
-    return " ".join(text)
-
-def extract_text_from_image(file):
-    return pytesseract.image_to_string(Image.open(file))
-
-def extract_text(upload_file: UploadFile):
-    fname = upload_file.filename.lower()
-    fobj = upload_file.file
-    if fname.endswith(".pdf"):
-        return extract_text_from_pdf(fobj)
-    if fname.endswith((".docx", ".doc")):
-        return extract_text_from_docx(fobj)
-    if fname.endswith((".pptx", ".ppt")):
-        return extract_text_from_pptx(fobj)
-    if fname.endswith((".png", ".jpg", ".jpeg", ".tif", ".tiff")):
-        return extract_text_from_image(fobj)
-    raise HTTPException(status_code=400, detail="Unsupported file type")
+summarizers = ModelRegistry({
+    "quick": ("summarization", "sshleifer/distilbart-cnn-12-6"),
+    "detailed": ("summarization", "facebook/bart-large-cnn"),
+})
+
+# ----------------------------
+# File extraction
+# ----------------------------
+# Prompts only ever see this many characters, so extraction stops there
+MAX_PROMPT_CHARS = 12000
+
+def get_extension(filename: str) -> str:
+    ext = os.path.splitext((filename or "").lower())[1]
+    if ext not in SUPPORTED_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Unsupported file type")
+    return ext
+
+class UploadedDocument:
+    """
+    An ingested upload (or raw bytes, for job payloads) plus its content hash,
+    used as the cache key.
+    """
+
+    def __init__(self, upload: Union[IngestedFile, bytes], ext: Optional[str] = None):
+        if not isinstance(upload, IngestedFile):
+            upload = IngestedFile(upload, ext, len(upload), content_hash(upload))
+        self.upload = upload
+        self.ext = upload.ext
+        self.digest = upload.digest
+
+    def result_key(self, mode: str) -> str:
+        return make_key(self.digest, mode, PROMPT_VERSION, GEMINI_MODEL)
+
+    async def text(self, max_chars: Optional[int] = None) -> str:
+        """
+        Extracted text (at least `max_chars` of it, or all when None), served from
+        the text cache when the same bytes were seen before. The extractor runs on
+        the process pool so the event loop stays free for other requests and
+        Socket.IO traffic.
+        """
+        cached = await text_cache.aget(self.digest)
+        if cached is not None and (cached["complete"] or (max_chars and len(cached["text"]) >= max_chars)):
+            return cached["text"]
+        text, complete = await extract_document_text(self.upload.source, self.ext, max_chars, self.digest)
+        await text_cache.aset(self.digest, {"text": text, "complete": complete})
+        return text
+
+async def read_document(upload_file: UploadFile) -> UploadedDocument:
+    """
+    Type-check, size-limit and hash the upload before anything parses it
+    (backend/utils/ingest.py): 413 when too large, 415 when mislabeled.
+    """
+    ext = get_extension(upload_file.filename)
+    try:
+        return UploadedDocument(await ingest_upload(upload_file, ext))
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+async def extract_text(upload_file: UploadFile):
+    document = await read_document(upload_file)
+    return await document.text()
 
 # ----------------------------
 # Helpers
@@ -97,200 +140,529 @@ def clean_text(text: str) -> str:
 # ----------------------------
 # Summarization (Gemini + HF fallback)
 # ----------------------------
-def summarize_with_gemini(text: str, mode="quick"):
+def summary_prompt(mode: str) -> str:
+    if mode == "quick":
+        return (
+            "Analyze the document and list ONLY the main topics or key sections "
+            "as concise bullet points with one-line student-friendly explanations.\n\n"
+        )
+    return (
+        "Provide a detailed, topic-wise student-friendly summary of this document. "
+        "Use headings and bullet points, be clear and structured.\n\n"
+    )
+
+async def summarize_with_gemini(text: str, mode="quick"):
     try:
-        model = genai.GenerativeModel("models/gemini-2.5-flash")
-        if mode == "quick":
-            prompt = (
-                "Analyze the document and list ONLY the main topics or key sections "
-                "as concise bullet points with one-line student-friendly explanations.\n\n"
-            )
-        else:
-            prompt = (
-                "Provide a detailed, topic-wise student-friendly summary of this document. "
-                "Use headings and bullet points, be clear and structured.\n\n"
-            )
-        response = model.generate_content(prompt + text[:12000])
-        if response and getattr(response, "text", None):
-            return response.text.strip()
-        return None
+        start = time.perf_counter()
+        summary = await llm.generate_text(GEMINI_MODEL, summary_prompt(mode) + text[:MAX_PROMPT_CHARS])
+        metrics.observe("gemini_summary_seconds", time.perf_counter() - start)
+        return summary
     except Exception as e:
         print("⚠️ Gemini summarization failed:", e)
         return None
 
-def summarize_with_huggingface(text: str, mode="quick"):
-    text = clean_text(text)
-    max_chunk = 600 if mode == "quick" else 800
-    words = text.split()
-    chunks, cur = [], []
-    for w in words:
-        cur.append(w)
-        if len(cur) >= max_chunk:
-            chunks.append(" ".join(cur))
-            cur = []
-    if cur:
-        chunks.append(" ".join(cur))
-    summarizer = quick_summarizer if mode == "quick" else detailed_summarizer
+async def stream_summary_with_gemini(text: str, mode="quick"):
+    """
+    Yield summary text pieces as Gemini produces them. Records time-to-first-token
+    and total latency; exceptions propagate so the caller can fall back.
+    """
+    start = time.perf_counter()
+    first = True
+    async for piece in llm.stream(GEMINI_MODEL, summary_prompt(mode) + text[:MAX_PROMPT_CHARS]):
+        if first:
+            metrics.observe("gemini_summary_stream_ttft_seconds", time.perf_counter() - start)
+            first = False
+        yield piece
+    metrics.observe("gemini_summary_stream_seconds", time.perf_counter() - start)
+
+HF_BATCH_SIZE = int(os.getenv("HF_BATCH_SIZE", "4"))
+HF_MAX_REDUCE_ROUNDS = int(os.getenv("HF_MAX_REDUCE_ROUNDS", "3"))
+HF_PARAMS = {
+    "quick": {"chunk_tokens": 768, "max_length": 150, "min_length": 30},
+    "detailed": {"chunk_tokens": 1000, "max_length": 200, "min_length": 60},
+}
+
+def chunk_by_tokens(text: str, tokenizer, max_tokens: int):
+    """
+    Split text into pieces of at most `max_tokens` model tokens.
+    """
+    limit = min(max_tokens, tokenizer.model_max_length - 4)
+    ids = tokenizer(text, add_special_tokens=False, verbose=False)["input_ids"]
+    return [
+        tokenizer.decode(ids[i:i + limit], skip_special_tokens=True)
+        for i in range(0, len(ids), limit)
+    ]
+
+def summarize_chunks(summarizer, chunks, mode="quick"):
+    """
+    Summarize chunks in batches; on a batch failure retry one by one,
+    keeping the chunk's opening text when a single chunk fails.
+    """
+    params = HF_PARAMS[mode]
+    kwargs = dict(
+        max_length=params["max_length"],
+        min_length=params["min_length"],
+        do_sample=False,
+        truncation=True,
+    )
+    try:
+        outs = summarizer(chunks, batch_size=HF_BATCH_SIZE, **kwargs)
+        return [o["summary_text"] for o in outs]
+    except Exception as e:
+        print("⚠️ HF batch summarization failed:", e)
     summaries = []
-    for c in chunks[:3]:
+    for c in chunks:
         try:
-            out = summarizer(
-                c,
-                max_length=150 if mode == "quick" else 200,
-                min_length=30 if mode == "quick" else 60,
-                do_sample=False,
-            )
-            summaries.append(out[0]["summary_text"])
+            summaries.append(summarizer(c, **kwargs)[0]["summary_text"])
         except Exception as e:
             print("⚠️ HF summarizer failed:", e)
             summaries.append(c[:300])
+    return summaries
+
+@metrics.timed("hf_summary")
+def summarize_with_huggingface(text: str, mode="quick"):
+    """
+    Map-reduce summary of the whole document: summarize token-sized chunks in
+    batches, then summarize the chunk summaries until they fit in one chunk.
+    """
+    mode = "quick" if mode == "quick" else "detailed"
+    text = clean_text(text)
+    if not text:
+        return ""
+    summarizer = summarizers.get(mode)
+    tokenizer = summarizer.tokenizer
+    chunk_tokens = HF_PARAMS[mode]["chunk_tokens"]
+
+    summaries = summarize_chunks(summarizer, chunk_by_tokens(text, tokenizer, chunk_tokens), mode)
+    for _ in range(HF_MAX_REDUCE_ROUNDS):
+        chunks = chunk_by_tokens(" ".join(summaries), tokenizer, chunk_tokens)
+        if len(chunks) <= 1:
+            break
+        summaries = summarize_chunks(summarizer, chunks, mode)
     return "\n\n".join(summaries)
 
 # ----------------------------
 # Flowchart generator (replaces Flashcards)
 # ----------------------------
-def generate_flowchart(text: str):
+# Both generators run in JSON mode against a response schema and validate into
+# typed models (backend/utils/structured.py). Broken items are dropped and only
+# the missing part is asked for again, never the whole generation.
+async def generate_flowchart(text: str):
     """
     Generate a JSON-structured flowchart with nodes and edges.
-    Handles non-standard Gemini responses gracefully.
     """
-    import json
-    import re
-    from google.api_core.exceptions import GoogleAPIError
-
+    prompt = (
+        "Create a step-by-step conceptual flowchart based on the document below. "
+        "Return nodes (id, short label) in reading order and edges (source, target) "
+        "between node ids.\n\n"
+    )
     try:
-        model = genai.GenerativeModel("models/gemini-2.5-flash")
-
-        prompt = (
-            "Create a step-by-step conceptual flowchart based on the document below. "
-            "Output ONLY a valid JSON with this structure:\n"
-            "{"
-            "  'nodes': [{'id': '1', 'label': 'Start'}, ...], "
-            "  'edges': [{'source': '1', 'target': '2'}, ...]"
-            "}\n"
-            "Do not include any commentary, markdown, or text outside the JSON."
-        )
-
-        response = model.generate_content(prompt + "\n\n" + text[:12000])
-
-        if not response or not getattr(response, "text", None):
-            return {"nodes": [], "edges": []}
-
-        txt = response.text.strip()
-
-        # 🧹 Fix common formatting issues before parsing
-        txt = txt.replace("'", '"')  # convert single quotes to double quotes
-        txt = re.sub(r"```(?:json)?|```", "", txt)  # remove code fences
-        txt = txt.strip()
-
-        # Extract JSON substring if Gemini added commentary
-        json_part = None
-        try:
-            json_part = txt[txt.index("{"): txt.rindex("}") + 1]
-        except Exception:
-            json_part = txt
-
-        # ✅ Try to parse safely
-        data = json.loads(json_part)
-
-        if isinstance(data, dict) and "nodes" in data:
-            return data
-
-        # Fallback empty
-        return {"nodes": [], "edges": []}
-
-    except (json.JSONDecodeError, GoogleAPIError, Exception) as e:
+        raw = await llm.generate_text(GEMINI_MODEL, prompt + text[:MAX_PROMPT_CHARS], **json_output(FLOWCHART_SCHEMA))
+    except Exception as e:
         print("⚠️ Flowchart generation failed:", e)
         return {"nodes": [], "edges": []}
+    record_output("flowchart", raw)
+    flowchart, dropped = parse_flowchart(raw or "")
+    outcome = "valid" if not dropped else "salvaged"
+    if len(flowchart["nodes"]) > 1 and not flowchart["edges"]:
+        flowchart["edges"] = await repair_flowchart_edges(flowchart["nodes"])
+        outcome = "repaired"
+    elif not flowchart["nodes"]:
+        outcome = "empty"
+    metrics.inc("structured_output_total", kind="flowchart", outcome=outcome)
+    return flowchart
+
+async def repair_flowchart_edges(nodes):
+    """
+    Ask for the edges alone; the prompt is the node list, not the document.
+    """
+    prompt = (
+        "These are the nodes of a conceptual flowchart in reading order. "
+        "Return only the edges (source, target) connecting them.\n\n" + json.dumps(nodes)
+    )
+    try:
+        raw = await llm.generate_text(GEMINI_MODEL, prompt, **json_output(EDGES_SCHEMA))
+    except Exception as e:
+        print("⚠️ Flowchart edge repair failed:", e)
+        return []
+    record_output("flowchart_edges", raw)
+    return parse_edges(raw or "", nodes)
 
 # ----------------------------
 # Quiz generator + graders
 # ----------------------------
-def generate_quiz(text: str):
-    try:
-        model = genai.GenerativeModel("models/gemini-2.5-flash")
-        prompt = (
-            "Create a 10-question multiple-choice quiz from the text below. "
-            "Output as strict JSON array: "
-            "[{\"question\":\"...\",\"options\":{\"A\":\"..\",\"B\":\"..\",\"C\":\"..\",\"D\":\"..\"},\"answer\":\"B\"},...]\n\n"
-        )
-        response = model.generate_content(prompt + text[:12000])
-        if response and getattr(response, "text", None):
-            txt = response.text.strip()
-            json_text = txt[txt.index("[") : txt.rindex("]") + 1]
-            parsed = json.loads(json_text)
-            quiz = []
-            for item in parsed[:10]:
-                q = item.get("question", "").strip()
-                opts = item.get("options", {})
-                ans = item.get("answer", "").strip().upper()
-                normalized = {k: opts.get(k, "").strip() for k in ["A", "B", "C", "D"]}
-                if q:
-                    quiz.append({"question": q, "options": normalized, "answer": ans})
-            return quiz
-    except Exception as e:
-        print("⚠️ Quiz generation failed:", e)
-    return []
+QUIZ_QUESTIONS = 10
 
-def grade_quiz(submitted):
-    results, score, total = [], 0, 0
+def quiz_prompt(count: int, avoid=()) -> str:
+    prompt = (
+        f"Create a {count}-question multiple-choice quiz from the text below. "
+        "Each question has options A-D and the letter of the correct answer.\n"
+    )
+    if avoid:
+        prompt += "Do not repeat these questions:\n" + "\n".join(f"- {q}" for q in avoid) + "\n"
+    return prompt + "\n"
+
+async def request_quiz(text: str, count: int, avoid=()):
     try:
-        if isinstance(submitted, dict) and "quiz" in submitted and "answers" in submitted:
-            quiz = submitted["quiz"]
-            answers = submitted["answers"]
-            for i, item in enumerate(quiz):
-                total += 1
-                correct = item.get("answer", "").upper().strip()
-                sel = answers.get(str(i), "").upper()
-                ok = sel == correct
-                if ok:
-                    score += 1
-                results.append({"index": i, "selected": sel, "correct": correct, "ok": ok})
+        raw = await llm.generate_text(GEMINI_MODEL, quiz_prompt(count, avoid) + text[:MAX_PROMPT_CHARS], **json_output(QUIZ_SCHEMA))
     except Exception as e:
-        print("⚠️ Error grading quiz:", e)
-        raise
-    return {"score": score, "total": total, "results": results}
+        print("⚠️ Quiz generation failed:", e)
+        return [], 0
+    record_output("quiz", raw)
+    return parse_quiz(raw or "")
+
+async def generate_quiz(text: str):
+    quiz, dropped = await request_quiz(text, QUIZ_QUESTIONS)
+    outcome = "valid" if not dropped else "salvaged"
+    missing = QUIZ_QUESTIONS - len(quiz)
+    if quiz and missing > 0:
+        # Top up only the questions that were dropped or cut off
+        extra, _ = await request_quiz(text, missing, [q["question"] for q in quiz])
+        quiz = dedupe_questions(quiz + extra)
+        outcome = "repaired"
+    elif not quiz:
+        outcome = "empty"
+    metrics.inc("structured_output_total", kind="quiz", outcome=outcome)
+    return quiz[:QUIZ_QUESTIONS]
+
+async def publish_quiz(quiz):
+    """
+    Keep the answer key server-side; the client gets the questions and a quiz_id
+    to submit answers against.
+    """
+    return {
+        "quiz_id": await run_in_threadpool(quiz_store.put, quiz),
+        "quiz": [{"question": item["question"], "options": item["options"]} for item in quiz],
+    }
 
 # ----------------------------
 # Endpoints
 # ----------------------------
-@router.post("/summarize/quick")
-async def summarize_quick(file: UploadFile = File(...)):
-    text = extract_text(file)
+async def summarize_document(document: UploadedDocument, mode: str):
+    key = document.result_key(mode)
+    cached = await result_cache.aget(key)
+    if cached is not None:
+        return cached
+    text = await document.text(MAX_PROMPT_CHARS)
     if not text.strip():
         raise HTTPException(status_code=400, detail="No text extracted")
-    summary = summarize_with_gemini(text, "quick") or summarize_with_huggingface(text, "quick")
+    summary = await summarize_with_gemini(text, mode)
+    if summary:
+        await result_cache.aset(key, summary)
+        return summary
+    # HF fallback covers the whole document; its output is not cached so the
+    # next request retries Gemini
+    metrics.inc("fallbacks_total", kind="hf_summary")
+    return await run_in_thread(summarize_with_huggingface, await document.text(), mode)
+
+async def summary_events(document: UploadedDocument, mode: str):
+    """
+    Yield (event, payload) pairs for a streamed summary: "chunk" pieces, then
+    "done" with the full text, or "error". Cached summaries arrive as one chunk.
+    """
+    key = document.result_key(mode)
+    cached = await result_cache.aget(key)
+    if cached is not None:
+        yield "chunk", {"text": cached}
+        yield "done", {"summary": cached}
+        return
+    text = await document.text(MAX_PROMPT_CHARS)
+    if not text.strip():
+        yield "error", {"detail": "No text extracted"}
+        return
+
+    parts = []
+    try:
+        async for piece in stream_summary_with_gemini(text, mode):
+            parts.append(piece)
+            yield "chunk", {"text": piece}
+    except Exception as e:
+        print("⚠️ Gemini summary stream failed:", e)
+        if parts:
+            # Partial text already reached the client; don't restart with another engine
+            yield "error", {"detail": "Summary stream interrupted"}
+            return
+
+    summary = "".join(parts).strip()
+    if summary:
+        await result_cache.aset(key, summary)
+    else:
+        metrics.inc("fallbacks_total", kind="hf_summary")
+        summary = await run_in_thread(summarize_with_huggingface, await document.text(), mode)
+        yield "chunk", {"text": summary}
+    yield "done", {"summary": summary or "No summary available."}
+
+async def sse_stream(events):
+    async for event, payload in events:
+        yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+@router.post("/summarize/quick")
+async def summarize_quick(file: UploadFile = File(...)):
+    document = await read_document(file)
+    summary = await summarize_document(document, "quick")
     return {"summary": summary or "No summary available."}
 
 @router.post("/summarize/detailed")
 async def summarize_detailed(file: UploadFile = File(...)):
-    text = extract_text(file)
-    if not text.strip():
-        raise HTTPException(status_code=400, detail="No text extracted")
-    summary = summarize_with_gemini(text, "detailed") or summarize_with_huggingface(text, "detailed")
+    document = await read_document(file)
+    summary = await summarize_document(document, "detailed")
     return {"summary": summary or "No summary available."}
 
+@router.post("/summarize/quick/stream")
+async def summarize_quick_stream(file: UploadFile = File(...)):
+    document = await read_document(file)
+    return StreamingResponse(sse_stream(summary_events(document, "quick")), media_type="text/event-stream")
+
+@router.post("/summarize/detailed/stream")
+async def summarize_detailed_stream(file: UploadFile = File(...)):
+    document = await read_document(file)
+    return StreamingResponse(sse_stream(summary_events(document, "detailed")), media_type="text/event-stream")
+
+async def flowchart_document(document: UploadedDocument):
+    key = document.result_key("flowchart")
+    flowchart = await result_cache.aget(key)
+    if flowchart is None:
+        text = await document.text(MAX_PROMPT_CHARS)
+        if not text.strip():
+            raise HTTPException(status_code=400, detail="No text extracted from file")
+        flowchart = await generate_flowchart(text)
+        if flowchart.get("nodes"):
+            await result_cache.aset(key, flowchart)
+        else:
+            metrics.inc("fallbacks_total", kind="empty_flowchart")
+    return flowchart
+
+async def quiz_document(document: UploadedDocument):
+    key = document.result_key("quiz")
+    quiz = await result_cache.aget(key)
+    if quiz is None:
+        text = await document.text(MAX_PROMPT_CHARS)
+        if not text.strip():
+            raise HTTPException(status_code=400, detail="No text extracted from file")
+        quiz = await generate_quiz(text)
+        if quiz:
+            await result_cache.aset(key, quiz)
+        else:
+            metrics.inc("fallbacks_total", kind="empty_quiz")
+    return quiz
+
 @router.post("/flowchart")
 async def create_flowchart(file: UploadFile = File(...)):
-    text = extract_text(file)
-    if not text.strip():
-        raise HTTPException(status_code=400, detail="No text extracted from file")
-    flowchart = generate_flowchart(text)
-    return {"flowchart": flowchart}
+    document = await read_document(file)
+    return {"flowchart": await flowchart_document(document)}
 
 
 @router.post("/quiz")
 async def create_quiz(file: UploadFile = File(...)):
-    text = extract_text(file)
+    document = await read_document(file)
+    return await publish_quiz(await quiz_document(document))
+
+# ----------------------------
+# Study pack (one upload, one extraction, all generators in parallel)
+# ----------------------------
+async def summary_part(document: UploadedDocument, mode: str):
+    summary = await summarize_document(document, mode)
+    return {"summary": summary or "No summary available."}
+
+async def flowchart_part(document: UploadedDocument):
+    return {"flowchart": await flowchart_document(document)}
+
+async def quiz_part(document: UploadedDocument):
+    return await publish_quiz(await quiz_document(document))
+
+STUDY_PACK_PARTS = {
+    "summary_quick": lambda document: summary_part(document, "quick"),
+    "summary_detailed": lambda document: summary_part(document, "detailed"),
+    "flowchart": flowchart_part,
+    "quiz": quiz_part,
+}
+
+async def study_pack_parts(document: UploadedDocument):
+    """
+    Yield one dict per part as soon as it finishes (not in request order), then
+    a final {"part": "done"}. A failed part is reported without stopping the rest.
+    """
+    start = time.perf_counter()
+    # Extract once up front; every generator below then hits the text cache
+    text = await document.text(MAX_PROMPT_CHARS)
+    if not text.strip():
+        yield {"part": "error", "detail": "No text extracted from file"}
+        return
+    yield {"part": "document", "characters": len(text), "seconds": round(time.perf_counter() - start, 3)}
+
+    async def run(part, build):
+        try:
+            return part, await build(document), None
+        except HTTPException as e:
+            return part, None, e.detail
+        except Exception as e:
+            print(f"⚠️ Study pack part {part} failed:", e)
+            return part, None, str(e)
+
+    tasks = [asyncio.ensure_future(run(part, build)) for part, build in STUDY_PACK_PARTS.items()]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            part, value, error = await next_done
+            seconds = round(time.perf_counter() - start, 3)
+            if error is not None:
+                yield {"part": part, "error": error, "seconds": seconds}
+            else:
+                yield {"part": part, **value, "seconds": seconds}
+    finally:
+        # Client went away: stop paying for the generators still running
+        for task in tasks:
+            task.cancel()
+    metrics.observe("study_pack_seconds", time.perf_counter() - start)
+    yield {"part": "done", "seconds": round(time.perf_counter() - start, 3)}
+
+async def ndjson_stream(items):
+    async for item in items:
+        yield json.dumps(item) + "\n"
+
+@router.post("/study-pack")
+async def study_pack(file: UploadFile = File(...)):
+    """
+    Summaries (quick and detailed), flowchart and quiz for one upload, streamed
+    as NDJSON lines: {"part": "summary_quick" | "summary_detailed" | "flowchart" | "quiz", ...}.
+    """
+    document = await read_document(file)
+    return StreamingResponse(ndjson_stream(study_pack_parts(document)), media_type="application/x-ndjson")
+
+# ----------------------------
+# Background jobs (upload returns a job_id; poll, SSE or Socket.IO for progress)
+# ----------------------------
+async def run_document_job(job: dict, progress):
+    document = UploadedDocument(job["payload"], job["meta"]["ext"])
+    await progress(0.1, "extracting")
+    text = await document.text(MAX_PROMPT_CHARS)
     if not text.strip():
         raise HTTPException(status_code=400, detail="No text extracted from file")
-    quiz = generate_quiz(text)
-    return {"quiz": quiz}
+    await progress(0.5, "generating")
+    kind = job["kind"]
+    if kind == "flowchart":
+        return await flowchart_part(document)
+    if kind == "quiz":
+        return await quiz_part(document)
+    return await summary_part(document, kind.split("_", 1)[1])
+
+JOB_KINDS = ("summary_quick", "summary_detailed", "flowchart", "quiz")
+for kind in JOB_KINDS:
+    job_queue.register(kind, run_document_job)
+
+async def job_events(job_id: str):
+    """
+    Yield "progress" whenever the job changes, then "done", "failed" or "cancelled".
+    """
+    last = None
+    while True:
+        job = await job_queue.get(job_id)
+        if job is None:
+            yield "error", {"detail": "Job not found"}
+            return
+        if job["status"] in FINISHED:
+            yield job["status"], job
+            return
+        snapshot = (job["status"], job["progress"], job["stage"], job.get("ahead"))
+        if snapshot != last:
+            last = snapshot
+            yield "progress", job
+        await job_queue.wait_update(job_id, timeout=1.0)
+
+@router.post("/jobs")
+async def submit_job(
+    file: UploadFile = File(...),
+    kind: str = Query(..., description="summary_quick, summary_detailed, flowchart or quiz"),
+    priority: int = Query(0, ge=-10, le=10, description="Higher runs first"),
+):
+    if kind not in JOB_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of {', '.join(JOB_KINDS)}")
+    document = await read_document(file)
+    try:
+        payload = await run_in_threadpool(document.upload.read_bytes)
+        job_id = await job_queue.submit(kind, payload, {"ext": document.ext, "filename": file.filename}, priority)
+    except QueueFull:
+        raise HTTPException(status_code=503, detail="Job queue is full, try again later", headers={"Retry-After": "30"})
+    return {"job_id": job_id, "status": "queued"}
+
+@router.get("/jobs")
+async def job_stats():
+    return await run_in_threadpool(job_queue.stats)
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/jobs/{job_id}/events")
+async def job_event_stream(job_id: str):
+    if await job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(sse_stream(job_events(job_id)), media_type="text/event-stream")
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    job = await job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/models")
+async def model_stats():
+    return summarizers.stats()
+
+@router.post("/models/warmup")
+async def warmup_models(name: str = Query(None, description="quick or detailed; omit to load both")):
+    if name and name not in ("quick", "detailed"):
+        raise HTTPException(status_code=400, detail="Unknown model")
+    return await run_in_thread(summarizers.warmup, [name] if name else None)
+
+@router.get("/cache/stats")
+async def cache_stats():
+    return {"text": text_cache.stats(), "results": result_cache.stats()}
+
+# ----------------------------
+# Quiz grading (answer keys stay server-side, see backend/utils/quiz_store.py)
+# ----------------------------
+class QuizSubmission(BaseModel):
+    quiz_id: str
+    answers: Union[Dict[str, str], List[str]] = {}
+
+class QuizBatch(BaseModel):
+    quiz_id: str
+    submissions: List[dict]  # [{"student": "...", "answers": {...} | [...]}]
+
+def unknown_quiz():
+    return HTTPException(status_code=404, detail="Quiz not found or expired, generate it again")
 
 @router.post("/quiz/submit")
-async def submit_quiz(payload: dict = Body(...)):
+async def submit_quiz(payload: QuizSubmission):
     try:
-        result = grade_quiz(payload)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        return await run_in_threadpool(quiz_store.grade, payload.quiz_id, payload.answers)
+    except UnknownQuiz:
+        raise unknown_quiz()
+
+@router.post("/quiz/submit/batch")
+async def submit_quiz_batch(payload: QuizBatch):
+    """
+    Grade a whole class in one request; returns per-student scores and the average.
+    """
+    try:
+        return await run_in_threadpool(quiz_store.grade_many, payload.quiz_id, payload.submissions)
+    except UnknownQuiz:
+        raise unknown_quiz()
+
+@router.get("/quiz/stats")
+async def quiz_store_stats():
+    return quiz_store.store_stats()
+
+@router.get("/quiz/{quiz_id}/stats")
+async def quiz_stats(quiz_id: str):
+    """
+    Attempts, average score and per-question option counts (never the key).
+    """
+    try:
+        return await run_in_threadpool(quiz_store.stats, quiz_id)
+    except UnknownQuiz:
+        raise unknown_quiz()
@@ -1,62 +1,152 @@
-from fastapi import APIRouter, HTTPException
+import re
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from starlette.concurrency import run_in_threadpool
+from mysql.connector import errorcode
+from mysql.connector.errors import IntegrityError
 from backend.db.database import get_connection
+from backend.db.roster import ROSTER_MAX_BYTES, ROSTER_MAX_ROWS, RosterTooLarge, import_roster
 from backend.schemas import UserCreate, UserLogin
-from backend.utils.auth_utils import hash_password, verify_password, create_access_token
+from backend.utils.auth_utils import (
+    hash_password_async,
+    verify_password_async,
+    create_access_token,
+    get_current_user,
+    require_admin,
+    user_claims,
+)
+from backend.utils.executors import ExecutorBusy
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
+# "Duplicate entry 'x' for key 'users.email'" (MySQL 8) or "... for key 'email'"; the key
+# name ends the message, the duplicate value (which may contain anything) precedes it
+DUPLICATE_KEY_RE = re.compile(r"for key '(?:\w+\.)?(\w+)'\s*$")
+
+
+def server_busy():
+    return HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+
 
 # -----------------------
-# Signup Route
+# DB helpers (blocking, run in the threadpool)
 # -----------------------
-@router.post("/signup")
-def signup(user: UserCreate):
+def find_user(email: str):
     conn = get_connection()
     if not conn:
         raise HTTPException(status_code=500, detail="Database connection failed")
-
     cursor = conn.cursor(dictionary=True)
+    cursor.execute("SELECT email, hashed_password FROM users WHERE email = %s", (email,))
+    db_user = cursor.fetchone()
+    cursor.close()
+    conn.close()
+    return db_user
 
-    # Check if email already exists
-    cursor.execute("SELECT * FROM users WHERE email = %s", (user.email,))
-    existing = cursor.fetchone()
-    if existing:
+
+def insert_user(user: UserCreate, hashed_pwd: str):
+    """
+    Single round trip: the UNIQUE keys on email/username reject duplicates,
+    which also closes the race between two concurrent signups.
+    """
+    conn = get_connection()
+    if not conn:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "INSERT INTO users (username, email, hashed_password) VALUES (%s, %s, %s)",
+            (user.username, user.email, hashed_pwd),
+        )
+        conn.commit()
+    except IntegrityError as e:
+        if e.errno != errorcode.ER_DUP_ENTRY:
+            raise
+        match = DUPLICATE_KEY_RE.search(e.msg or "")
+        if match and match.group(1) == "email":
+            raise HTTPException(status_code=400, detail="Email already registered")
+        raise HTTPException(status_code=400, detail="Username already taken")
+    finally:
         cursor.close()
         conn.close()
-        raise HTTPException(status_code=400, detail="Email already registered")
-
-    # Insert new user
-    hashed_pwd = hash_password(user.password)
-    cursor.execute(
-        "INSERT INTO users (username, email, hashed_password) VALUES (%s, %s, %s)",
-        (user.username, user.email, hashed_pwd),
-    )
+
+
+def update_password_hash(email: str, hashed_pwd: str):
+    conn = get_connection()
+    if not conn:
+        return
+    cursor = conn.cursor()
+    cursor.execute("UPDATE users SET hashed_password = %s WHERE email = %s", (hashed_pwd, email))
     conn.commit()
     cursor.close()
     conn.close()
 
+
+# -----------------------
+# Signup Route
+# -----------------------
+@router.post("/signup")
+async def signup(user: UserCreate):
+    # bcrypt runs on the hashing process pool
+    try:
+        hashed_pwd = await hash_password_async(user.password)
+    except ExecutorBusy:
+        raise server_busy()
+
+    # Insert new user; duplicate email/username maps to 400
+    await run_in_threadpool(insert_user, user, hashed_pwd)
+
     return {"msg": "User created successfully 🚀"}
 
 
+# -----------------------
+# Bulk roster import
+# -----------------------
+@router.post("/bulk-import")
+async def bulk_import(file: UploadFile = File(...), current_user: dict = Depends(require_admin)):
+    """
+    Create accounts for a class roster CSV with columns username,email,password.
+    Existing emails/usernames are skipped. Admins only (ADMIN_EMAILS).
+    """
+    content = await file.read(ROSTER_MAX_BYTES + 1)
+    if len(content) > ROSTER_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Rosters are limited to {ROSTER_MAX_BYTES} bytes")
+    try:
+        return await import_roster(content.decode("utf-8-sig", errors="replace"), ROSTER_MAX_ROWS)
+    except RosterTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ExecutorBusy:
+        raise server_busy()
+
+
 # -----------------------
 # Login Route
 # -----------------------
 @router.post("/login")
-def login(user: UserLogin):
-    conn = get_connection()
-    if not conn:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM users WHERE email = %s", (user.email,))
-    db_user = cursor.fetchone()
-    cursor.close()
-    conn.close()
+async def login(user: UserLogin):
+    db_user = await run_in_threadpool(find_user, user.email)
 
     # Verify credentials
-    if not db_user or not verify_password(user.password, db_user["hashed_password"]):
+    if not db_user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    try:
+        ok, new_hash = await verify_password_async(user.password, db_user["hashed_password"])
+    except ExecutorBusy:
+        raise server_busy()
+    if not ok:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    # Transparently upgrade hashes made with an outdated bcrypt cost
+    if new_hash:
+        await run_in_threadpool(update_password_hash, db_user["email"], new_hash)
+
     # Generate JWT token
     token = create_access_token({"sub": db_user["email"]})
+    user_claims.set(db_user["email"], {"email": db_user["email"]})
     return {"access_token": token, "token_type": "bearer"}
+
+
+# -----------------------
+# Current user
+# -----------------------
+@router.get("/me")
+async def me(current_user: dict = Depends(get_current_user)):
+    return {"email": current_user.get("email", current_user["sub"]), "expires_at": current_user.get("exp")}
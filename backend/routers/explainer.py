@@ -1,98 +1,310 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
-import re
-import google.generativeai as genai
+from collections import Counter
+import math
 import os
-from dotenv import load_dotenv
+import re
+import time
+
+from backend.utils import llm_client as llm
+from backend.utils.metrics import inc, observe
 
 router = APIRouter(prefix="/explainer", tags=["explainer"])
 
 # ----------------------------
-# Load Gemini API Key
+# Gemini (shared client: backend/utils/llm_client.py)
 # ----------------------------
-load_dotenv()
-GEMINI_API_KEY = os.getenv("GOOGLE_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
+if not llm.is_configured():
     print("⚠️ GOOGLE_API_KEY not found. Using rule-based explanation fallback.")
 
+# ----------------------------
+# Tier routing config
+# ----------------------------
+TIER_MODELS = {
+    "flash": os.getenv("EXPLAINER_FLASH_MODEL", "models/gemini-2.5-flash"),
+    "pro": os.getenv("EXPLAINER_PRO_MODEL", "models/gemini-2.5-pro"),
+}
+EXPLAINER_LOCAL_MAX_LINES = int(os.getenv("EXPLAINER_LOCAL_MAX_LINES", "3"))
+EXPLAINER_LOCAL_MAX_FEATURES = int(os.getenv("EXPLAINER_LOCAL_MAX_FEATURES", "2"))
+EXPLAINER_PRO_MIN_LINES = int(os.getenv("EXPLAINER_PRO_MIN_LINES", "150"))
+# Language and feature detection only reads this much of the snippet; longer
+# inputs go to the pro model on line count alone and the model sees all of it
+EXPLAINER_ANALYZE_CHARS = int(os.getenv("EXPLAINER_ANALYZE_CHARS", "32768"))
+# "local", "flash" or "pro" pins every request to one tier (empty = route)
+EXPLAINER_FORCE_TIER = os.getenv("EXPLAINER_FORCE_TIER", "").strip().lower()
+
 class CodeInput(BaseModel):
     code: str
 
 # ----------------------------
-# Detect programming language
+# Lexical analysis (one pass: language scores + features)
 # ----------------------------
+# Identifiers (with dotted paths) first since they are most tokens; string
+# literals are matched so keywords inside them are not counted
+TOKEN_RE = re.compile(
+    r"""[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*"""
+    r"""|"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'"""
+    r"""|\#include\b|\#!|<\?php|<!DOCTYPE|<(?:html|head|body|div|span|script|style|table|form|ul|li|p|a)\b"""
+    r"""|===|!==|::|=>|->|:=|[$@]\w+""",
+    re.IGNORECASE | re.ASCII,
+)
+
+# (tokens, language weights, feature)
+LEXICON_SPEC = [
+    # Python
+    ("def", {"Python": 2, "Ruby": 1.5}, "functions"),
+    ("elif", {"Python": 3, "Bash": 1}, "conditionals"),
+    ("self", {"Python": 2, "Rust": 0.5, "Ruby": 0.5}, None),
+    ("__init__ __name__ __main__ nonlocal", {"Python": 3}, None),
+    ("None True False lambda except pass yield len range", {"Python": 1.5}, None),
+    ("print", {"Python": 1.5, "PHP": 0.3, "Ruby": 0.5}, "output"),
+    ("input raw_input", {"Python": 2}, "input"),
+    ("import", {"Python": 1, "Java": 1, "JavaScript": 1, "TypeScript": 1, "Go": 1}, "imports"),
+    ("from", {"Python": 1, "JavaScript": 0.5, "TypeScript": 0.5}, None),
+    # Java
+    ("System.out.println System.out.print System.out.printf", {"Java": 4}, "output"),
+    ("throws ArrayList HashMap @Override Integer java", {"Java": 3}, None),
+    ("Scanner nextLine nextInt", {"Java": 3}, "input"),
+    ("extends implements", {"Java": 2, "TypeScript": 1, "PHP": 1}, None),
+    ("final boolean", {"Java": 2, "TypeScript": 0.5}, None),
+    ("package", {"Java": 2, "Go": 2}, None),
+    ("String", {"Java": 1.5, "C#": 0.5}, None),
+    ("public private protected", {"Java": 1, "C#": 1, "C++": 0.5, "PHP": 0.5, "TypeScript": 0.5}, None),
+    ("static", {"Java": 1, "C#": 1, "C++": 0.5, "C": 0.5, "PHP": 0.5}, None),
+    ("void", {"Java": 1, "C#": 1, "C++": 1, "C": 1}, None),
+    ("new this", {"Java": 0.5, "C#": 0.5, "JavaScript": 0.5, "C++": 0.5, "PHP": 0.3, "TypeScript": 0.5}, None),
+    ("instanceof", {"Java": 2, "JavaScript": 1, "TypeScript": 1}, None),
+    ("class", {"Python": 0.5, "Java": 1, "C#": 0.5, "C++": 0.5, "JavaScript": 0.3, "PHP": 0.3, "Ruby": 0.5}, "classes"),
+    ("interface", {"Java": 1, "C#": 1, "TypeScript": 1.5, "Go": 1, "PHP": 0.5}, "classes"),
+    # C / C++
+    ("#include", {"C++": 1.5, "C": 1.5}, "imports"),
+    ("std endl template typename nullptr", {"C++": 3}, None),
+    ("cout", {"C++": 3}, "output"),
+    ("cin", {"C++": 3}, "input"),
+    ("::", {"C++": 1, "Rust": 1, "PHP": 0.5, "Ruby": 0.3}, None),
+    ("vector", {"C++": 2}, None),
+    ("namespace", {"C++": 1.5, "C#": 1.5, "PHP": 1, "TypeScript": 0.5}, None),
+    ("using", {"C#": 2, "C++": 1}, "imports"),
+    ("auto", {"C++": 1.5, "C": 0.5}, None),
+    ("int char", {"C": 1.5, "C++": 1, "Java": 1, "C#": 1}, None),
+    ("unsigned sizeof NULL", {"C": 2, "C++": 1}, None),
+    ("malloc typedef", {"C": 3, "C++": 0.5}, None),
+    ("printf", {"C": 3, "C++": 0.5, "Go": 0.5, "PHP": 0.5, "Bash": 0.5}, "output"),
+    ("scanf", {"C": 3, "C++": 0.5}, "input"),
+    ("struct", {"C": 2, "C++": 1.5, "Go": 1.5, "Rust": 1.5, "C#": 1}, "classes"),
+    # C#
+    ("Console.WriteLine Console.Write WriteLine", {"C#": 4}, "output"),
+    ("Console.ReadLine ReadLine", {"C#": 4}, "input"),
+    ("Console", {"C#": 2}, None),
+    ("string", {"C#": 1.5, "Go": 0.5, "TypeScript": 0.5}, None),
+    ("readonly", {"C#": 2, "TypeScript": 2}, None),
+    ("var", {"JavaScript": 1.5, "C#": 1, "Go": 0.5}, None),
+    ("async await", {"JavaScript": 1, "TypeScript": 1, "C#": 1, "Python": 0.5, "Rust": 0.5}, None),
+    # JavaScript / TypeScript
+    ("function", {"JavaScript": 2, "TypeScript": 1, "PHP": 1, "Bash": 0.5}, "functions"),
+    ("console.log console.error console.warn", {"JavaScript": 3, "TypeScript": 2}, "output"),
+    ("console document window prototype addEventListener module.exports", {"JavaScript": 3, "TypeScript": 1}, None),
+    ("let", {"JavaScript": 1.5, "TypeScript": 1, "Rust": 1.5}, None),
+    ("const", {"JavaScript": 1.5, "TypeScript": 1, "C++": 1, "C": 1, "Rust": 0.5, "Go": 0.5}, None),
+    ("=>", {"JavaScript": 1.5, "TypeScript": 1.5, "PHP": 0.5, "C#": 0.5, "Rust": 0.5}, None),
+    ("=== !==", {"JavaScript": 2, "TypeScript": 2, "PHP": 2}, None),
+    ("undefined typeof Promise JSON", {"JavaScript": 2, "TypeScript": 2}, None),
+    ("fetch", {"JavaScript": 1.5, "TypeScript": 1}, None),
+    ("Map Set", {"JavaScript": 1, "TypeScript": 1, "Java": 0.5}, None),
+    ("prompt", {"JavaScript": 1.5}, "input"),
+    ("require", {"JavaScript": 2, "Ruby": 1, "PHP": 1}, "imports"),
+    ("export", {"JavaScript": 1.5, "TypeScript": 1.5, "Bash": 1}, None),
+    ("number any keyof declare unknown", {"TypeScript": 3}, None),
+    ("enum", {"TypeScript": 1, "Java": 1, "C#": 1, "Rust": 1, "C++": 0.5, "C": 0.5}, None),
+    ("null", {"Java": 0.5, "JavaScript": 0.5, "C#": 0.5, "PHP": 0.5, "TypeScript": 0.5}, None),
+    # Go
+    ("func", {"Go": 3}, "functions"),
+    ("fmt chan defer goroutine", {"Go": 3}, None),
+    ("Println Printf", {"Go": 3}, "output"),
+    (":=", {"Go": 2}, None),
+    ("go nil make err", {"Go": 1.5, "Ruby": 0.5}, None),
+    # Rust
+    ("fn", {"Rust": 3}, "functions"),
+    ("mut impl crate unwrap Vec usize u8 u32 i32 i64 f64 Self", {"Rust": 3}, None),
+    ("pub Some Ok Err", {"Rust": 2}, None),
+    ("println", {"Rust": 2, "Java": 0.5}, "output"),
+    ("use", {"Rust": 2, "PHP": 1}, "imports"),
+    ("trait", {"Rust": 3, "PHP": 1}, "classes"),
+    ("match", {"Rust": 1.5, "Python": 0.5}, "conditionals"),
+    ("loop", {"Rust": 2}, "loops"),
+    ("->", {"Rust": 1.5, "PHP": 1, "C++": 0.5, "Python": 0.5}, None),
+    # PHP
+    ("<?php", {"PHP": 6}, None),
+    ("isset require_once include_once array", {"PHP": 3}, None),
+    ("foreach", {"PHP": 2, "C#": 2}, "loops"),
+    ("echo", {"PHP": 2, "Bash": 2}, "output"),
+    ("$", {"PHP": 1.5, "Bash": 1.5}, None),
+    # Ruby
+    ("puts", {"Ruby": 3}, "output"),
+    ("gets", {"Ruby": 2, "C": 1}, "input"),
+    ("elsif unless", {"Ruby": 3}, "conditionals"),
+    ("until", {"Ruby": 2}, "loops"),
+    ("attr_accessor attr_reader each module", {"Ruby": 3}, None),
+    ("end", {"Ruby": 2}, None),
+    ("do", {"Ruby": 1, "Bash": 1, "C": 0.3, "Java": 0.3}, None),
+    ("@", {"Ruby": 1, "Python": 0.5, "Java": 0.5}, None),
+    # Bash
+    ("#!", {"Bash": 3, "Python": 0.5}, None),
+    ("fi esac done", {"Bash": 3}, None),
+    ("then", {"Bash": 2, "Ruby": 0.5}, None),
+    ("sudo grep mkdir chmod apt", {"Bash": 2}, None),
+    ("read", {"Bash": 0.5}, "input"),
+    # SQL (keywords are case-insensitive; lowercase counts for less)
+    ("SELECT WHERE INSERT INTO JOIN HAVING VALUES VARCHAR", {"SQL": 3}, None),
+    ("FROM UPDATE DELETE CREATE TABLE GROUP ORDER PRIMARY LIMIT", {"SQL": 1.5}, None),
+    ("select where insert into join having varchar", {"SQL": 1.5}, None),
+    # HTML
+    ("<!doctype <html", {"HTML": 6}, None),
+    ("<head <body <div <span <script <style <table <form <ul <li <p <a", {"HTML": 2}, None),
+    # Control flow shared by most languages
+    ("for while", {}, "loops"),
+    ("if else switch", {}, "conditionals"),
+    ("return", {}, "returns"),
+    ("readline readLine stdin", {}, "input"),
+]
+
+def build_lexicon(spec):
+    """token -> ({language: weight}, {features}); repeated tokens merge."""
+    lexicon = {}
+    for tokens, weights, feature in spec:
+        for token in tokens.split():
+            entry = lexicon.setdefault(token, ({}, set()))
+            for language, weight in weights.items():
+                if weight:
+                    entry[0][language] = entry[0].get(language, 0) + weight
+            if feature:
+                entry[1].add(feature)
+    return lexicon
+
+LEXICON = build_lexicon(LEXICON_SPEC)
+
+FEATURE_MESSAGES = {
+    "imports": "Imports external libraries or modules.",
+    "classes": "Defines a class — used for object-oriented programming.",
+    "functions": "Defines one or more functions.",
+    "loops": "Contains loops — used for iteration.",
+    "conditionals": "Uses conditional statements for decision-making.",
+    "returns": "Returns values from a function.",
+    "output": "Displays output to the console.",
+    "input": "Takes user input.",
+}
+NO_FEATURES = "No major code features detected."
+MIN_LANGUAGE_SCORE = 1.5
+
+def lookup(token: str):
+    entry = LEXICON.get(token)
+    if entry is not None:
+        return [entry]
+    first = token[0]
+    if first in "\"'":
+        return []
+    if first in "$@":
+        return [LEXICON[first]]
+    if first == "<":
+        entry = LEXICON.get(token.lower())
+        return [entry] if entry else []
+    if "." in token:
+        # self.items.append -> "self"; Console.WriteLine -> "WriteLine"
+        head, _, tail = token.rpartition(".")
+        head = head.split(".", 1)[0]
+        return [LEXICON[part] for part in (head, tail) if part in LEXICON]
+    return []
+
+def analyze_code(code: str) -> dict:
+    """
+    Tokenize once and tally language evidence and features from the same pass.
+    Repeated tokens count logarithmically so one keyword cannot drown out the rest.
+    Only the first EXPLAINER_ANALYZE_CHARS characters are read.
+    """
+    scores, found = {}, set()
+    tokens = TOKEN_RE.findall(code, 0, EXPLAINER_ANALYZE_CHARS)
+    for token, n in Counter(tokens).items():
+        weight = 1 + math.log(n)
+        for languages, features in lookup(token):
+            found |= features
+            for language, w in languages.items():
+                scores[language] = scores.get(language, 0) + w * weight
+
+    ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+    language = ranked[0][0] if ranked and ranked[0][1] >= MIN_LANGUAGE_SCORE else "Unknown"
+    total = sum(scores.values()) or 1
+    return {
+        "language": language,
+        "scores": {lang: round(score / total, 3) for lang, score in ranked[:5]},
+        "found": found,
+        "features": [msg for key, msg in FEATURE_MESSAGES.items() if key in found] or [NO_FEATURES],
+    }
+
 def detect_language(code: str) -> str:
-    if re.search(r"\b(def|import|print|self)\b", code):
-        return "Python"
-    elif re.search(r"\b(public|class|System\.out\.println)\b", code):
-        return "Java"
-    elif re.search(r"#include\s*<|std::|cout|cin", code):
-        return "C++"
-    elif re.search(r"function|console\.log|let|const|var", code):
-        return "JavaScript"
-    elif re.search(r"SELECT|FROM|WHERE|INSERT|UPDATE", code, re.IGNORECASE):
-        return "SQL"
-    else:
-        return "Unknown"
+    return analyze_code(code)["language"]
+
+def analyze_features(code: str):
+    return analyze_code(code)["features"]
 
 # ----------------------------
-# Extract main features
+# Tier routing
 # ----------------------------
-def analyze_features(code: str):
-    features = []
-    if "import" in code:
-        features.append("Imports external libraries or modules.")
-    if "class " in code:
-        features.append("Defines a class — used for object-oriented programming.")
-    if "def " in code:
-        features.append("Defines one or more functions.")
-    if "for " in code or "while " in code:
-        features.append("Contains loops — used for iteration.")
-    if "if " in code or "elif " in code or "else:" in code:
-        features.append("Uses conditional statements for decision-making.")
-    if "return " in code:
-        features.append("Returns values from a function.")
-    if "print" in code or "console.log" in code:
-        features.append("Displays output to the console.")
-    if "input" in code or "cin" in code:
-        features.append("Takes user input.")
-    return features or ["No major code features detected."]
+def choose_tier(code: str, analysis: dict):
+    """
+    Pick "local", "flash" or "pro" from snippet size and constructs found.
+    Returns (tier, reason).
+    """
+    lines = sum(1 for line in code.splitlines() if line.strip())
+    found = len(analysis["found"])
+    if EXPLAINER_FORCE_TIER in ("local", "flash", "pro"):
+        return EXPLAINER_FORCE_TIER, "forced by EXPLAINER_FORCE_TIER"
+    if not llm.is_configured():
+        return "local", "no LLM configured"
+    if lines <= EXPLAINER_LOCAL_MAX_LINES and found <= EXPLAINER_LOCAL_MAX_FEATURES:
+        return "local", f"{lines} lines, {found} features"
+    if lines >= EXPLAINER_PRO_MIN_LINES:
+        return "pro", f"{lines} lines >= {EXPLAINER_PRO_MIN_LINES}"
+    return "flash", f"{lines} lines, {found} features"
 
 # ----------------------------
 # Generate Explanation (Gemini or fallback)
 # ----------------------------
-def explain_with_ai(code: str, language: str):
-    """Use Gemini for smart explanation (fallbacks if quota exceeded)."""
-    try:
-        model = genai.GenerativeModel("models/gemini-2.5-pro")
-        prompt = (
-            f"The following code is written in {language}.\n"
-            "Explain what this code does step-by-step in a simple and structured way.\n"
-            "Add short comments about logic, purpose, and data flow.\n\n"
-            f"Code:\n{code}"
-        )
-        response = model.generate_content(prompt)
-        if response and response.text:
-            return response.text.strip()
-    except Exception as e:
-        print("⚠️ AI explanation failed:", e)
-
-    # Fallback explanation (basic)
+def explain_locally(found) -> str:
+    """Rule-based explanation for trivial snippets and when Gemini is unavailable."""
     explanation = []
-    if "for" in code:
+    if "loops" in found:
         explanation.append("Contains a loop that iterates through a sequence.")
-    if "if" in code:
+    if "conditionals" in found:
         explanation.append("Uses a conditional block to make decisions.")
-    if "def" in code:
+    if "functions" in found:
         explanation.append("Defines a function for code reuse.")
-    if "return" in code:
+    if "returns" in found:
         explanation.append("Returns values from a function.")
     if not explanation:
         explanation.append("General code detected without major constructs.")
     return "\n".join(explanation)
 
+async def explain_with_ai(code: str, analysis: dict, tier: str = "pro"):
+    """Use Gemini for smart explanation (fallbacks if quota exceeded)."""
+    if tier in TIER_MODELS:
+        try:
+            prompt = (
+                f"The following code is written in {analysis['language']}.\n"
+                "Explain what this code does step-by-step in a simple and structured way.\n"
+                "Add short comments about logic, purpose, and data flow.\n\n"
+                f"Code:\n{code}"
+            )
+            response = await llm.generate_coalesced(TIER_MODELS[tier], prompt)
+            if response and response.text:
+                return response.text.strip(), tier
+        except Exception as e:
+            print("⚠️ AI explanation failed:", e)
+
+    # Fallback explanation (basic)
+    if tier in TIER_MODELS:
+        inc("fallbacks_total", kind="explainer_local")
+    return explain_locally(analysis["found"]), "local"
+
 # ----------------------------
 # Main Endpoint
 # ----------------------------
@@ -102,12 +314,18 @@ async def explain_code(payload: CodeInput):
     if not code:
         return {"language": "None", "features": [], "explanation": "No code provided."}
 
-    language = detect_language(code)
-    features = analyze_features(code)
-    explanation = explain_with_ai(code, language)
+    analysis = analyze_code(code)
+    tier, _ = choose_tier(code, analysis)
+    inc("explainer_tier_total", tier=tier)
+
+    start = time.perf_counter()
+    explanation, tier = await explain_with_ai(code, analysis, tier)
+    observe(f"explainer_{tier}_seconds", time.perf_counter() - start)
 
     return {
-        "language": language,
-        "features": features,
-        "explanation": explanation
+        "language": analysis["language"],
+        "language_scores": analysis["scores"],
+        "features": analysis["features"],
+        "explanation": explanation,
+        "tier": tier
     }
@@ -1,22 +1,26 @@
 # backend/routers/virtual_mentor.py
-from fastapi import APIRouter, HTTPException, Query
-from dotenv import load_dotenv
-import google.generativeai as genai
+import asyncio
 import os
+import weakref
+from typing import Optional
+
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from backend.routers.assistant import clean_text, read_document
+from backend.utils import llm_client as llm
+from backend.utils.retrieval import RETRIEVAL_TOP_K, document_indexes
+from backend.utils.sessions import new_session, sessions
+from backend.utils.tokens import estimate_tokens
 
-# ----------------------------
-# Load environment variables
-# ----------------------------
-load_dotenv()
 router = APIRouter(prefix="/mentor", tags=["virtual_mentor"])
 
 # ----------------------------
-# Configure Gemini API
+# Gemini (shared client: backend/utils/llm_client.py)
 # ----------------------------
-GEMINI_API_KEY = os.getenv("GOOGLE_API_KEY")
-if not GEMINI_API_KEY:
+if not llm.is_configured():
     raise RuntimeError("❌ GOOGLE_API_KEY not found in .env file.")
-genai.configure(api_key=GEMINI_API_KEY)
 
 # ----------------------------
 # Base endpoint
@@ -25,46 +29,181 @@ genai.configure(api_key=GEMINI_API_KEY)
 async def hello_mentor():
     return {"message": "🤖 Virtual AI Mentor is active and ready to help students!"}
 
+# ----------------------------
+# Sessions (rolling history budget + running summary)
+# ----------------------------
+MENTOR_MODEL = "models/gemini-2.5-flash"
+MENTOR_HISTORY_TOKENS = int(os.getenv("MENTOR_HISTORY_TOKENS", "1500"))
+MENTOR_KEEP_TURNS = int(os.getenv("MENTOR_KEEP_TURNS", "4"))
+MENTOR_SUMMARY_CHARS = int(os.getenv("MENTOR_SUMMARY_CHARS", "1500"))
+
+_session_locks = weakref.WeakValueDictionary()
+_compactions = set()
+
+def session_lock(session_id: str) -> asyncio.Lock:
+    lock = _session_locks.get(session_id)
+    if lock is None:
+        lock = _session_locks[session_id] = asyncio.Lock()
+    return lock
+
+def history_tokens(turns) -> int:
+    return sum(estimate_tokens(t["text"]) for t in turns)
+
+def format_turns(turns) -> str:
+    return "\n".join(f"{'Student' if t['role'] == 'student' else 'Mentor'}: {t['text']}" for t in turns)
+
+def build_prompt(session: dict, message: str) -> str:
+    parts = [
+        "You are a friendly virtual mentor who helps students understand concepts. "
+        "Use short, clear, and supportive language. Avoid jargon unless explained simply."
+    ]
+    if session["summary"]:
+        parts.append(f"Summary of the conversation so far:\n{session['summary']}")
+    if session["turns"]:
+        parts.append(format_turns(session["turns"]))
+    parts.append(f"Student: {message}\nMentor:")
+    return "\n\n".join(parts)
+
+async def compact(session: dict):
+    """
+    Fold the oldest turns into the running summary until the history is back
+    under half the budget (so compaction does not run on every turn).
+    """
+    turns, old = session["turns"], []
+    while len(turns) > MENTOR_KEEP_TURNS and history_tokens(turns) > MENTOR_HISTORY_TOKENS // 2:
+        old.append(turns.pop(0))
+    if not old:
+        return
+    prompt = (
+        "Update the running summary of a tutoring conversation. Keep the topics covered, "
+        "facts the student was told, their goals and open questions. Be concise.\n\n"
+        f"Current summary:\n{session['summary'] or '(none)'}\n\n"
+        f"New turns:\n{format_turns(old)}\n\nUpdated summary:"
+    )
+    try:
+        summary = await llm.generate_text(MENTOR_MODEL, prompt)
+    except Exception as e:
+        print("⚠️ Mentor summary failed:", e)
+        summary = None
+    if not summary:
+        # Keep the first sentence of each dropped turn
+        summary = " ".join([session["summary"]] + [t["text"].split(". ")[0] for t in old]).strip()
+    session["summary"] = summary[-MENTOR_SUMMARY_CHARS:]
+    session["compactions"] += 1
+
+async def compact_later(session_id: str):
+    async with session_lock(session_id):
+        session = await run_in_threadpool(sessions.get, session_id)
+        if session is not None:
+            await compact(session)
+            await run_in_threadpool(sessions.put, session)
+
+async def chat_turn(message: str, session_id: Optional[str] = None) -> dict:
+    """
+    One mentor turn within a session (created on first use). Compaction runs
+    after the reply, under the session lock, so the next turn sees it.
+    """
+    session_id = session_id or new_session()["id"]
+    async with session_lock(session_id):
+        session = await run_in_threadpool(sessions.get, session_id) or new_session(session_id)
+        prompt = build_prompt(session, message)
+        response = await llm.generate(MENTOR_MODEL, prompt)
+        reply = response.text.strip() if response and response.text else "I'm here to help!"
+        session["turns"] += [{"role": "student", "text": message}, {"role": "mentor", "text": reply}]
+        await run_in_threadpool(sessions.put, session)
+        if history_tokens(session["turns"]) > MENTOR_HISTORY_TOKENS:
+            task = asyncio.ensure_future(compact_later(session_id))
+            _compactions.add(task)
+            task.add_done_callback(_compactions.discard)
+    return {"session_id": session_id, "reply": reply, "prompt_tokens": estimate_tokens(prompt)}
+
 # ----------------------------
 # Chat endpoint (general)
 # ----------------------------
 @router.post("/chat")
-async def mentor_chat(message: str = Query(..., description="Student's question or message")):
+async def mentor_chat(
+    message: str = Query(..., description="Student's question or message"),
+    session_id: Optional[str] = Query(None, description="Continue an earlier conversation"),
+):
     """
     Chat-style mentor that gives friendly, clear, educational answers.
+    Pass back the returned session_id for follow-up questions.
     """
     try:
-        model = genai.GenerativeModel("models/gemini-2.5-flash")
-        prompt = (
-            "You are a friendly virtual mentor who helps students understand concepts. "
-            "Use short, clear, and supportive language. Avoid jargon unless explained simply.\n\n"
-            f"Student: {message}\nMentor:"
-        )
-        response = model.generate_content(prompt)
-        return {"reply": response.text.strip() if response and response.text else "I'm here to help!"}
+        result = await chat_turn(message, session_id)
+        return {"reply": result["reply"], "session_id": result["session_id"]}
     except Exception as e:
         print("⚠️ Mentor chat error:", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.delete("/sessions/{session_id}")
+async def end_session(session_id: str):
+    await run_in_threadpool(sessions.delete, session_id)
+    return {"deleted": session_id}
+
+@router.get("/sessions/stats")
+async def session_stats():
+    return await run_in_threadpool(sessions.stats)
+
 # ----------------------------
-# Context-based Mentor (uses uploaded summary or extracted text)
+# Documents (chunked and indexed once, referenced by document_id)
+# ----------------------------
+class DocumentText(BaseModel):
+    text: str
+
+class ContextualQuestion(BaseModel):
+    message: str
+    document_id: Optional[str] = None
+    context: Optional[str] = None   # inline text; indexed on the fly
+    top_k: int = RETRIEVAL_TOP_K
+
+async def index_text(text: str) -> dict:
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="Document is empty")
+    document_id, index = await run_in_threadpool(document_indexes.add, text)
+    return {"document_id": document_id, "chunks": len(index.chunks)}
+
+@router.post("/documents")
+async def add_document(payload: DocumentText):
+    """
+    Index notes or a summary for contextual questions; returns its document_id.
+    """
+    return await index_text(payload.text)
+
+@router.post("/documents/upload")
+async def upload_document(file: UploadFile = File(...)):
+    document = await read_document(file)
+    return await index_text(clean_text(await document.text()))
+
+@router.get("/documents/stats")
+async def document_stats():
+    return document_indexes.stats()
+
+# ----------------------------
+# Context-based Mentor (answers from the top-k chunks of an indexed document)
 # ----------------------------
 @router.post("/contextual")
-async def mentor_with_context(
-    message: str = Query(...),
-    context: str = Query(...),
-):
+async def mentor_with_context(payload: ContextualQuestion):
     """
     AI Mentor that answers based on uploaded content (e.g., summary or PDF text).
     """
+    if payload.document_id:
+        index = document_indexes.get(payload.document_id)
+        if index is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired document_id; upload it again")
+    elif payload.context:
+        _, index = await run_in_threadpool(document_indexes.add, payload.context)
+    else:
+        raise HTTPException(status_code=400, detail="Provide document_id or context")
+
     try:
-        model = genai.GenerativeModel("models/gemini-2.5-pro")
+        context = index.context(payload.message, max(1, min(payload.top_k, 20)))
         prompt = (
             "You are a helpful AI Mentor. Use the provided context to explain answers in simple, educational terms.\n\n"
-            f"Context:\n{context[:4000]}\n\n"
-            f"Student: {message}\nMentor:"
+            f"Context:\n{context}\n\n"
+            f"Student: {payload.message}\nMentor:"
         )
-        response = model.generate_content(prompt)
+        response = await llm.generate("models/gemini-2.5-pro", prompt)
         return {"reply": response.text.strip() if response and response.text else "Let's explore that together!"}
     except Exception as e:
         print("⚠️ Contextual mentor error:", e)
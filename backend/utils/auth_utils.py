@@ -1,10 +1,19 @@
 # backend/utils/auth_utils.py
 
+import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional, Tuple
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from backend.utils.cache_utils import ResultCache
+from backend.utils.executors import run_in_hash_pool
+
 # ---------------------------
 # Config
 # ---------------------------
@@ -12,7 +21,42 @@ SECRET_KEY = "supersecretkey"  # 🔑 Change this in production
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def load_signing_keys() -> dict:
+    """
+    JWT_KEYS="kid1:secret1,kid2:secret2". Every listed key verifies tokens;
+    JWT_ACTIVE_KID (default: the first) signs new ones, so keys rotate
+    without logging everyone out. Unset, SECRET_KEY is the only key and
+    tokens without a kid are still accepted; once set, they are rejected.
+    """
+    keys = {}
+    for part in os.getenv("JWT_KEYS", "").split(","):
+        if ":" in part:
+            kid, secret = part.split(":", 1)
+            keys[kid.strip()] = secret.strip()
+    return keys or {"default": SECRET_KEY}
+
+
+JWT_KEYS = load_signing_keys()
+# Tokens without a kid predate rotation; they verify only while SECRET_KEY is the key
+LEGACY_KEY = SECRET_KEY if not os.getenv("JWT_KEYS", "").strip() else None
+JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID") or next(iter(JWT_KEYS))
+# Verified tokens kept in memory until their own `exp`
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+USER_CLAIMS_TTL = int(os.getenv("USER_CLAIMS_TTL", str(ACCESS_TOKEN_EXPIRE_MINUTES * 60)))
+# Accounts allowed to use admin endpoints (the users table has no roles); empty = none
+ADMIN_EMAILS = {e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()}
+
+# bcrypt cost factor; hashes made with any other cost are upgraded on next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 
 
 # ---------------------------
@@ -27,6 +71,13 @@ def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """
+    Hash a batch of passwords in one call (one pool task per batch for bulk imports).
+    """
+    return [hash_password(p) for p in passwords]
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a password against its hash.
@@ -36,27 +87,131 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and, if its hash uses an outdated cost, return a new hash.
+    """
+    if len(plain_password) > 72:
+        plain_password = plain_password[:72]
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    hash_password on the bcrypt process pool (raises ExecutorBusy when saturated).
+    """
+    return await run_in_hash_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    verify_and_update_password on the bcrypt process pool.
+    """
+    return await run_in_hash_pool(verify_and_update_password, plain_password, hashed_password)
+
+
 # ---------------------------
 # JWT Helpers
 # ---------------------------
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
-    Create a JWT access token.
+    Create a JWT access token signed with the active key (its id goes in the `kid` header).
     """
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
 
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(
+        to_encode, JWT_KEYS[JWT_ACTIVE_KID], algorithm=ALGORITHM, headers={"kid": JWT_ACTIVE_KID}
+    )
     return encoded_jwt
 
 
+class TokenCache:
+    """
+    Small LRU of verified token -> claims; entries expire at the token's `exp`.
+    """
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return entry[1]
+
+    def set(self, token: str, claims: dict):
+        exp = claims.get("exp")
+        if not exp:
+            return
+        with self._lock:
+            self._entries[token] = (exp, claims)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache()
+# Optional per-user claims (keyed by `sub`) so protected routes never need MySQL
+user_claims = ResultCache("user_claims", ttl=USER_CLAIMS_TTL, db_path=None)
+
+
 def decode_access_token(token: str):
     """
-    Decode a JWT access token.
+    Decode a JWT access token (cached until it expires).
     """
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = JWT_KEYS.get(kid) if kid else LEGACY_KEY
+        if key is None:
+            return None
+        payload = jwt.decode(token, key, algorithms=[ALGORITHM])
     except JWTError:
         return None
+    token_cache.set(token, payload)
+    return payload
+
+
+# ---------------------------
+# FastAPI dependency
+# ---------------------------
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> dict:
+    """
+    Verify the bearer token and return its claims (merged with cached user claims).
+    """
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    claims = decode_access_token(credentials.credentials)
+    if not claims or not claims.get("sub"):
+        raise HTTPException(status_code=401, detail="Invalid or expired token", headers={"WWW-Authenticate": "Bearer"})
+    extra = user_claims.get(claims["sub"])
+    return {**claims, **extra} if extra else claims
+
+
+async def require_admin(current_user: dict = Depends(get_current_user)) -> dict:
+    """
+    get_current_user restricted to the accounts listed in ADMIN_EMAILS.
+    """
+    if current_user["sub"].lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
@@ -0,0 +1,239 @@
+# backend/utils/cache_utils.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from backend.utils import metrics
+
+# ---------------------------
+# Config
+# ---------------------------
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "512"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", str(24 * 3600)))
+# Optional SQLite file shared by all workers on the host (disabled when empty)
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "")
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_key(*parts) -> str:
+    """
+    Join key parts (content hash, mode, prompt version, model name, ...).
+    """
+    return ":".join(str(p) for p in parts)
+
+
+# ---------------------------
+# Two-tier cache
+# ---------------------------
+_caches = []
+
+
+def cache_metrics():
+    samples = {"hits": [], "misses": [], "entries": [], "bytes": []}
+    for cache in _caches:
+        stats = cache.stats()
+        for field, values in samples.items():
+            values.append(({"cache": cache.namespace}, stats[field]))
+    return [
+        ("cache_hits_total", "counter", "Cache lookups served (memory or SQLite tier)", samples["hits"]),
+        ("cache_misses_total", "counter", "Cache lookups that missed", samples["misses"]),
+        ("cache_entries", "gauge", "Entries held in memory", samples["entries"]),
+        ("cache_bytes", "gauge", "Bytes held in memory", samples["bytes"]),
+    ]
+
+
+metrics.register_collector(cache_metrics)
+
+
+class ResultCache:
+    """
+    In-process LRU cache with entry-count, byte-size and TTL eviction,
+    optionally backed by a SQLite table shared across worker processes.
+    Values must be JSON-serializable. Async code uses aget()/aset(), which
+    only leave the event loop when the SQLite tier has to be queried.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_bytes: int = CACHE_MAX_BYTES,
+        ttl: int = CACHE_TTL_SECONDS,
+        db_path: Optional[str] = CACHE_DB_PATH,
+    ):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.db_path = db_path or None
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self._db_lock = threading.Lock()  # one connection per process, shared by threads
+        self._writes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _caches.append(self)
+        if self.db_path:
+            with self._db_lock:
+                self._db().execute(
+                    "CREATE TABLE IF NOT EXISTS cache ("
+                    " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                    " expires_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+                )
+
+    # ---- public API ----
+    def get(self, key: str) -> Any:
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not None:
+            return value
+        return self._disk_lookup(key, now)
+
+    async def aget(self, key: str) -> Any:
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not None:
+            return value
+        if not self.db_path:
+            return self._miss()
+        return await run_in_threadpool(self._disk_lookup, key, now)
+
+    def set(self, key: str, value: Any):
+        payload, expires_at = self._memory_set(key, value)
+        if self.db_path:
+            self._disk_set(key, payload, expires_at)
+
+    async def aset(self, key: str, value: Any):
+        payload, expires_at = self._memory_set(key, value)
+        if self.db_path:
+            await run_in_threadpool(self._disk_set, key, payload, expires_at)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.db_path:
+            try:
+                with self._db_lock:
+                    self._db().execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+            except sqlite3.Error as e:
+                print("⚠️ Cache clear failed:", e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "disk_tier": bool(self.db_path),
+            }
+
+    # ---- memory tier ----
+    def _memory_get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+                self._remove(key)
+        return None
+
+    def _memory_set(self, key, value):
+        payload = json.dumps(value)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, value, len(payload), expires_at)
+        return payload, expires_at
+
+    def _miss(self):
+        with self._lock:
+            self.misses += 1
+        return None
+
+    # caller holds the lock
+    def _store(self, key, value, size, expires_at):
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (expires_at, size, value)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    # ---- disk tier (blocking; async callers reach it through the threadpool) ----
+    def _db(self) -> sqlite3.Connection:
+        """
+        The process's connection (caller holds _db_lock); reopened after a fork.
+        """
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def _disk_lookup(self, key, now):
+        row = self._disk_get(key, now) if self.db_path else None
+        if row is None:
+            return self._miss()
+        value = json.loads(row[0])
+        with self._lock:
+            self.hits += 1
+            self.disk_hits += 1
+            self._store(key, value, len(row[0]), row[1])
+        return value
+
+    def _disk_get(self, key, now):
+        try:
+            with self._db_lock:
+                return self._db().execute(
+                    "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+                    (self.namespace, key, now),
+                ).fetchone()
+        except sqlite3.Error as e:
+            print("⚠️ Cache read failed:", e)
+            return None
+
+    def _disk_set(self, key, payload, expires_at):
+        try:
+            with self._db_lock:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, payload, expires_at),
+                )
+                self._writes += 1
+                if self._writes % 100 == 0:
+                    db.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error as e:
+            print("⚠️ Cache write failed:", e)
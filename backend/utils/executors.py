@@ -0,0 +1,147 @@
+# backend/utils/executors.py
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+# ---------------------------
+# Config
+# ---------------------------
+# Process pool for CPU-bound document extraction (PyPDF2 / docx / pptx)
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Thread pool for HuggingFace pipelines (torch releases the GIL while running)
+HF_WORKERS = int(os.getenv("HF_WORKERS", "1"))
+# Process pool of warm OCR workers (tesseract)
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Process pool for bcrypt hashing/verification, and how many calls may queue on it
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", str(HASH_WORKERS * 8)))
+# Max Gemini calls in flight per worker process
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_ocr_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pending = 0
+
+# Semaphores bound the work queued on each pool so a burst of uploads
+# waits on the event loop instead of piling up inside the executor.
+_extract_slots = asyncio.Semaphore(EXTRACT_WORKERS * 2)
+_hf_slots = asyncio.Semaphore(HF_WORKERS)
+_ocr_slots = asyncio.Semaphore(OCR_WORKERS * 2)
+_llm_slots = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+
+class ExecutorBusy(Exception):
+    """
+    Raised instead of queueing when a pool's backlog is full.
+    """
+
+
+# ---------------------------
+# Pools
+# ---------------------------
+def get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS)
+    return _process_pool
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(max_workers=HF_WORKERS, thread_name_prefix="hf")
+    return _thread_pool
+
+
+def get_ocr_pool() -> ProcessPoolExecutor:
+    global _ocr_pool
+    if _ocr_pool is None:
+        from backend.utils.ocr import init_ocr_worker
+
+        _ocr_pool = ProcessPoolExecutor(max_workers=OCR_WORKERS, initializer=init_ocr_worker)
+    return _ocr_pool
+
+
+def get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ProcessPoolExecutor(max_workers=HASH_WORKERS)
+    return _hash_pool
+
+
+def shutdown_executors():
+    """
+    Stop all pools (called on application shutdown).
+    """
+    global _process_pool, _thread_pool, _ocr_pool, _hash_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=False, cancel_futures=True)
+        _thread_pool = None
+    if _ocr_pool is not None:
+        _ocr_pool.shutdown(wait=False, cancel_futures=True)
+        _ocr_pool = None
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
+
+# ---------------------------
+# Async helpers
+# ---------------------------
+async def run_in_process(func, *args, **kwargs):
+    """
+    Run a picklable, CPU-bound function on the extraction process pool.
+    """
+    loop = asyncio.get_running_loop()
+    async with _extract_slots:
+        return await loop.run_in_executor(get_process_pool(), partial(func, *args, **kwargs))
+
+
+async def run_in_ocr_pool(func, *args, **kwargs):
+    """
+    Run an OCR job on the warm tesseract worker pool.
+    """
+    loop = asyncio.get_running_loop()
+    async with _ocr_slots:
+        return await loop.run_in_executor(get_ocr_pool(), partial(func, *args, **kwargs))
+
+
+async def run_in_hash_pool(func, *args, **kwargs):
+    """
+    Run a bcrypt call on the hashing pool. Rejects with ExecutorBusy once
+    HASH_MAX_PENDING calls are already queued, so login storms shed load
+    instead of building an unbounded backlog.
+    """
+    global _hash_pending
+    if _hash_pending >= HASH_MAX_PENDING:
+        raise ExecutorBusy("Password hashing queue is full")
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_hash_pool(), partial(func, *args, **kwargs))
+    finally:
+        _hash_pending -= 1
+
+
+async def run_in_thread(func, *args, **kwargs):
+    """
+    Run a blocking function (e.g. a HuggingFace pipeline) on the bounded thread pool.
+    """
+    loop = asyncio.get_running_loop()
+    async with _hf_slots:
+        return await loop.run_in_executor(get_thread_pool(), partial(func, *args, **kwargs))
+
+
+def llm_slot() -> asyncio.Semaphore:
+    """
+    Semaphore limiting concurrent LLM calls. Use as `async with llm_slot():`.
+    """
+    return _llm_slots
@@ -0,0 +1,175 @@
+# backend/utils/extraction.py
+
+import asyncio
+import os
+from typing import Iterator, Optional, Tuple
+
+import PyPDF2
+import docx
+from pptx import Presentation
+
+from backend.utils import metrics
+from backend.utils.executors import EXTRACT_WORKERS, run_in_process
+from backend.utils.ingest import IMAGE_EXTENSIONS, open_source
+from backend.utils.ocr import ocr_image, ocr_pdf_pages
+
+# ---------------------------
+# Config
+# ---------------------------
+# Pages handled by one process-pool task when a PDF is split into ranges
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "25"))
+
+
+# ---------------------------
+# Page / slide generators
+# ---------------------------
+def iter_pdf_pages(file, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+    reader = PyPDF2.PdfReader(file)
+    stop = len(reader.pages) if stop is None else min(stop, len(reader.pages))
+    for i in range(start, stop):
+        yield reader.pages[i].extract_text() or ""
+
+
+def iter_docx_paragraphs(file) -> Iterator[str]:
+    document = docx.Document(file)
+    for p in document.paragraphs:
+        yield p.text
+
+
+def iter_pptx_slides(file) -> Iterator[str]:
+    prs = Presentation(file)
+    for slide in prs.slides:
+        yield " ".join(shape.text for shape in slide.shapes if hasattr(shape, "text"))
+
+
+def page_has_images(page) -> bool:
+    try:
+        xobjects = page["/Resources"].get_object().get("/XObject")
+        if not xobjects:
+            return False
+        return any(x.get_object().get("/Subtype") == "/Image" for x in xobjects.get_object().values())
+    except Exception:
+        return False
+
+
+PAGE_ITERATORS = {
+    ".pdf": iter_pdf_pages,
+    ".docx": iter_docx_paragraphs,
+    ".doc": iter_docx_paragraphs,
+    ".pptx": iter_pptx_slides,
+    ".ppt": iter_pptx_slides,
+}
+SUPPORTED_EXTENSIONS = tuple(PAGE_ITERATORS) + IMAGE_EXTENSIONS
+
+
+def collect_text(pages: Iterator[str], max_chars: Optional[int] = None) -> Tuple[str, bool]:
+    """
+    Join pages until `max_chars` is reached. Returns (text, complete) where
+    `complete` is False if the generator was stopped early.
+    """
+    parts, total = [], 0
+    for page in pages:
+        if page:
+            parts.append(page)
+            total += len(page) + 1
+        if max_chars is not None and total >= max_chars:
+            pages.close()
+            return " ".join(parts), False
+    return " ".join(parts), True
+
+
+# ---------------------------
+# Process-pool entry points (take bytes or an upload's temp file path, must stay picklable)
+# ---------------------------
+def extract_text_from_source(source, ext: str, max_chars: Optional[int] = None) -> Tuple[str, bool]:
+    with open_source(source) as f:
+        return collect_text(PAGE_ITERATORS[ext](f), max_chars)
+
+
+def extract_pdf_range(source, start: int, stop: int, max_chars: Optional[int] = None):
+    """
+    Extract pages [start, stop) until `max_chars`. Returns (pages, complete,
+    total_pages) where `pages` is [(index, text)] in order and image-only
+    pages have text None (they need OCR).
+    """
+    with open_source(source) as f:
+        reader = PyPDF2.PdfReader(f)
+        total_pages = len(reader.pages)
+        pages, chars = [], 0
+        for i in range(start, min(stop, total_pages)):
+            page = reader.pages[i]
+            text = page.extract_text() or ""
+            if not text.strip() and page_has_images(page):
+                pages.append((i, None))
+                continue
+            pages.append((i, text))
+            if text:
+                chars += len(text) + 1
+            if max_chars is not None and chars >= max_chars:
+                return pages, False, total_pages
+    return pages, True, total_pages
+
+
+# ---------------------------
+# Async pipeline
+# ---------------------------
+@metrics.timed("extract")
+async def extract_document_text(
+    source, ext: str, max_chars: Optional[int] = None, digest: Optional[str] = None
+) -> Tuple[str, bool]:
+    """
+    Extract text on the process pool, stopping once `max_chars` is reached.
+    Large PDFs are split into page ranges that run in parallel, one wave of
+    EXTRACT_WORKERS ranges at a time; each range gets the whole remaining
+    budget, so a budgeted request parses at most one wave past what it uses.
+    Images and image-only PDF pages go to the OCR pool; a wave's scanned pages
+    are OCRed before the next wave starts and their text is kept in page order.
+    `source` is the upload's bytes or temp file path (see
+    backend/utils/ingest.py); `digest` keys the OCR cache and is required for paths.
+    """
+    if ext in IMAGE_EXTENSIONS:
+        return await ocr_image(source, max_chars, digest)
+    if ext != ".pdf":
+        return await run_in_process(extract_text_from_source, source, ext, max_chars)
+
+    parts, chars = [], 0
+    complete, next_page, total_pages = True, 0, None
+    while complete and (total_pages is None or next_page < total_pages):
+        remaining = None if max_chars is None else max_chars - chars
+        if remaining is not None and remaining <= 0:
+            complete = False
+            break
+        if total_pages is None:
+            # First range alone: short documents and small budgets stop here
+            ranges = [(0, PDF_PAGES_PER_TASK)]
+        else:
+            ranges = [
+                (s, min(s + PDF_PAGES_PER_TASK, total_pages))
+                for s in range(next_page, total_pages, PDF_PAGES_PER_TASK)
+            ][:EXTRACT_WORKERS]
+        results = await asyncio.gather(*(
+            run_in_process(extract_pdf_range, source, start, stop, remaining) for start, stop in ranges
+        ))
+        wave = []
+        for range_pages, range_complete, total_pages in results:
+            wave += range_pages
+            if not range_complete:
+                complete = False
+                break
+        next_page = ranges[-1][1]
+
+        scanned = [i for i, text in wave if text is None]
+        if scanned:
+            ocr_texts, ocr_complete = await ocr_pdf_pages(source, scanned, remaining, digest)
+            if not ocr_complete:
+                # Keep the pages before the first scanned page OCR did not reach
+                wave = [(i, text) for i, text in wave if i < next(n for n in scanned if n not in ocr_texts)]
+                complete = False
+            wave = [(i, ocr_texts.get(i, "") if text is None else text) for i, text in wave]
+        for _, text in wave:
+            if text:
+                parts.append(text)
+                chars += len(text) + 1
+    if total_pages is not None and next_page < total_pages:
+        complete = False
+    return " ".join(parts), complete
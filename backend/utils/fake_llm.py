@@ -0,0 +1,87 @@
+# backend/utils/fake_llm.py
+#
+# Offline stand-in for google.generativeai.GenerativeModel, selected with
+# LLM_BACKEND=fake. Latency, token rate and error rate are configurable so
+# retries, rate limiting and load can be exercised without a Gemini key.
+
+import asyncio
+import json
+import os
+import random
+import re
+
+from backend.utils.tokens import estimate_tokens
+
+# ---------------------------
+# Config
+# ---------------------------
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0.2"))          # seconds before the first token
+FAKE_LLM_TOKENS_PER_SEC = float(os.getenv("FAKE_LLM_TOKENS_PER_SEC", "400"))
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))      # fraction of calls failing with a 429
+
+
+class FakeQuotaError(Exception):
+    """
+    Mimics a 429 / RESOURCE_EXHAUSTED from the Gemini API.
+    """
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+def topic_words(prompt: str, n: int = 10):
+    words = re.findall(r"[A-Za-z]{5,}", prompt[-4000:])
+    seen = []
+    for w in words:
+        w = w.lower()
+        if w not in seen:
+            seen.append(w)
+    return seen[:n] or ["topic"]
+
+
+def fake_reply(prompt: str) -> str:
+    """
+    Deterministic, well-formed output for each prompt family the app sends.
+    """
+    lowered = prompt.lower()
+    topics = topic_words(prompt)
+    if "multiple-choice quiz" in lowered:
+        return json.dumps([
+            {
+                "question": f"Which statement about {topics[i % len(topics)]} is correct?",
+                "options": {"A": "Option A", "B": "Option B", "C": "Option C", "D": "Option D"},
+                "answer": "ABCD"[i % 4],
+            }
+            for i in range(10)
+        ])
+    if "flowchart" in lowered:
+        nodes = [{"id": str(i + 1), "label": t.title()} for i, t in enumerate(topics[:6])]
+        edges = [{"source": str(i), "target": str(i + 1)} for i in range(1, len(nodes))]
+        return json.dumps({"nodes": nodes, "edges": edges})
+    return "\n".join(f"- {t.title()}: a key idea explained in simple terms." for t in topics)
+
+
+class FakeModel:
+    def __init__(self, model_name: str, **kwargs):
+        self.model_name = model_name
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, stream: bool = False, **kwargs):
+        self.calls += 1
+        if FAKE_LLM_ERROR_RATE and random.random() < FAKE_LLM_ERROR_RATE:
+            await asyncio.sleep(FAKE_LLM_LATENCY / 2)
+            raise FakeQuotaError("429 Resource has been exhausted (fake backend)")
+        reply = fake_reply(str(prompt))
+        if stream:
+            return self._stream(reply)
+        await asyncio.sleep(FAKE_LLM_LATENCY + estimate_tokens(reply) / FAKE_LLM_TOKENS_PER_SEC)
+        return FakeResponse(reply)
+
+    async def _stream(self, reply: str):
+        await asyncio.sleep(FAKE_LLM_LATENCY)
+        for i in range(0, len(reply), 40):
+            piece = reply[i:i + 40]
+            await asyncio.sleep(estimate_tokens(piece) / FAKE_LLM_TOKENS_PER_SEC)
+            yield FakeResponse(piece)
@@ -0,0 +1,314 @@
+# backend/utils/ingest.py
+#
+# Upload ingestion for the document endpoints. Starlette spools a multipart file
+# part to a SpooledTemporaryFile while it arrives; UploadLimitMiddleware caps the
+# body during that receive, and ingest() makes one chunked pass over the spool
+# that sniffs magic bytes, hashes, enforces the per-type byte limit and copies
+# large uploads to a temp file, then checks page / pixel / unzipped-size limits
+# before any extractor sees the file. Extractors open large uploads by path
+# (memory-mapped), so process-pool tasks no longer each get a pickled copy.
+
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+import weakref
+import zipfile
+from typing import Optional, Union
+
+import PyPDF2
+from PIL import Image
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+MB = 1024 * 1024
+
+
+def megabytes(size: int) -> str:
+    return f"{round(size / MB, 1):g}MB"
+
+
+# ---------------------------
+# Config
+# ---------------------------
+INGEST_MAX_PDF_BYTES = int(os.getenv("INGEST_MAX_PDF_BYTES", str(50 * MB)))
+INGEST_MAX_OFFICE_BYTES = int(os.getenv("INGEST_MAX_OFFICE_BYTES", str(25 * MB)))
+INGEST_MAX_IMAGE_BYTES = int(os.getenv("INGEST_MAX_IMAGE_BYTES", str(20 * MB)))
+INGEST_MAX_PDF_PAGES = int(os.getenv("INGEST_MAX_PDF_PAGES", "500"))
+INGEST_MAX_IMAGE_PIXELS = int(os.getenv("INGEST_MAX_IMAGE_PIXELS", "60000000"))    # all frames together
+INGEST_MAX_UNZIPPED_BYTES = int(os.getenv("INGEST_MAX_UNZIPPED_BYTES", str(200 * MB)))  # docx/pptx contents
+# Any multipart body; checked while it is received, before the per-type limits
+INGEST_MAX_BYTES = int(os.getenv(
+    "INGEST_MAX_BYTES", str(max(INGEST_MAX_PDF_BYTES, INGEST_MAX_OFFICE_BYTES, INGEST_MAX_IMAGE_BYTES))
+))
+# Uploads up to this size stay in memory; larger ones go to a temp file
+INGEST_SPOOL_BYTES = int(os.getenv("INGEST_SPOOL_BYTES", str(1 * MB)))
+INGEST_TMP_DIR = os.getenv("INGEST_TMP_DIR") or None
+
+CHUNK_SIZE = 1 * MB
+MULTIPART_OVERHEAD = 64 * 1024  # boundaries and part headers around the file
+
+# ---------------------------
+# Formats
+# ---------------------------
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tif", ".tiff")
+ZIP_EXTENSIONS = (".docx", ".doc", ".pptx", ".ppt")
+# extension -> (kind, canonical extension handed to the extractors)
+EXTENSION_KINDS = {
+    ".pdf": ("pdf", ".pdf"),
+    ".docx": ("docx", ".docx"),
+    ".doc": ("docx", ".docx"),
+    ".pptx": ("pptx", ".pptx"),
+    ".ppt": ("pptx", ".pptx"),
+    **{ext: ("image", ext) for ext in IMAGE_EXTENSIONS},
+}
+MAX_BYTES = {
+    "pdf": INGEST_MAX_PDF_BYTES,
+    "docx": INGEST_MAX_OFFICE_BYTES,
+    "pptx": INGEST_MAX_OFFICE_BYTES,
+    "image": INGEST_MAX_IMAGE_BYTES,
+}
+# Member that identifies each Office format inside the zip container
+ZIP_MARKERS = {"docx": "word/document.xml", "pptx": "ppt/presentation.xml"}
+
+MAGIC = (
+    (b"%PDF-", "pdf"),
+    (b"PK\x03\x04", "zip"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "ole"),  # legacy binary .doc/.ppt
+    (b"\x89PNG\r\n\x1a\n", "image"),
+    (b"\xff\xd8\xff", "image"),                     # JPEG
+    (b"II*\x00", "image"),                          # TIFF, little-endian
+    (b"MM\x00*", "image"),                          # TIFF, big-endian
+)
+
+
+class UploadRejected(Exception):
+    """
+    An upload refused before parsing; carries the HTTP status (400, 413 or 415).
+    """
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def sniff(head: bytes) -> Optional[str]:
+    for magic, kind in MAGIC:
+        if head.startswith(magic):
+            return kind
+    # PDF readers accept the header anywhere in the first KB
+    return "pdf" if b"%PDF-" in head[:1024] else None
+
+
+def open_source(source: Union[bytes, str]):
+    """
+    File object for an extractor. Bytes are wrapped in BytesIO; paths are
+    memory-mapped, so every pool task reading the same upload shares it through
+    the page cache. Office files are zips, which zipfile seeks itself.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    if source.endswith(ZIP_EXTENSIONS):
+        return open(source, "rb")
+    with open(source, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def remove_file(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class IngestedFile:
+    """
+    A validated upload. `source` is its bytes when small, else the path of a
+    temp file that is removed once this object is garbage collected.
+    """
+
+    def __init__(self, source: Union[bytes, str], ext: str, size: int, digest: str):
+        self.source = source
+        self.ext = ext
+        self.size = size
+        self.digest = digest
+        self.pages = None
+        if isinstance(source, str):
+            self.discard = weakref.finalize(self, remove_file, source)
+
+    def read_bytes(self) -> bytes:
+        if isinstance(self.source, str):
+            with open(self.source, "rb") as f:
+                return f.read()
+        return self.source
+
+
+# ---------------------------
+# Ingestion
+# ---------------------------
+def copy_upload(file, ext: str) -> IngestedFile:
+    """
+    Sniff, hash and size-check the upload in CHUNK_SIZE pieces, keeping small
+    files in memory and writing larger ones to a temp file. A mislabeled file is
+    rejected after its first chunk, an oversized one as soon as it crosses the limit.
+    """
+    kind, canonical = EXTENSION_KINDS[ext]
+    file.seek(0)
+    chunk = file.read(CHUNK_SIZE)
+    if not chunk:
+        raise UploadRejected(400, "Empty file")
+    found = sniff(chunk)
+    if found == "ole":
+        raise UploadRejected(415, "Legacy .doc/.ppt files are not supported; save as .docx/.pptx")
+    if found != ("zip" if kind in ZIP_MARKERS else kind):
+        raise UploadRejected(415, f"File content does not match its {ext} extension")
+
+    limit = MAX_BYTES[kind]
+    digest = hashlib.sha256()
+    buffer, out, size = bytearray(), None, 0
+    try:
+        while chunk:
+            size += len(chunk)
+            if size > limit:
+                raise UploadRejected(413, f"{kind.upper()} uploads are limited to {megabytes(limit)}")
+            digest.update(chunk)
+            if out is not None:
+                out.write(chunk)
+            else:
+                buffer += chunk
+                if len(buffer) > INGEST_SPOOL_BYTES:
+                    out = tempfile.NamedTemporaryFile(
+                        prefix="edulearn-upload-", suffix=canonical, dir=INGEST_TMP_DIR, delete=False
+                    )
+                    out.write(buffer)
+                    buffer = None
+            chunk = file.read(CHUNK_SIZE)
+    except BaseException:
+        if out is not None:
+            out.close()
+            remove_file(out.name)
+        raise
+    if out is None:
+        return IngestedFile(bytes(buffer), canonical, size, digest.hexdigest())
+    out.close()
+    return IngestedFile(out.name, canonical, size, digest.hexdigest())
+
+
+def check_structure(upload: IngestedFile):
+    """
+    Per-type limits that need the container's own metadata: PDF page count,
+    image pixels, and the unzipped size and format of Office files. Only
+    headers / the central directory are read, never the page contents.
+    """
+    kind = EXTENSION_KINDS[upload.ext][0]
+    try:
+        with open_source(upload.source) as f:
+            if kind == "pdf":
+                upload.pages = len(PyPDF2.PdfReader(f).pages)
+                if upload.pages > INGEST_MAX_PDF_PAGES:
+                    raise UploadRejected(413, f"PDF has {upload.pages} pages; the limit is {INGEST_MAX_PDF_PAGES}")
+            elif kind == "image":
+                with Image.open(f) as image:
+                    upload.pages = getattr(image, "n_frames", 1)
+                    if image.width * image.height * upload.pages > INGEST_MAX_IMAGE_PIXELS:
+                        raise UploadRejected(413, "Image resolution is too large")
+            else:
+                with zipfile.ZipFile(f) as archive:
+                    names = set(archive.namelist())
+                    if ZIP_MARKERS[kind] not in names:
+                        raise UploadRejected(415, f"File content does not match its {upload.ext} extension")
+                    if sum(info.file_size for info in archive.infolist()) > INGEST_MAX_UNZIPPED_BYTES:
+                        raise UploadRejected(413, "Document expands beyond the allowed size")
+    except UploadRejected:
+        raise
+    except Image.DecompressionBombError:
+        raise UploadRejected(413, "Image resolution is too large")
+    except Exception as e:
+        raise UploadRejected(415, f"Could not read {upload.ext} file: {e.__class__.__name__}")
+
+
+def ingest(file, ext: str) -> IngestedFile:
+    upload = copy_upload(file, ext)
+    try:
+        check_structure(upload)
+    except UploadRejected:
+        if isinstance(upload.source, str):
+            upload.discard()
+        raise
+    return upload
+
+
+async def ingest_upload(upload_file, ext: str) -> IngestedFile:
+    """
+    Run ingest() on a worker thread; the copy and header checks are blocking file I/O.
+    """
+    return await run_in_threadpool(ingest, upload_file.file, ext)
+
+
+async def ingest_bytes(data: bytes, ext: str) -> IngestedFile:
+    """
+    ingest() for an upload that arrives as one message (Socket.IO binary payloads).
+    """
+    return await run_in_threadpool(ingest, io.BytesIO(data), ext)
+
+
+# ---------------------------
+# ASGI middleware
+# ---------------------------
+class UploadLimitMiddleware:
+    """
+    Rejects multipart bodies over INGEST_MAX_BYTES with 413 while they are
+    received: up front from Content-Length, or as soon as a chunked body
+    crosses the limit, so an oversized upload is never spooled whole.
+    """
+
+    def __init__(self, app, max_bytes: int = INGEST_MAX_BYTES):
+        self.app = app
+        self.limit = max_bytes + MULTIPART_OVERHEAD
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+        too_large = JSONResponse({"detail": f"Uploads are limited to {megabytes(INGEST_MAX_BYTES)}"}, status_code=413)
+        length = dict(scope["headers"]).get(b"content-length")
+        if length and length.isdigit() and int(length) > self.limit:
+            await too_large(scope, receive, send)
+            return
+
+        state = {"received": 0, "exceeded": False, "started": False}
+
+        async def limited_receive():
+            if state["exceeded"]:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                state["received"] += len(message.get("body", b""))
+                if state["received"] > self.limit:
+                    # The form parser sees a disconnect and stops spooling
+                    state["exceeded"] = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            if state["exceeded"]:
+                return  # the app's error for the cut-off body; 413 is sent below
+            state["started"] = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not state["exceeded"]:
+                raise
+        if state["exceeded"] and not state["started"]:
+            await too_large(scope, receive, send)
+
+    @staticmethod
+    def _is_multipart(scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"content-type":
+                return value.startswith(b"multipart/")
+        return False
@@ -0,0 +1,324 @@
+# backend/utils/jobs.py
+#
+# Persistent background job queue (SQLite) for heavy document operations.
+# Jobs are claimed highest priority first, then oldest first, by a small pool
+# of worker coroutines in each process; several uvicorn workers can share
+# the same database file.
+
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from backend.utils import metrics
+
+# ---------------------------
+# Config
+# ---------------------------
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join(tempfile.gettempdir(), "jobs.sqlite3"))
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "2"))                # worker coroutines per process
+JOBS_MAX_QUEUED = int(os.getenv("JOBS_MAX_QUEUED", "1000"))
+JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "1"))  # picks up jobs queued by other workers
+JOBS_RETENTION = int(os.getenv("JOBS_RETENTION", str(24 * 3600)))
+
+FINISHED = ("done", "failed", "cancelled")
+
+
+class QueueFull(Exception):
+    """
+    Raised by submit() when JOBS_MAX_QUEUED jobs are already waiting.
+    """
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a handler's progress() call once the job is cancelled.
+    """
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobQueue:
+    """
+    submit() stores the job and its payload; workers claim it, run the handler
+    registered for its kind and store the JSON result. Handlers receive the job
+    dict and an async progress(fraction, stage) callback.
+    """
+
+    def __init__(self, db_path: str = JOBS_DB_PATH, workers: int = JOBS_WORKERS):
+        self.db_path = db_path
+        self.workers = workers
+        self.handlers: Dict[str, Callable[..., Awaitable]] = {}
+        self.listeners: List[Callable[[dict], Awaitable]] = []
+        self._conn = None
+        self._lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._updated: Dict[str, asyncio.Event] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    # ---------------------------
+    # Storage
+    # ---------------------------
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT UNIQUE, kind TEXT, priority INTEGER, status TEXT,
+                    progress REAL, stage TEXT, payload BLOB, meta TEXT,
+                    result TEXT, error TEXT, cancel_requested INTEGER DEFAULT 0,
+                    worker INTEGER, created REAL, started REAL, finished REAL)"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority DESC, seq)")
+        return self._conn
+
+    def _execute(self, sql: str, params=()) -> list:
+        with self._lock:
+            return self._db().execute(sql, params).fetchall()
+
+    def _insert(self, job_id: str, kind: str, payload: bytes, meta: dict, priority: int):
+        with self._lock:
+            db = self._db()
+            (queued,) = db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()
+            if queued >= JOBS_MAX_QUEUED:
+                raise QueueFull(f"{queued} jobs already queued")
+            db.execute(
+                "INSERT INTO jobs (id, kind, priority, status, progress, stage, payload, meta, created) "
+                "VALUES (?, ?, ?, 'queued', 0, 'queued', ?, ?, ?)",
+                (job_id, kind, priority, payload, json.dumps(meta), time.time()),
+            )
+            db.execute("DELETE FROM jobs WHERE finished < ?", (time.time() - JOBS_RETENTION,))
+
+    def _claim(self) -> Optional[dict]:
+        """
+        Atomically move the best queued job to running (BEGIN IMMEDIATE holds
+        the write lock, so two processes cannot claim the same job).
+        """
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' ORDER BY priority DESC, seq LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    db.execute(
+                        "UPDATE jobs SET status = 'running', stage = 'starting', worker = ?, started = ? WHERE id = ?",
+                        (os.getpid(), time.time(), row["id"]),
+                    )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job = dict(row)
+        job["meta"] = json.loads(job["meta"] or "{}")
+        return job
+
+    def _recover(self):
+        """
+        Requeue jobs left running by processes that no longer exist (or by an
+        earlier process with this pid, common in containers).
+        """
+        rows = self._execute("SELECT id, worker FROM jobs WHERE status = 'running'")
+        for row in rows:
+            if not row["worker"] or row["worker"] == os.getpid() or not pid_alive(row["worker"]):
+                self._execute(
+                    "UPDATE jobs SET status = 'queued', stage = 'queued', progress = 0 WHERE id = ?", (row["id"],)
+                )
+
+    def _cancel_requested(self, job_id: str) -> bool:
+        rows = self._execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,))
+        return bool(rows and rows[0][0])
+
+    def _fetch(self, job_id: str) -> Optional[dict]:
+        rows = self._execute(
+            "SELECT id, kind, priority, status, progress, stage, meta, result, error, created, started, finished, "
+            "(SELECT COUNT(*) FROM jobs q WHERE q.status = 'queued' AND (q.priority > j.priority OR "
+            "(q.priority = j.priority AND q.seq < j.seq))) AS ahead FROM jobs j WHERE id = ?",
+            (job_id,),
+        )
+        if not rows:
+            return None
+        job = dict(rows[0])
+        job["meta"] = json.loads(job["meta"] or "{}")
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        if job["status"] != "queued":
+            job.pop("ahead")
+        return job
+
+    def _cancel(self, job_id: str):
+        self._execute(
+            "UPDATE jobs SET status = 'cancelled', stage = 'cancelled', payload = NULL, finished = ? "
+            "WHERE id = ? AND status = 'queued'",
+            (time.time(), job_id),
+        )
+        self._execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,))
+
+    def stats(self) -> dict:
+        rows = self._execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")
+        return {
+            "workers": self.workers,
+            "running_here": len(self._running),
+            **{row["status"]: row["n"] for row in rows},
+        }
+
+    # ---------------------------
+    # API (SQLite calls run in the threadpool: another process may hold the
+    # write lock for up to the 30s busy timeout)
+    # ---------------------------
+    def register(self, kind: str, handler: Callable[..., Awaitable]):
+        self.handlers[kind] = handler
+
+    async def submit(self, kind: str, payload: bytes, meta: dict = None, priority: int = 0) -> str:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        await run_in_threadpool(self._insert, job_id, kind, payload, meta or {}, priority)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        await self._notify(job_id)
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await run_in_threadpool(self._fetch, job_id)
+
+    async def cancel(self, job_id: str) -> Optional[dict]:
+        """
+        Queued jobs are cancelled at once; running ones stop at their next
+        progress report (or immediately when running in this process).
+        """
+        await run_in_threadpool(self._cancel, job_id)
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        await self._notify(job_id)
+        return await self.get(job_id)
+
+    async def wait_update(self, job_id: str, timeout: float):
+        """
+        Wait for a local update to the job, or `timeout` seconds (updates made
+        by other processes are picked up by re-reading after the timeout).
+        """
+        event = self._updated.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        event.clear()
+
+    async def _notify(self, job_id: str):
+        event = self._updated.get(job_id)
+        if event is not None:
+            event.set()
+        if self.listeners:
+            job = await self.get(job_id)
+            for listener in self.listeners:
+                try:
+                    await listener(job)
+                except Exception as e:
+                    print("⚠️ Job listener failed:", e)
+
+    # ---------------------------
+    # Workers
+    # ---------------------------
+    async def start(self):
+        if self._tasks:
+            return
+        await run_in_threadpool(self._recover)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks + list(self._running.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        while True:
+            job = await run_in_threadpool(self._claim)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), JOBS_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            task = asyncio.ensure_future(self._run(job))
+            self._running[job["id"]] = task
+            try:
+                await asyncio.wait({task})
+            finally:
+                self._running.pop(job["id"], None)
+                self._updated.pop(job["id"], None)
+
+    async def _run(self, job: dict):
+        job_id = job["id"]
+
+        async def progress(fraction: float, stage: str):
+            if await run_in_threadpool(self._cancel_requested, job_id):
+                raise JobCancelled()
+            await run_in_threadpool(
+                self._execute, "UPDATE jobs SET progress = ?, stage = ? WHERE id = ?", (fraction, stage, job_id)
+            )
+            await self._notify(job_id)
+
+        await self._notify(job_id)
+        try:
+            result = await self.handlers[job["kind"]](job, progress)
+            status, fields = "done", {"result": json.dumps(result), "progress": 1.0, "stage": "done"}
+        except asyncio.CancelledError:
+            # Synchronous on purpose: on shutdown the loop may close before a
+            # threadpool call returns, and the job would stay marked running
+            if not self._cancel_requested(job_id):
+                # Shutting down: hand the job to the next process
+                self._execute(
+                    "UPDATE jobs SET status = 'queued', stage = 'queued', progress = 0 WHERE id = ?", (job_id,)
+                )
+                raise
+            status, fields = "cancelled", {"stage": "cancelled"}
+        except JobCancelled:
+            status, fields = "cancelled", {"stage": "cancelled"}
+        except Exception as e:
+            print(f"⚠️ Job {job_id} ({job['kind']}) failed:", e)
+            status, fields = "failed", {"error": getattr(e, "detail", None) or str(e), "stage": "failed"}
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        await run_in_threadpool(
+            self._execute,
+            f"UPDATE jobs SET status = ?, {assignments}, payload = NULL, finished = ? WHERE id = ?",
+            (status, *fields.values(), time.time(), job_id),
+        )
+        await self._notify(job_id)
+
+
+job_queue = JobQueue()
+
+
+def job_metrics():
+    stats = job_queue.stats()
+    return [("jobs", "gauge", "Background jobs by status",
+             [({"status": s}, stats.get(s, 0)) for s in ("queued", "running") + FINISHED])]
+
+
+metrics.register_collector(job_metrics)
@@ -0,0 +1,348 @@
+# backend/utils/llm_client.py
+
+import asyncio
+import hashlib
+import os
+import random
+import time
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+import google.generativeai as genai
+
+from backend.utils import metrics
+from backend.utils.executors import llm_slot
+from backend.utils.fake_llm import FakeModel, FakeQuotaError
+from backend.utils.tokens import estimate_tokens
+
+try:
+    from google.api_core import exceptions as google_exceptions
+
+    RETRYABLE_ERRORS = (
+        google_exceptions.ResourceExhausted,     # 429 quota
+        google_exceptions.TooManyRequests,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.InternalServerError,
+        google_exceptions.DeadlineExceeded,
+        FakeQuotaError,
+    )
+except ImportError:
+    RETRYABLE_ERRORS = (FakeQuotaError,)
+
+# ---------------------------
+# Config
+# ---------------------------
+load_dotenv()
+GEMINI_API_KEY = os.getenv("GOOGLE_API_KEY")
+# "gemini" (default) or "fake" for offline runs (see backend/utils/fake_llm.py)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "20"))
+# Start a second, identical request if the first has not answered after this
+# many seconds (0 disables hedging)
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "0"))
+
+# Per-model quotas as (requests per minute, tokens per minute);
+# override with LLM_QUOTAS="models/gemini-2.5-flash=1000:1000000,models/gemini-2.5-pro=150:2000000"
+DEFAULT_QUOTA = (60, 250_000)
+QUOTAS = {
+    "models/gemini-2.5-flash": (1000, 1_000_000),
+    "models/gemini-2.5-pro": (150, 2_000_000),
+}
+for part in os.getenv("LLM_QUOTAS", "").split(","):
+    if "=" in part and ":" in part:
+        name, limits = part.split("=", 1)
+        rpm, tpm = limits.split(":", 1)
+        QUOTAS[name.strip()] = (int(rpm), int(tpm))
+
+if LLM_BACKEND == "gemini" and GEMINI_API_KEY:
+    genai.configure(api_key=GEMINI_API_KEY)
+
+
+def is_configured() -> bool:
+    return LLM_BACKEND == "fake" or bool(GEMINI_API_KEY)
+
+
+# ---------------------------
+# Rate limiting
+# ---------------------------
+class TokenBucket:
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    RPM and TPM token buckets for one model; waiters are served in order.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._lock = asyncio.Lock()
+
+    def try_acquire(self, tokens: int) -> bool:
+        if self._lock.locked() or self.requests.wait_time(1) or self.tokens.wait_time(tokens):
+            return False
+        self.requests.take(1)
+        self.tokens.take(tokens)
+        return True
+
+    async def acquire(self, tokens: int) -> float:
+        """
+        Wait until one request and `tokens` tokens are available; returns seconds waited.
+        """
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                if wait <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    return time.monotonic() - start
+                await asyncio.sleep(wait)
+
+
+# ---------------------------
+# Client
+# ---------------------------
+_models: Dict[str, object] = {}
+_limiters: Dict[str, RateLimiter] = {}
+_stats = {
+    "calls": 0,
+    "retries": 0,
+    "failures": 0,
+    "hedges": 0,
+    "hedge_wins": 0,
+    "rate_limit_wait_seconds": 0.0,
+}
+
+
+def get_model(model_name: str):
+    """
+    One GenerativeModel (or fake) per model name, shared by all requests.
+    """
+    model = _models.get(model_name)
+    if model is None:
+        model = FakeModel(model_name) if LLM_BACKEND == "fake" else genai.GenerativeModel(model_name)
+        _models[model_name] = model
+    return model
+
+
+def get_limiter(model_name: str) -> RateLimiter:
+    limiter = _limiters.get(model_name)
+    if limiter is None:
+        limiter = _limiters[model_name] = RateLimiter(*QUOTAS.get(model_name, DEFAULT_QUOTA))
+    return limiter
+
+
+def stats() -> dict:
+    return {
+        "backend": LLM_BACKEND,
+        **{k: round(v, 3) if isinstance(v, float) else v for k, v in _stats.items()},
+        "single_flight": single_flight.stats(),
+    }
+
+
+def llm_metrics():
+    events = {"attempt": "calls", "retry": "retries", "failure": "failures", "hedge": "hedges", "hedge_win": "hedge_wins"}
+    return [
+        ("llm_events_total", "counter", "Upstream LLM attempts, retries, failures and hedges",
+         [({"event": event}, _stats[key]) for event, key in events.items()]),
+        ("llm_rate_limit_wait_seconds_total", "counter", "Time spent waiting for quota",
+         [({}, _stats["rate_limit_wait_seconds"])]),
+        ("llm_coalesced_total", "counter", "Calls that joined an identical in-flight call",
+         [({}, single_flight.coalesced)]),
+    ]
+
+
+def response_tokens(response, prompt_tokens: int):
+    """
+    (prompt, completion) tokens from usage_metadata, else estimated.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None and getattr(usage, "candidates_token_count", None):
+        return getattr(usage, "prompt_token_count", None) or prompt_tokens, usage.candidates_token_count
+    try:
+        return prompt_tokens, estimate_tokens(response.text or "")
+    except Exception:
+        return prompt_tokens, 0  # blocked / no candidates
+
+
+def record_call(model_name: str, start: float, prompt_tokens: int, completion_tokens: int):
+    metrics.record("llm_request_seconds", time.perf_counter() - start, model=model_name)
+    metrics.inc("llm_tokens_total", prompt_tokens, model=model_name, kind="prompt")
+    metrics.inc("llm_tokens_total", completion_tokens, model=model_name, kind="completion")
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Exponential backoff with full jitter.
+    """
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)))
+
+
+async def _hedged_call(model, limiter: RateLimiter, prompt, tokens: int, kwargs):
+    first = asyncio.ensure_future(model.generate_content_async(prompt, **kwargs))
+    tasks = {first}
+    try:
+        if LLM_HEDGE_AFTER > 0:
+            done, _ = await asyncio.wait(tasks, timeout=LLM_HEDGE_AFTER)
+            # Hedge only when the quota has room right now; never wait for it
+            if not done and limiter.try_acquire(tokens):
+                _stats["hedges"] += 1
+                tasks.add(asyncio.ensure_future(model.generate_content_async(prompt, **kwargs)))
+        pending, error = set(tasks), None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not first:
+                        _stats["hedge_wins"] += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def generate(model_name: str, prompt, **kwargs):
+    """
+    generate_content_async through the shared model, rate limiter, global
+    concurrency limit, retries with jittered backoff and optional hedging.
+    """
+    model = get_model(model_name)
+    limiter = get_limiter(model_name)
+    tokens = estimate_tokens(str(prompt))
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        _stats["rate_limit_wait_seconds"] += await limiter.acquire(tokens)
+        _stats["calls"] += 1
+        try:
+            async with llm_slot():
+                response = await _hedged_call(model, limiter, prompt, tokens, kwargs)
+            record_call(model_name, start, *response_tokens(response, tokens))
+            return response
+        except RETRYABLE_ERRORS as e:
+            attempt += 1
+            if attempt > LLM_MAX_RETRIES:
+                _stats["failures"] += 1
+                raise
+            delay = backoff_delay(attempt)
+            _stats["retries"] += 1
+            print(f"⚠️ {model_name} call failed ({e.__class__.__name__}), retry {attempt} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        except Exception:
+            _stats["failures"] += 1
+            raise
+
+
+# ---------------------------
+# Request coalescing
+# ---------------------------
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one in-flight task. The task is
+    shielded, so one caller disconnecting does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn):
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Future):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+    def stats(self) -> dict:
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._inflight)}
+
+
+single_flight = SingleFlight()
+metrics.register_collector(llm_metrics)
+
+
+def prompt_key(model_name: str, prompt, kwargs: dict) -> str:
+    raw = f"{model_name}\x00{prompt}\x00{sorted(kwargs.items())!r}"
+    return hashlib.sha256(raw.encode("utf-8", "replace")).hexdigest()
+
+
+async def generate_coalesced(model_name: str, prompt, **kwargs):
+    """
+    generate(), but identical concurrent prompts await a single upstream call.
+    """
+    key = prompt_key(model_name, prompt, kwargs)
+    return await single_flight.do(key, lambda: generate(model_name, prompt, **kwargs))
+
+
+async def generate_text(model_name: str, prompt, **kwargs) -> Optional[str]:
+    response = await generate_coalesced(model_name, prompt, **kwargs)
+    if response and getattr(response, "text", None):
+        return response.text.strip()
+    return None
+
+
+async def stream(model_name: str, prompt, **kwargs):
+    """
+    Yield text pieces from a streamed call. Retries apply only until the stream opens.
+    """
+    model = get_model(model_name)
+    limiter = get_limiter(model_name)
+    tokens = estimate_tokens(str(prompt))
+    start = time.perf_counter()
+    attempt = 0
+    async with llm_slot():
+        while True:
+            _stats["rate_limit_wait_seconds"] += await limiter.acquire(tokens)
+            _stats["calls"] += 1
+            try:
+                response = await model.generate_content_async(prompt, stream=True, **kwargs)
+                break
+            except RETRYABLE_ERRORS as e:
+                attempt += 1
+                if attempt > LLM_MAX_RETRIES:
+                    _stats["failures"] += 1
+                    raise
+                _stats["retries"] += 1
+                print(f"⚠️ {model_name} stream failed ({e.__class__.__name__}), retry {attempt}")
+                await asyncio.sleep(backoff_delay(attempt))
+        completion = 0
+        async for chunk in response:
+            piece = getattr(chunk, "text", "")
+            if piece:
+                completion += estimate_tokens(piece)
+                yield piece
+        record_call(model_name, start, tokens, completion)
@@ -0,0 +1,216 @@
+# backend/utils/metrics.py
+#
+# In-process telemetry: Prometheus histograms, counters and scrape-time
+# collectors, rendered on /metrics.
+
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+
+# ---------------------------
+# Stage latency
+# ---------------------------
+def observe(name: str, seconds: float):
+    """Record a stage latency in the stage_seconds histogram ("<stage>_seconds")."""
+    record("stage_seconds", seconds, stage=name[:-8] if name.endswith("_seconds") else name)
+
+
+# ---------------------------
+# Prometheus families
+# ---------------------------
+PREFIX = "edulearn_"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+FAMILIES = {
+    # name: (type, help)
+    "http_request_duration_seconds": ("histogram", "HTTP request latency by route template and status"),
+    "stage_seconds": ("histogram", "Latency of pipeline stages (extraction, OCR, LLM, HF, DB)"),
+    "stage_errors_total": ("counter", "Stages that raised"),
+    "llm_request_seconds": ("histogram", "LLM calls including rate-limit waits and retries, by model"),
+    "llm_tokens_total": ("counter", "LLM tokens by model and kind (prompt, completion)"),
+    "fallbacks_total": ("counter", "Requests served by a fallback path, by kind"),
+    "explainer_tier_total": ("counter", "Explainer requests by routed tier (local, flash, pro)"),
+    "structured_output_total": ("counter", "Quiz/flowchart replies by outcome (valid, salvaged, repaired, empty)"),
+}
+
+# (name, label pairs) -> [non-cumulative bucket counts..., +Inf count], sum
+_histograms: Dict[Tuple[str, tuple], list] = {}
+_counters: Dict[Tuple[str, tuple], float] = {}
+_collectors: List[Callable] = []
+_series_lock = threading.Lock()
+
+
+def record(name: str, value: float, **labels):
+    """
+    Add one observation to histogram `name`.
+    """
+    key = (name, tuple(labels.items()))
+    index = bisect_left(LATENCY_BUCKETS, value)
+    with _series_lock:
+        series = _histograms.get(key)
+        if series is None:
+            series = _histograms[key] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0]
+        series[0][index] += 1
+        series[1] += value
+
+
+def inc(name: str, amount: float = 1, **labels):
+    key = (name, tuple(labels.items()))
+    with _series_lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def register_collector(collector: Callable):
+    """
+    `collector()` is called on every scrape and returns (name, type, help,
+    [(labels, value), ...]) tuples, for values other modules already track.
+    """
+    _collectors.append(collector)
+
+
+# ---------------------------
+# Spans
+# ---------------------------
+class span:
+    """
+    `with span("extract"):` records the block's latency under that stage and
+    counts it in stage_errors_total if it raises. A class rather than a
+    generator-based context manager: this sits on hot paths.
+    """
+
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            inc("stage_errors_total", stage=self.stage)
+        observe(f"{self.stage}_seconds", time.perf_counter() - self.start)
+
+
+def timed(stage: str):
+    """
+    Decorator form of span() for sync and async functions.
+    """
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def run_async(*args, **kwargs):
+                with span(stage):
+                    return await func(*args, **kwargs)
+            return run_async
+
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return run
+
+    return decorate
+
+
+# ---------------------------
+# Exposition
+# ---------------------------
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus() -> str:
+    """
+    Everything recorded so far in the Prometheus text format (version 0.0.4).
+    """
+    with _series_lock:
+        histograms = [(key, list(series[0]), series[1]) for key, series in _histograms.items()]
+        counters = list(_counters.items())
+
+    families: Dict[str, list] = {}
+    for (name, pairs), counts, total in histograms:
+        lines = families.setdefault(name, [])
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), counts):
+            cumulative += count
+            lines.append(f"{PREFIX}{name}_bucket{_labels(pairs + (('le', bound),))} {cumulative}")
+        lines.append(f"{PREFIX}{name}_sum{_labels(pairs)} {total!r}")
+        lines.append(f"{PREFIX}{name}_count{_labels(pairs)} {cumulative}")
+    for (name, pairs), value in counters:
+        families.setdefault(name, []).append(f"{PREFIX}{name}{_labels(pairs)} {_number(value)}")
+
+    out = []
+    for name in sorted(families):
+        kind, help_text = FAMILIES.get(name, ("untyped", name))
+        out += [f"# HELP {PREFIX}{name} {help_text}", f"# TYPE {PREFIX}{name} {kind}"]
+        out += families[name]
+    for collector in _collectors:
+        try:
+            for name, kind, help_text, samples in collector():
+                out += [f"# HELP {PREFIX}{name} {help_text}", f"# TYPE {PREFIX}{name} {kind}"]
+                out += [f"{PREFIX}{name}{_labels(tuple(labels.items()))} {_number(value)}" for labels, value in samples]
+        except Exception as e:
+            print("⚠️ Metrics collector failed:", e)
+    return "\n".join(out) + "\n"
+
+
+# ---------------------------
+# ASGI middleware
+# ---------------------------
+_http = {"in_flight": 0}
+
+
+def http_metrics():
+    return [("http_requests_in_flight", "gauge", "HTTP requests being served", [({}, _http["in_flight"])])]
+
+
+register_collector(http_metrics)
+
+
+class MetricsMiddleware:
+    """
+    Records http_request_duration_seconds per route template (not raw path,
+    so ids in URLs do not create new series) until the response body is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        _http["in_flight"] += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _http["in_flight"] -= 1
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            record(
+                "http_request_duration_seconds", time.perf_counter() - start,
+                method=scope["method"], route=route, status=status,
+            )
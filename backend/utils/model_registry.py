@@ -0,0 +1,142 @@
+# backend/utils/model_registry.py
+
+import asyncio
+import gc
+import os
+import resource
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+# ---------------------------
+# Config
+# ---------------------------
+# Unload a pipeline after this many idle seconds (0 keeps models loaded forever)
+HF_IDLE_TIMEOUT = int(os.getenv("HF_IDLE_TIMEOUT", "900"))
+HF_REAPER_INTERVAL = int(os.getenv("HF_REAPER_INTERVAL", "60"))
+
+
+def current_rss_bytes() -> int:
+    """
+    Resident set size of this process (falls back to peak RSS off Linux).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _Entry:
+    def __init__(self, task: str, model: str):
+        self.task = task
+        self.model = model
+        self.pipeline = None
+        self.lock = threading.Lock()
+        self.last_used = 0.0
+        self.load_seconds: Optional[float] = None
+        self.rss_delta_bytes: Optional[int] = None
+        self.loads = 0
+
+
+# ---------------------------
+# Registry
+# ---------------------------
+class ModelRegistry:
+    """
+    Loads HuggingFace pipelines on first use, shares one instance across
+    requests and unloads them after HF_IDLE_TIMEOUT seconds without use.
+    """
+
+    def __init__(self, specs: Dict[str, Tuple[str, str]], idle_timeout: int = HF_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._entries = {name: _Entry(task, model) for name, (task, model) in specs.items()}
+        self._reaper: Optional[asyncio.Task] = None
+
+    def get(self, name: str):
+        """
+        Return the pipeline for `name`, loading it if needed. Blocking — call
+        from a worker thread, not the event loop.
+        """
+        entry = self._entries[name]
+        with entry.lock:
+            if entry.pipeline is None:
+                self._load(name, entry)
+            entry.last_used = time.monotonic()
+            return entry.pipeline
+
+    def warmup(self, names=None):
+        for name in names or list(self._entries):
+            self.get(name)
+        return self.stats()
+
+    def unload(self, name: str) -> bool:
+        entry = self._entries[name]
+        with entry.lock:
+            if entry.pipeline is None:
+                return False
+            entry.pipeline = None
+        gc.collect()
+        print(f"🧹 Unloaded idle model '{name}' ({entry.model})")
+        return True
+
+    def unload_idle(self):
+        if self.idle_timeout <= 0:
+            return []
+        now = time.monotonic()
+        idle = [
+            name for name, entry in self._entries.items()
+            if entry.pipeline is not None and now - entry.last_used > self.idle_timeout
+        ]
+        return [name for name in idle if self.unload(name)]
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        models = {}
+        for name, entry in self._entries.items():
+            models[name] = {
+                "model": entry.model,
+                "loaded": entry.pipeline is not None,
+                "loads": entry.loads,
+                "load_seconds": entry.load_seconds,
+                "rss_delta_mb": round(entry.rss_delta_bytes / 2**20, 1) if entry.rss_delta_bytes is not None else None,
+                "idle_seconds": round(now - entry.last_used, 1) if entry.pipeline is not None else None,
+            }
+        return {
+            "process_rss_mb": round(current_rss_bytes() / 2**20, 1),
+            "idle_timeout": self.idle_timeout,
+            "models": models,
+        }
+
+    # ---- background unloading ----
+    def start_reaper(self, interval: int = HF_REAPER_INTERVAL):
+        if self.idle_timeout > 0 and self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap(interval))
+
+    async def stop_reaper(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+            self._reaper = None
+
+    async def _reap(self, interval: int):
+        while True:
+            await asyncio.sleep(interval)
+            # gc.collect() can take a moment on large graphs; keep it off the loop
+            await asyncio.to_thread(self.unload_idle)
+
+    # ---- loading ----
+    def _load(self, name: str, entry: _Entry):
+        # transformers/torch are imported here so worker start-up does not pay for them
+        from transformers import pipeline
+
+        rss_before = current_rss_bytes()
+        start = time.perf_counter()
+        entry.pipeline = pipeline(entry.task, model=entry.model)
+        entry.load_seconds = round(time.perf_counter() - start, 3)
+        entry.rss_delta_bytes = current_rss_bytes() - rss_before
+        entry.loads += 1
+        print(f"✅ Loaded model '{name}' ({entry.model}) in {entry.load_seconds}s")
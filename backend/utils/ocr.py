@@ -0,0 +1,156 @@
+# backend/utils/ocr.py
+
+import asyncio
+import io
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import PyPDF2
+import pytesseract
+from PIL import Image
+
+from backend.utils import metrics
+from backend.utils.cache_utils import ResultCache, content_hash, make_key
+from backend.utils.executors import OCR_WORKERS, run_in_ocr_pool
+from backend.utils.ingest import open_source
+
+try:  # optional: keeps one tesseract engine loaded per worker instead of a process per call
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# ---------------------------
+# Config
+# ---------------------------
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+# Longest image side fed to tesseract; larger scans are downscaled first
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "2400"))
+OCR_BINARIZE = os.getenv("OCR_BINARIZE", "1") == "1"
+
+ocr_cache = ResultCache("ocr")
+_api = None  # per-worker tesserocr engine
+
+
+# ---------------------------
+# Worker side
+# ---------------------------
+def init_ocr_worker():
+    """
+    Pool initializer: pin tesseract to one thread (the pool provides the
+    parallelism) and load the engine once so later jobs start warm.
+    """
+    global _api
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    if tesserocr is not None:
+        _api = tesserocr.PyTessBaseAPI(lang=OCR_LANG)
+    else:
+        pytesseract.get_tesseract_version()
+
+
+def otsu_threshold(pixels: np.ndarray) -> int:
+    hist = np.bincount(pixels.ravel(), minlength=256).astype(np.float64)
+    omega = np.cumsum(hist) / pixels.size
+    mu = np.cumsum(hist * np.arange(256)) / pixels.size
+    denom = omega * (1.0 - omega)
+    between = np.zeros(256)
+    valid = denom > 0
+    between[valid] = (mu[-1] * omega[valid] - mu[valid]) ** 2 / denom[valid]
+    return int(np.argmax(between))
+
+
+def preprocess(image: Image.Image) -> Image.Image:
+    """
+    Grayscale, downscale to OCR_MAX_SIDE and binarize (Otsu) before OCR.
+    """
+    image = image.convert("L")
+    scale = OCR_MAX_SIDE / max(image.size)
+    if scale < 1:
+        image = image.resize((int(image.width * scale), int(image.height * scale)), Image.BILINEAR)
+    if OCR_BINARIZE:
+        pixels = np.asarray(image)
+        image = Image.fromarray(np.where(pixels > otsu_threshold(pixels), 255, 0).astype(np.uint8))
+    return image
+
+
+def recognize(image: Image.Image) -> str:
+    image = preprocess(image)
+    if _api is not None:
+        _api.SetImage(image)
+        return _api.GetUTF8Text()
+    return pytesseract.image_to_string(image, lang=OCR_LANG)
+
+
+def ocr_frame(source, index: int) -> str:
+    """
+    OCR one frame of an image (multi-page TIFFs have several).
+    """
+    with open_source(source) as f, Image.open(f) as image:
+        image.seek(index)
+        return recognize(image)
+
+
+def ocr_pdf_page(source, index: int) -> str:
+    """
+    OCR the embedded images of one (scanned) PDF page.
+    """
+    texts = []
+    with open_source(source) as f:
+        page = PyPDF2.PdfReader(f).pages[index]
+        for image_file in page.images:
+            with Image.open(io.BytesIO(image_file.data)) as image:
+                texts.append(recognize(image).strip())
+    return " ".join(t for t in texts if t)
+
+
+# ---------------------------
+# Async side
+# ---------------------------
+def count_frames(source) -> int:
+    with open_source(source) as f, Image.open(f) as image:
+        return getattr(image, "n_frames", 1)
+
+
+async def _ocr_job(func, source, digest: str, index: int) -> str:
+    key = make_key(digest, func.__name__, index, OCR_LANG, OCR_MAX_SIDE, OCR_BINARIZE)
+    cached = await ocr_cache.aget(key)
+    if cached is not None:
+        return cached
+    text = (await run_in_ocr_pool(func, source, index)).strip()
+    await ocr_cache.aset(key, text)
+    return text
+
+
+async def ocr_jobs(
+    func, source, indices: List[int], max_chars: Optional[int] = None, digest: Optional[str] = None
+) -> Tuple[Dict[int, str], bool]:
+    """
+    Run one OCR job per page/frame, OCR_WORKERS at a time, in page order.
+    Stops after the wave that reaches `max_chars`. Returns ({index: text}, complete)
+    with the indices in order. `source` is bytes or a temp file path; paths come
+    with their digest.
+    """
+    digest = digest or content_hash(source)
+    texts, chars = {}, 0
+    for i in range(0, len(indices), OCR_WORKERS):
+        wave = indices[i:i + OCR_WORKERS]
+        for index, text in zip(wave, await asyncio.gather(*(_ocr_job(func, source, digest, n) for n in wave))):
+            texts[index] = text
+            if text:
+                chars += len(text) + 1
+        if max_chars is not None and chars >= max_chars:
+            return texts, i + len(wave) >= len(indices)
+    return texts, True
+
+
+@metrics.timed("ocr_image")
+async def ocr_image(source, max_chars: Optional[int] = None, digest: Optional[str] = None) -> Tuple[str, bool]:
+    texts, complete = await ocr_jobs(ocr_frame, source, list(range(count_frames(source))), max_chars, digest)
+    return " ".join(t for t in texts.values() if t), complete
+
+
+@metrics.timed("ocr_pdf")
+async def ocr_pdf_pages(
+    source, pages: List[int], max_chars: Optional[int] = None, digest: Optional[str] = None
+) -> Tuple[Dict[int, str], bool]:
+    return await ocr_jobs(ocr_pdf_page, source, pages, max_chars, digest)
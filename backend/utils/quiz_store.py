@@ -0,0 +1,180 @@
+# backend/utils/quiz_store.py
+#
+# Answer keys of generated quizzes, kept server-side so clients never see them.
+# A quiz is stored as one string of answer letters ("BDAC...") under a random
+# quiz_id; submissions send only quiz_id + answers. Per-question
+# aggregates are updated incrementally as submissions are graded.
+
+import os
+import secrets
+from collections import OrderedDict
+from typing import Dict, List, Optional, Union
+
+from backend.utils.cache_utils import ResultCache, content_hash
+
+# ---------------------------
+# Config
+# ---------------------------
+QUIZ_TTL_SECONDS = int(os.getenv("QUIZ_TTL_SECONDS", str(7 * 24 * 3600)))
+QUIZ_MAX_KEYS = int(os.getenv("QUIZ_MAX_KEYS", "100000"))       # answer keys held in memory
+QUIZ_MAX_STATS = int(os.getenv("QUIZ_MAX_STATS", "10000"))      # quizzes with live aggregates
+
+OPTIONS = "ABCD"
+BLANK = len(OPTIONS)  # slot for unanswered / invalid choices
+SLOTS = {letter: i for i, letter in enumerate(OPTIONS)}
+# Fast path for the usual single letters; anything else is stripped/uppercased
+CANONICAL = {**{c: c for c in OPTIONS}, **{c.lower(): c for c in OPTIONS}}
+INDEX_KEYS = [str(i) for i in range(256)]
+
+
+class UnknownQuiz(Exception):
+    """
+    Raised for ids never stored here or whose key has expired.
+    """
+
+
+def normalize_answers(answers: Union[Dict, List, None], total: int) -> List[str]:
+    """
+    {"0": "b", 1: "C"} or ["B", "C"] -> ["B", "C", "", ...] of length `total`.
+    """
+    if isinstance(answers, dict):
+        get = answers.get
+        answers = [get(k) if k in answers else get(i) for i, k in enumerate(INDEX_KEYS[:total])]
+    elif isinstance(answers, list):
+        answers = answers[:total] + [None] * (total - len(answers))
+    else:
+        answers = [None] * total
+    return [CANONICAL.get(a) or (a.strip().upper() if isinstance(a, str) else "") for a in answers]
+
+
+class QuizStats:
+    """
+    Running aggregates for one quiz: attempts, score sum and, per question,
+    how often each option (or nothing) was chosen.
+    """
+
+    def __init__(self, total: int):
+        self.attempts = 0
+        self.score_sum = 0
+        self.choices = [[0] * (BLANK + 1) for _ in range(total)]
+
+    def add(self, selected: List[str], score: int):
+        self.attempts += 1
+        self.score_sum += score
+        for counts, choice in zip(self.choices, selected):
+            counts[SLOTS.get(choice, BLANK)] += 1
+
+    def summary(self) -> dict:
+        """
+        Public aggregates: option counts only. Which option is correct (or how
+        often each question is answered correctly) would give the key away.
+        """
+        return {
+            "attempts": self.attempts,
+            "average_score": round(self.score_sum / self.attempts, 3) if self.attempts else 0.0,
+            "total": len(self.choices),
+            "questions": [
+                {"index": i, "choices": {**dict(zip(OPTIONS, counts)), "blank": counts[BLANK]}}
+                for i, counts in enumerate(self.choices)
+            ],
+        }
+
+
+class QuizStore:
+    """
+    Keys live in a ResultCache (TTL, LRU, and the shared SQLite tier when
+    CACHE_DB_PATH is set); aggregates are per worker process.
+
+    quiz_ids are random: anything derived from the key would let a client with
+    the questions try all 4^n keys against it. The quiz's content digest maps
+    to its id in a separate cache that no endpoint reads, so the same quiz
+    (e.g. a cached result served again) keeps its id and its stats.
+    """
+
+    def __init__(self, ttl: int = QUIZ_TTL_SECONDS, max_keys: int = QUIZ_MAX_KEYS, max_stats: int = QUIZ_MAX_STATS):
+        self.keys = ResultCache("quiz_keys", max_entries=max_keys, ttl=ttl)
+        self.ids = ResultCache("quiz_ids", max_entries=max_keys, ttl=ttl)
+        self.max_stats = max_stats
+        self._stats: "OrderedDict[str, QuizStats]" = OrderedDict()
+        self.graded = 0
+
+    def put(self, quiz: List[dict]) -> Optional[str]:
+        """
+        Store the answer key of a generated quiz; the same quiz always gets the same id.
+        """
+        if not quiz:
+            return None
+        key = "".join(item.get("answer", "")[:1] or "?" for item in quiz)
+        digest = content_hash("\x00".join([key] + [item.get("question", "") for item in quiz]).encode())
+        quiz_id = self.ids.get(digest)
+        if quiz_id is None or self.keys.get(quiz_id) is None:
+            quiz_id = secrets.token_urlsafe(18)
+            self.keys.set(quiz_id, key)
+            self.ids.set(digest, quiz_id)
+        return quiz_id
+
+    def answer_key(self, quiz_id: str) -> str:
+        key = self.keys.get(quiz_id) if quiz_id else None
+        if key is None:
+            raise UnknownQuiz(quiz_id)
+        return key
+
+    def _quiz_stats(self, quiz_id: str, total: int) -> QuizStats:
+        stats = self._stats.get(quiz_id)
+        if stats is None:
+            stats = self._stats[quiz_id] = QuizStats(total)
+            while len(self._stats) > self.max_stats:
+                self._stats.popitem(last=False)
+        self._stats.move_to_end(quiz_id)
+        return stats
+
+    def _grade(self, key: str, stats: QuizStats, answers) -> dict:
+        selected = normalize_answers(answers, len(key))
+        oks = [s == c for s, c in zip(selected, key)]
+        score = sum(oks)
+        stats.add(selected, score)
+        self.graded += 1
+        return {"score": score, "total": len(key), "selected": selected, "oks": oks}
+
+    def grade(self, quiz_id: str, answers) -> dict:
+        key = self.answer_key(quiz_id)
+        graded = self._grade(key, self._quiz_stats(quiz_id, len(key)), answers)
+        return {
+            "quiz_id": quiz_id,
+            "score": graded["score"],
+            "total": graded["total"],
+            "results": [
+                {"index": i, "selected": s, "correct": c, "ok": ok}
+                for i, (s, c, ok) in enumerate(zip(graded["selected"], key, graded["oks"]))
+            ],
+        }
+
+    def grade_many(self, quiz_id: str, submissions: List[dict]) -> dict:
+        """
+        Grade a class: [{"student": ..., "answers": ...}, ...] against one key lookup.
+        """
+        key = self.answer_key(quiz_id)
+        stats = self._quiz_stats(quiz_id, len(key))
+        results = []
+        for submission in submissions:
+            graded = self._grade(key, stats, submission.get("answers"))
+            results.append({"student": submission.get("student"), "score": graded["score"], "oks": graded["oks"]})
+        scores = [r["score"] for r in results]
+        return {
+            "quiz_id": quiz_id,
+            "total": len(key),
+            "graded": len(results),
+            "average_score": round(sum(scores) / len(scores), 3) if scores else 0.0,
+            "results": results,
+        }
+
+    def stats(self, quiz_id: str) -> dict:
+        key = self.answer_key(quiz_id)
+        stats = self._stats.get(quiz_id) or QuizStats(len(key))
+        return {"quiz_id": quiz_id, **stats.summary()}
+
+    def store_stats(self) -> dict:
+        return {"keys": self.keys.stats(), "quizzes_with_stats": len(self._stats), "graded": self.graded}
+
+
+quiz_store = QuizStore()
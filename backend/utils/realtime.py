@@ -0,0 +1,165 @@
+# backend/utils/realtime.py
+#
+# Socket.IO transport for the mentor: message-queue client manager so several
+# uvicorn workers share rooms, plus per-connection send queues, pending-message
+# limits and LLM concurrency caps.
+
+import asyncio
+import os
+from collections import defaultdict
+from typing import Dict, List
+
+import socketio
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+# ---------------------------
+# Config
+# ---------------------------
+# "" (single worker), "local://" (in-process stand-in), "redis://host:6379/0", "amqp://..."
+SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE", "")
+SOCKET_SEND_QUEUE = int(os.getenv("SOCKET_SEND_QUEUE", "64"))          # queued events per connection
+SOCKET_SEND_TIMEOUT = float(os.getenv("SOCKET_SEND_TIMEOUT", "5"))     # then the slow client is dropped
+SOCKET_TRANSPORT_HIGH_WATER = int(os.getenv("SOCKET_TRANSPORT_HIGH_WATER", "16"))
+SOCKET_MAX_PENDING = int(os.getenv("SOCKET_MAX_PENDING", "4"))         # unanswered messages per connection
+SOCKET_LLM_CONCURRENCY = int(os.getenv("SOCKET_LLM_CONCURRENCY", "1"))  # LLM calls per connection
+
+
+# ---------------------------
+# Client managers
+# ---------------------------
+class LocalPubSubManager(AsyncPubSubManager):
+    """
+    Pub/sub manager over in-process queues: several AsyncServer instances in
+    one process share rooms exactly as separate workers would through Redis.
+    Messages are JSON round-tripped like on a real broker.
+    """
+
+    name = "local"
+    _channels: Dict[str, List[asyncio.Queue]] = defaultdict(list)
+
+    async def _publish(self, data):
+        message = self.json.dumps(data)
+        for queue in self._channels[self.channel]:
+            queue.put_nowait(message)
+
+    async def _listen(self):
+        queue = asyncio.Queue()
+        self._channels[self.channel].append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._channels[self.channel].remove(queue)
+
+
+def make_client_manager(url: str = SOCKETIO_MESSAGE_QUEUE):
+    """
+    Client manager for SOCKETIO_MESSAGE_QUEUE; None keeps rooms in this process.
+    """
+    if not url:
+        return None
+    scheme = url.split("://", 1)[0].split("+", 1)[0].lower()
+    if scheme == "local":
+        return LocalPubSubManager()
+    if scheme in ("redis", "rediss", "valkey", "valkeys", "unix"):
+        return socketio.AsyncRedisManager(url)
+    if scheme in ("amqp", "amqps"):
+        return socketio.AsyncAioPikaManager(url)
+    raise ValueError(f"Unsupported SOCKETIO_MESSAGE_QUEUE: {url}")
+
+
+def session_room(session_id: str) -> str:
+    return f"session:{session_id}"
+
+
+# ---------------------------
+# Per-connection state
+# ---------------------------
+_stats = {"busy_rejections": 0, "slow_disconnects": 0, "sent": 0}
+
+
+class Connection:
+    """
+    Bounded outbox drained by one writer task. The writer also waits while the
+    engine.io transport queue is above the high-water mark, so a client that
+    reads slowly fills its outbox and is eventually disconnected instead of
+    growing server memory.
+    """
+
+    def __init__(self, sio: socketio.AsyncServer, sid: str):
+        self.sio = sio
+        self.sid = sid
+        self.outbox = asyncio.Queue(maxsize=SOCKET_SEND_QUEUE)
+        self.llm_slots = asyncio.Semaphore(SOCKET_LLM_CONCURRENCY)
+        self.pending = 0
+        self.writer = asyncio.ensure_future(self._drain())
+
+    def transport_backlog(self) -> int:
+        try:
+            eio_sid = self.sio.manager.eio_sid_from_sid(self.sid, "/")
+            return self.sio.eio.sockets[eio_sid].queue.qsize()
+        except (AttributeError, KeyError):
+            return 0
+
+    async def _drain(self):
+        while True:
+            event, data = await self.outbox.get()
+            await self.sio.emit(event, data, to=self.sid)
+            _stats["sent"] += 1
+            while self.transport_backlog() > SOCKET_TRANSPORT_HIGH_WATER:
+                await asyncio.sleep(0.01)
+
+    async def send(self, event: str, data) -> bool:
+        try:
+            await asyncio.wait_for(self.outbox.put((event, data)), SOCKET_SEND_TIMEOUT)
+            return True
+        except asyncio.TimeoutError:
+            _stats["slow_disconnects"] += 1
+            print(f"⚠️ Dropping slow Socket.IO client {self.sid}")
+            await self.sio.disconnect(self.sid)
+            return False
+
+    def try_begin(self) -> bool:
+        """
+        Admit one more message unless SOCKET_MAX_PENDING are still unanswered.
+        """
+        if self.pending >= SOCKET_MAX_PENDING:
+            _stats["busy_rejections"] += 1
+            return False
+        self.pending += 1
+        return True
+
+    def end(self):
+        self.pending -= 1
+
+    def close(self):
+        self.writer.cancel()
+
+
+class ConnectionRegistry:
+    def __init__(self, sio: socketio.AsyncServer):
+        self.sio = sio
+        self._connections: Dict[str, Connection] = {}
+
+    def open(self, sid: str) -> Connection:
+        conn = self._connections[sid] = Connection(self.sio, sid)
+        return conn
+
+    def get(self, sid: str) -> Connection:
+        conn = self._connections.get(sid)
+        return conn if conn is not None else self.open(sid)
+
+    def close(self, sid: str):
+        conn = self._connections.pop(sid, None)
+        if conn is not None:
+            conn.close()
+
+    def stats(self) -> dict:
+        conns = list(self._connections.values())
+        return {
+            "manager": type(self.sio.manager).__name__,
+            "connections": len(conns),
+            "pending_messages": sum(c.pending for c in conns),
+            "queued_events": sum(c.outbox.qsize() for c in conns),
+            **_stats,
+        }
@@ -0,0 +1,170 @@
+# backend/utils/retrieval.py
+#
+# Per-document TF-IDF retrieval for the contextual mentor. A document is
+# chunked and indexed once, stored under its content hash, and each question
+# is answered from the top-k chunks instead of a truncated copy of the text.
+
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backend.utils.cache_utils import content_hash
+
+# ---------------------------
+# Config
+# ---------------------------
+RETRIEVAL_CHUNK_CHARS = int(os.getenv("RETRIEVAL_CHUNK_CHARS", "800"))
+RETRIEVAL_CHUNK_OVERLAP = int(os.getenv("RETRIEVAL_CHUNK_OVERLAP", "100"))
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "4"))
+RETRIEVAL_MAX_DOCS = int(os.getenv("RETRIEVAL_MAX_DOCS", "256"))
+RETRIEVAL_TTL_SECONDS = int(os.getenv("RETRIEVAL_TTL_SECONDS", str(24 * 3600)))
+
+TERM_RE = re.compile(r"[a-z0-9]{2,}")
+STOP_WORDS = frozenset(
+    "the and for are but not you all any can had her was one our out has him his how its "
+    "may new now old see two who did get let say she too use that with have this will your "
+    "from they been were what when where which while there their them then than into some "
+    "such only also more most other about would could should these those is in of to on at "
+    "by an as be or it if do so no we he me my us am".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TERM_RE.findall(text.lower()) if t not in STOP_WORDS]
+
+
+def chunk_text(text: str, size: int = RETRIEVAL_CHUNK_CHARS, overlap: int = RETRIEVAL_CHUNK_OVERLAP) -> List[str]:
+    """
+    Split on whitespace into ~`size`-character chunks that overlap by ~`overlap` characters.
+    """
+    words = text.split()
+    chunks, start = [], 0
+    while start < len(words):
+        length, end = 0, start
+        while end < len(words) and (length < size or end == start):
+            length += len(words[end]) + 1
+            end += 1
+        chunks.append(" ".join(words[start:end]))
+        if end >= len(words):
+            break
+        back, kept = end, 0
+        while back > start + 1 and kept < overlap:
+            back -= 1
+            kept += len(words[back]) + 1
+        start = back
+    return chunks
+
+
+# ---------------------------
+# Index
+# ---------------------------
+class TfidfIndex:
+    """
+    Sublinear TF-IDF vectors, L2-normalized per chunk and stored as postings
+    (term -> chunk ids, weights) so a query only touches its own terms.
+    """
+
+    def __init__(self, chunks: List[str]):
+        self.chunks = chunks
+        counts = [Counter(tokenize(c)) for c in chunks]
+        df = Counter(term for c in counts for term in c)
+        n = len(chunks)
+        self.idf = {term: math.log((1 + n) / (1 + d)) + 1 for term, d in df.items()}
+
+        postings: Dict[str, tuple] = {}
+        for i, c in enumerate(counts):
+            weights = {term: (1 + math.log(tf)) * self.idf[term] for term, tf in c.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for term, w in weights.items():
+                ids, vals = postings.setdefault(term, ([], []))
+                ids.append(i)
+                vals.append(w / norm)
+        self.postings = {
+            term: (np.asarray(ids, dtype=np.int32), np.asarray(vals, dtype=np.float32))
+            for term, (ids, vals) in postings.items()
+        }
+
+    def search(self, query: str, k: int = RETRIEVAL_TOP_K) -> List[tuple]:
+        """
+        Returns up to k (chunk_id, score) pairs by cosine similarity, best first.
+        """
+        q = {t: (1 + math.log(tf)) * self.idf[t] for t, tf in Counter(tokenize(query)).items() if t in self.idf}
+        if not q or not self.chunks:
+            return []
+        norm = math.sqrt(sum(w * w for w in q.values()))
+        scores = np.zeros(len(self.chunks), dtype=np.float32)
+        for term, w in q.items():
+            ids, vals = self.postings[term]
+            scores[ids] += vals * (w / norm)
+        k = min(k, len(self.chunks))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top if scores[i] > 0]
+
+    def context(self, query: str, k: int = RETRIEVAL_TOP_K) -> str:
+        """
+        Top-k chunks joined in document order, or the first chunks when nothing matches.
+        """
+        hits = sorted(i for i, _ in self.search(query, k)) or list(range(min(k, len(self.chunks))))
+        return "\n---\n".join(self.chunks[i] for i in hits)
+
+    def nbytes(self) -> int:
+        return sum(len(c) for c in self.chunks) + sum(i.nbytes + v.nbytes for i, v in self.postings.values())
+
+
+# ---------------------------
+# Document store
+# ---------------------------
+class DocumentIndexStore:
+    """
+    document_id -> TfidfIndex with LRU and idle-TTL eviction.
+    """
+
+    def __init__(self, max_docs: int = RETRIEVAL_MAX_DOCS, ttl: int = RETRIEVAL_TTL_SECONDS):
+        self.max_docs = max_docs
+        self.ttl = ttl
+        self._docs: "OrderedDict[str, tuple]" = OrderedDict()  # id -> (last_used, index)
+        self._lock = threading.Lock()
+
+    def add(self, text: str) -> tuple:
+        """
+        Index `text` (once per distinct text); returns (document_id, index).
+        """
+        document_id = content_hash(text.encode("utf-8", "replace"))
+        index = self.get(document_id)
+        if index is None:
+            index = TfidfIndex(chunk_text(text))
+            with self._lock:
+                self._docs[document_id] = (time.monotonic(), index)
+                while len(self._docs) > self.max_docs:
+                    self._docs.popitem(last=False)
+        return document_id, index
+
+    def get(self, document_id: str) -> Optional[TfidfIndex]:
+        with self._lock:
+            entry = self._docs.get(document_id)
+            if entry is None:
+                return None
+            if self.ttl and time.monotonic() - entry[0] > self.ttl:
+                del self._docs[document_id]
+                return None
+            self._docs[document_id] = (time.monotonic(), entry[1])
+            self._docs.move_to_end(document_id)
+            return entry[1]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "documents": len(self._docs),
+                "chunks": sum(len(index.chunks) for _, index in self._docs.values()),
+                "bytes": sum(index.nbytes() for _, index in self._docs.values()),
+            }
+
+
+document_indexes = DocumentIndexStore()
@@ -0,0 +1,144 @@
+# backend/utils/sessions.py
+#
+# Mentor conversation sessions. A session is a JSON-serializable dict:
+#   {"id", "summary", "turns": [{"role": "student" | "mentor", "text"}], "compactions"}
+# stored in a pluggable backend (in-memory LRU by default, or SQLite so
+# several workers can share sessions).
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+# ---------------------------
+# Config
+# ---------------------------
+MENTOR_SESSION_BACKEND = os.getenv("MENTOR_SESSION_BACKEND", "memory")   # "memory" or "sqlite"
+MENTOR_SESSION_DB_PATH = os.getenv("MENTOR_SESSION_DB_PATH", os.path.join(tempfile.gettempdir(), "mentor_sessions.sqlite3"))
+MENTOR_MAX_SESSIONS = int(os.getenv("MENTOR_MAX_SESSIONS", "10000"))
+MENTOR_SESSION_TTL = int(os.getenv("MENTOR_SESSION_TTL", "3600"))        # idle seconds
+
+
+def new_session(session_id: Optional[str] = None) -> dict:
+    return {"id": session_id or uuid.uuid4().hex, "summary": "", "turns": [], "compactions": 0}
+
+
+# ---------------------------
+# Backends
+# ---------------------------
+class SessionBackend(ABC):
+    """
+    Interface for session storage; get() returns None for unknown or expired ids.
+    """
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def put(self, session: dict):
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemorySessionBackend(SessionBackend):
+    """
+    Per-process LRU with idle-TTL eviction.
+    """
+
+    def __init__(self, max_sessions: int = MENTOR_MAX_SESSIONS, ttl: int = MENTOR_SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()  # id -> (last_used, session)
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            if self.ttl and time.monotonic() - entry[0] > self.ttl:
+                del self._sessions[session_id]
+                self.evictions += 1
+                return None
+            self._sessions.move_to_end(session_id)
+            return entry[1]
+
+    def put(self, session: dict):
+        with self._lock:
+            self._sessions[session["id"]] = (time.monotonic(), session)
+            self._sessions.move_to_end(session["id"])
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": "memory", "sessions": len(self._sessions), "evictions": self.evictions}
+
+
+class SqliteSessionBackend(SessionBackend):
+    """
+    Sessions in a SQLite file shared by the workers on one host.
+    """
+
+    def __init__(self, path: str = MENTOR_SESSION_DB_PATH, ttl: int = MENTOR_SESSION_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS mentor_sessions (id TEXT PRIMARY KEY, updated REAL, data TEXT)"
+        )
+
+    def get(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM mentor_sessions WHERE id = ? AND updated > ?",
+                (session_id, time.time() - self.ttl if self.ttl else 0),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, session: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO mentor_sessions (id, updated, data) VALUES (?, ?, ?)",
+                (session["id"], time.time(), json.dumps(session)),
+            )
+            if self.ttl:
+                self._conn.execute("DELETE FROM mentor_sessions WHERE updated < ?", (time.time() - self.ttl,))
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM mentor_sessions WHERE id = ?", (session_id,))
+
+    def stats(self) -> dict:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM mentor_sessions").fetchone()
+        return {"backend": "sqlite", "sessions": count}
+
+
+def make_session_backend(kind: str = MENTOR_SESSION_BACKEND) -> SessionBackend:
+    if kind == "sqlite":
+        return SqliteSessionBackend()
+    return MemorySessionBackend()
+
+
+sessions = make_session_backend()
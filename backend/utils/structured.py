@@ -0,0 +1,320 @@
+# backend/utils/structured.py
+#
+# Schema-constrained JSON output for the quiz and flowchart generators: response
+# schemas for Gemini's structured-output mode, pydantic models that validate the
+# reply, and per-item salvage so one malformed question or edge costs a small
+# follow-up call instead of the whole generation.
+
+import ast
+import json
+import os
+import re
+import threading
+from typing import List, Literal, Optional, Tuple
+
+from pydantic import ConfigDict, Field, StringConstraints, TypeAdapter, ValidationError
+from typing_extensions import Annotated, TypedDict
+
+from backend.utils.quiz_store import OPTIONS
+
+# ---------------------------
+# Config
+# ---------------------------
+# Append every raw quiz/flowchart reply to this JSONL file (corpus for
+# backend/benchmarks/bench_structured_output.py); unset disables recording
+LLM_RECORD_PATH = os.getenv("LLM_RECORD_PATH", "")
+
+
+# ---------------------------
+# Response schemas (OpenAPI subset accepted by generation_config)
+# ---------------------------
+QUIZ_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "question": {"type": "string"},
+            "options": {
+                "type": "object",
+                "properties": {letter: {"type": "string"} for letter in OPTIONS},
+                "required": list(OPTIONS),
+            },
+            "answer": {"type": "string", "format": "enum", "enum": list(OPTIONS)},
+        },
+        "required": ["question", "options", "answer"],
+    },
+}
+
+NODE_SCHEMA = {
+    "type": "object",
+    "properties": {"id": {"type": "string"}, "label": {"type": "string"}},
+    "required": ["id", "label"],
+}
+EDGE_SCHEMA = {
+    "type": "object",
+    "properties": {"source": {"type": "string"}, "target": {"type": "string"}},
+    "required": ["source", "target"],
+}
+FLOWCHART_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "nodes": {"type": "array", "items": NODE_SCHEMA},
+        "edges": {"type": "array", "items": EDGE_SCHEMA},
+    },
+    "required": ["nodes", "edges"],
+}
+EDGES_SCHEMA = {"type": "object", "properties": {"edges": FLOWCHART_SCHEMA["properties"]["edges"]}, "required": ["edges"]}
+
+
+def json_output(schema: dict) -> dict:
+    """
+    Keyword arguments for llm.generate*() that switch the call to JSON mode.
+    """
+    return {"generation_config": {"response_mime_type": "application/json", "response_schema": schema}}
+
+
+# ---------------------------
+# Typed models
+# ---------------------------
+# TypedDicts rather than BaseModels: validate_json stays inside pydantic-core
+# and yields the plain dicts the caches and quiz store already hold.
+Text = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
+NUMBERS_AS_TEXT = ConfigDict(coerce_numbers_to_str=True)
+ANSWER_RE = re.compile(r"^\W*(?:option\s*)?([A-Da-d])(?:\W|$)", re.IGNORECASE)
+
+
+class QuizOptions(TypedDict):
+    __pydantic_config__ = NUMBERS_AS_TEXT
+    A: Text
+    B: Text
+    C: Text
+    D: Text
+
+
+class QuizQuestion(TypedDict):
+    __pydantic_config__ = NUMBERS_AS_TEXT
+    question: Text
+    options: QuizOptions
+    answer: Literal["A", "B", "C", "D"]
+
+
+class FlowNode(TypedDict):
+    __pydantic_config__ = NUMBERS_AS_TEXT
+    id: Text
+    label: Text
+
+
+class FlowEdge(TypedDict):
+    __pydantic_config__ = NUMBERS_AS_TEXT
+    source: Text
+    target: Text
+
+
+class Flowchart(TypedDict):
+    nodes: Annotated[List[FlowNode], Field(min_length=1)]
+    edges: List[FlowEdge]
+
+
+QUIZ = TypeAdapter(List[QuizQuestion])
+QUESTION = TypeAdapter(QuizQuestion)
+FLOWCHART = TypeAdapter(Flowchart)
+NODE = TypeAdapter(FlowNode)
+EDGE = TypeAdapter(FlowEdge)
+
+
+def repair_question(item):
+    """
+    Local fixes for the usual near misses before an item is validated on its
+    own: options as a list or with lowercase keys, answers like "b)",
+    "Option C" or the option text itself.
+    """
+    if not isinstance(item, dict):
+        return item
+    item = dict(item)
+    options = item.get("options")
+    if isinstance(options, list):
+        options = dict(zip(OPTIONS, options))
+    if isinstance(options, dict):
+        options = {str(k).strip()[:1].upper(): v for k, v in options.items()}
+        item["options"] = options
+    answer = item.get("answer")
+    if isinstance(answer, str) and answer not in OPTIONS:
+        match = ANSWER_RE.match(answer)
+        if match:
+            item["answer"] = match.group(1).upper()
+        elif isinstance(options, dict):
+            text = answer.strip().lower()
+            item["answer"] = next((k for k, v in options.items() if str(v).strip().lower() == text), answer)
+    return item
+
+
+# ---------------------------
+# Lenient loading (only when strict validation failed)
+# ---------------------------
+FENCE_RE = re.compile(r"```(?:json)?")
+TRAILING_COMMA_RE = re.compile(r",\s*([\]}])")
+_decoder = json.JSONDecoder()
+
+
+def salvage_array(text: str, start: int) -> list:
+    """
+    Complete elements of the JSON array opening at text[start], stopping at the
+    first element that does not parse (e.g. where a reply was cut off).
+    """
+    items, pos = [], start + 1
+    while True:
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(text) or text[pos] == "]":
+            return items
+        try:
+            item, pos = _decoder.raw_decode(text, pos)
+        except ValueError:
+            return items
+        items.append(item)
+
+
+def load_lenient(text: str, opener: str):
+    """
+    Best-effort JSON from free-form output: code fences and commentary are
+    stripped, Python-style quoting and trailing commas are tolerated, and a
+    truncated reply keeps whatever elements were complete. None if hopeless.
+    """
+    closer = "]" if opener == "[" else "}"
+    text = FENCE_RE.sub("", text).strip()
+    start = text.find(opener)
+    if start < 0:
+        return None
+    end = text.rfind(closer)
+    body = text[start:end + 1] if end > start else text[start:]
+    for candidate in (body, TRAILING_COMMA_RE.sub(r"\1", body)):
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            pass
+    try:
+        return ast.literal_eval(body)  # {'nodes': [...]} with apostrophes intact
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        pass
+    if opener == "[":
+        return salvage_array(text, start)
+    salvaged = {}
+    for field in ("nodes", "edges"):
+        match = re.search(r'"%s"\s*:\s*\[' % field, text)
+        if match:
+            salvaged[field] = salvage_array(text, match.end() - 1)
+    return salvaged or None
+
+
+# ---------------------------
+# Quiz
+# ---------------------------
+def parse_quiz(text: str) -> Tuple[List[dict], int]:
+    """
+    (valid questions, number of items dropped) from a quiz reply. Schema-mode
+    replies validate in one pass; anything else is loaded leniently and
+    validated item by item.
+    """
+    try:
+        questions = QUIZ.validate_json(text)
+        unique = dedupe_questions(questions)
+        return unique, len(questions) - len(unique)
+    except ValidationError:
+        pass
+    data = load_lenient(text or "", "[")
+    if isinstance(data, dict):  # {"questions": [...]}
+        data = next((v for v in data.values() if isinstance(v, list)), [])
+    questions, dropped = [], 0
+    for item in data if isinstance(data, list) else []:
+        try:
+            questions.append(QUESTION.validate_python(repair_question(item)))
+        except ValidationError:
+            dropped += 1
+    return dedupe_questions(questions), dropped
+
+
+def dedupe_questions(questions: List[dict]) -> List[dict]:
+    seen, unique = set(), []
+    for q in questions:
+        key = q["question"].lower()
+        if key not in seen:
+            seen.add(key)
+            unique.append(q)
+    return unique
+
+
+# ---------------------------
+# Flowchart
+# ---------------------------
+def parse_flowchart(text: str) -> Tuple[dict, int]:
+    """
+    ({"nodes", "edges"}, number of items dropped). Nodes without an id are
+    numbered by position; edges must point at known nodes.
+    """
+    try:
+        chart = FLOWCHART.validate_json(text)
+        nodes, edges, dropped = chart["nodes"], chart["edges"], 0
+    except ValidationError:
+        data = load_lenient(text or "", "{")
+        if not isinstance(data, dict):
+            data = {}
+        nodes, edges, dropped = [], [], 0
+        for i, item in enumerate(data.get("nodes") or []):
+            if isinstance(item, dict) and "id" not in item:
+                item = {**item, "id": str(i + 1)}
+            try:
+                nodes.append(NODE.validate_python(item))
+            except ValidationError:
+                dropped += 1
+        for item in data.get("edges") or []:
+            try:
+                edges.append(EDGE.validate_python(item))
+            except ValidationError:
+                dropped += 1
+
+    ids, unique_nodes = set(), []
+    for node in nodes:
+        if node["id"] in ids:
+            dropped += 1
+            continue
+        ids.add(node["id"])
+        unique_nodes.append(node)
+    pairs, unique_edges = set(), []
+    for edge in edges:
+        pair = (edge["source"], edge["target"])
+        if pair[0] not in ids or pair[1] not in ids or pair in pairs:
+            dropped += 1
+            continue
+        pairs.add(pair)
+        unique_edges.append(edge)
+    return {"nodes": unique_nodes, "edges": unique_edges}, dropped
+
+
+def parse_edges(text: str, nodes: List[dict]) -> List[dict]:
+    """
+    Edges from an edges-only repair reply, kept only between the known nodes.
+    """
+    data = load_lenient(text, "{")
+    edges = data.get("edges") if isinstance(data, dict) else None
+    chart, _ = parse_flowchart(json.dumps({"nodes": nodes, "edges": edges if isinstance(edges, list) else []}))
+    return chart["edges"]
+
+
+# ---------------------------
+# Recording
+# ---------------------------
+_record_lock = threading.Lock()
+
+
+def record_output(kind: str, text: Optional[str]):
+    """
+    Keep the raw reply when LLM_RECORD_PATH is set, so parsers can be measured
+    against what the model actually returns.
+    """
+    if not LLM_RECORD_PATH or text is None:
+        return
+    try:
+        with _record_lock, open(LLM_RECORD_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"kind": kind, "text": text}) + "\n")
+    except OSError as e:
+        print("⚠️ Could not record LLM output:", e)
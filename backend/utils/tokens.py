@@ -0,0 +1,11 @@
+# backend/utils/tokens.py
+#
+# Rough token counting shared by the LLM client (usage metrics), the mentor's
+# transcript budget and the fake LLM's simulated generation speed.
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    ~4 characters per token, the usual rule of thumb for English text.
+    """
+    return max(1, len(text) // 4)
@@ -15,13 +15,14 @@ import Navbar from "../components/Navbar";
  * POST /assistant/summarize/detailed
  * POST /assistant/flowchart
  * POST /assistant/quiz
- * POST /assistant/quiz/submit
+ * POST /assistant/quiz/submit   ({ quiz_id, answers })
  */
 
 export default function Assistant() {
   const [file, setFile] = useState(null);
   const [summary, setSummary] = useState([]);
   const [quiz, setQuiz] = useState([]);
+  const [quizId, setQuizId] = useState(null); // answer key stays on the server
   const [quizAnswers, setQuizAnswers] = useState({});
   const [quizResults, setQuizResults] = useState(null);
   const [flowchartData, setFlowchartData] = useState(null); // { nodes: [], edges: [] }
@@ -251,11 +252,14 @@ export default function Assistant() {
     setLoading(true);
     setSection("quiz");
     setQuiz([]);
+    setQuizId(null);
     setQuizAnswers({});
     setQuizResults(null);
     const data = await uploadFile("quiz");
-    if (data?.quiz) setQuiz(data.quiz);
-    else alert("No quiz generated. Try a different document.");
+    if (data?.quiz?.length) {
+      setQuiz(data.quiz);
+      setQuizId(data.quiz_id);
+    } else alert("No quiz generated. Try a different document.");
     setLoading(false);
   };
 
@@ -264,11 +268,11 @@ export default function Assistant() {
   };
 
   const handleQuizSubmit = async () => {
-    if (!quiz || quiz.length === 0) {
+    if (!quiz || quiz.length === 0 || !quizId) {
       alert("No quiz to submit.");
       return;
     }
-    const payload = { quiz: quiz, answers: {} };
+    const payload = { quiz_id: quizId, answers: {} };
     quiz.forEach((q, i) => {
       payload.answers[i] = quizAnswers[i] || "";
     });
@@ -663,15 +667,15 @@ return (
           <div
             key={i}
             style={{
-              background: r.user === r.correct ? "#dcfce7" : "#fee2e2",
-              border: `1px solid ${r.user === r.correct ? "#22c55e" : "#ef4444"}`,
+              background: r.ok ? "#dcfce7" : "#fee2e2",
+              border: `1px solid ${r.ok ? "#22c55e" : "#ef4444"}`,
               borderRadius: "10px",
               padding: "12px 15px",
               marginBottom: "10px",
             }}
           >
             <div style={{ fontWeight: 600, color: "#1e293b" }}>
-              {i + 1}. {r.question}
+              {i + 1}. {quiz[r.index]?.question}
             </div>
             <div>
               ✅ Correct Answer:{" "}
@@ -681,11 +685,11 @@ return (
               🧍 Your Answer:{" "}
               <span
                 style={{
-                  color: r.user === r.correct ? "#15803d" : "#b91c1c",
+                  color: r.ok ? "#15803d" : "#b91c1c",
                   fontWeight: 600,
                 }}
               >
-                {r.user || "Not answered"}
+                {r.selected || "Not answered"}
               </span>
             </div>
           </div>
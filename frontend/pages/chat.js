@@ -23,7 +23,11 @@ export default function ChatPage() {
     });
 
     socket.on("chat_message", (data) => {
-      setMessages((prev) => [...prev, { sender: "User", text: data.text }]);
+      setMessages((prev) => [...prev, { sender: "Mentor", text: data.text }]);
+    });
+
+    socket.on("chat_error", (data) => {
+      setMessages((prev) => [...prev, { sender: "Server", text: `Error: ${data.detail}` }]);
     });
 
     return () => {
@@ -33,6 +37,7 @@ export default function ChatPage() {
 
   const sendMessage = () => {
     if (input.trim()) {
+      setMessages((prev) => [...prev, { sender: "You", text: input }]);
       socket.emit("chat_message", { text: input });
       setInput("");
     }
@@ -9,6 +9,7 @@ export default function VirtualMentor() {
   const [chat, setChat] = useState([]);
   const [input, setInput] = useState("");
   const [loading, setLoading] = useState(false);
+  const [sessionId, setSessionId] = useState(null);
 
   // 🧑‍🏫 Predefined avatars
   const avatars = [
@@ -62,8 +63,12 @@ export default function VirtualMentor() {
 
     try {
       const res = await axios.post("${process.env.NEXT_PUBLIC_API_URL}/mentor/chat", null, {
-        params: { message: `${selectedAvatar.personality}\n\nStudent: ${userMsg.text}` },
+        params: {
+          message: `${selectedAvatar.personality}\n\nStudent: ${userMsg.text}`,
+          session_id: sessionId || undefined,
+        },
       });
+      setSessionId(res.data.session_id);
 
       const aiMsg = { sender: "mentor", text: res.data.reply };
       setChat((prev) => [...prev, aiMsg]);
@@ -153,7 +158,10 @@ return (
         {avatars.map((a, i) => (
           <div
             key={i}
-            onClick={() => setSelectedAvatar(a)}
+            onClick={() => {
+              setSelectedAvatar(a);
+              setSessionId(null);
+            }}
             style={{
               cursor: "pointer",
               display: "flex",